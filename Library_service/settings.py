@@ -13,7 +13,7 @@ https://docs.djangoproject.com/en/5.1/ref/settings/
 import os
 from pathlib import Path
 from datetime import timedelta
-from celery.schedules import schedule
+from celery.schedules import crontab, schedule
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -43,6 +43,8 @@ INSTALLED_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    "django.contrib.postgres",
+    "core",
     "books",
     "borrowing",
     "user",
@@ -57,6 +59,9 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "core.metrics.MetricsMiddleware",
+    "core.compression.CompressionMiddleware",
+    "core.db_router.ReplicaRoutingMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -101,6 +106,27 @@ DATABASES = {
     }
 }
 
+# Read replicas of the same database, e.g. "replica1,replica2:5433".
+# Pointing one at the primary's own host is enough to exercise the routing locally.
+POSTGRES_REPLICA_HOSTS = [
+    host.strip()
+    for host in os.getenv("POSTGRES_REPLICA_HOSTS", "").split(",")
+    if host.strip()
+]
+for number, address in enumerate(POSTGRES_REPLICA_HOSTS, start=1):
+    host, _, port = address.partition(":")
+    DATABASES[f"replica{number}"] = {
+        **DATABASES["default"],
+        "HOST": host,
+        "PORT": port or DATABASES["default"]["PORT"],
+        "TEST": {"MIRROR": "default"},
+    }
+
+DATABASE_ROUTERS = ["core.db_router.PrimaryReplicaRouter"]
+
+# After a write, the client's reads stay on the primary this long
+REPLICA_PIN_SECONDS = int(os.getenv("REPLICA_PIN_SECONDS", 5))
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
@@ -146,11 +172,49 @@ DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": [
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
-    ]
+        "user.authentication.CachedJWTAuthentication",
+    ],
+    "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
+    "DEFAULT_RENDERER_CLASSES": [
+        "core.renderers.ORJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ],
 }
 
-CELERY_BROKER_URL = "redis://localhost:6379/0"
+REDIS_URL = os.environ.get("REDIS_URL")
+
+# The catalog cache shares the broker's Redis; without it each process caches locally
+# and SHARED_CACHE below turns the catalog cache off.
+# "local" is always per process, the first tier of the authenticated user cache.
+if REDIS_URL:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": REDIS_URL,
+            "KEY_PREFIX": "library",
+        },
+        "local": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "LOCATION": "local",
+        },
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        },
+        "local": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "LOCATION": "local",
+        },
+    }
+
+# Only Redis is seen by every process. With per-process caches the catalog cache
+# and the shared tier of the user cache are skipped: an invalidation would reach
+# just the process that made it, and the others would serve stale data
+SHARED_CACHE = bool(REDIS_URL)
+
+CELERY_BROKER_URL = REDIS_URL or "redis://localhost:6379/0"
 CELERY_ACCEPT_CONTENT = ["json"]
 CELERY_TASK_SERIALIZER = "json"
 CELERY_RESULT_BACKEND = "django-db"
@@ -160,16 +224,70 @@ SIMPLE_JWT = {
     "REFRESH_TOKEN_LIFETIME": timedelta(days=7),
     "ROTATE_REFRESH_TOKENS": True,
     "BLACKLIST_AFTER_ROTATION": True,
+    "TOKEN_OBTAIN_SERIALIZER": "user.tokens.VersionedTokenObtainPairSerializer",
+    "TOKEN_REFRESH_SERIALIZER": "user.tokens.VersionedTokenRefreshSerializer",
+    "TOKEN_VERIFY_SERIALIZER": "user.tokens.CachedTokenVerifySerializer",
+    "TOKEN_BLACKLIST_SERIALIZER": "user.tokens.VersionedTokenBlacklistSerializer",
 }
 
 CELERY_BEAT_SCHEDULE = {
-    "notify-overdue-borrowings": {
-        "task": "borrowing.tasks.notify_overdue_borrowings",
-        "schedule": schedule(3.0),
+    # Tick of the due-date timing wheel; an idle tick is one index probe
+    "fire-due-events": {
+        "task": "borrowing.tasks.fire_due_events",
+        "schedule": schedule(60.0),
+    },
+    "deliver-notifications": {
+        "task": "borrowing.tasks.deliver_notifications",
+        "schedule": schedule(5.0),
+    },
+    "process-stripe-events": {
+        "task": "payment.tasks.process_stripe_events",
+        "schedule": schedule(2.0),
+    },
+    "sample-queue-depth": {
+        "task": "core.task_metrics.sample_queue_depth",
+        "schedule": schedule(15.0),
+    },
+    "accrue-overdue-fines": {
+        "task": "payment.tasks.accrue_overdue_fines",
+        "schedule": crontab(hour=0, minute=30),
+    },
+    "create-missing-checkout-sessions": {
+        "task": "payment.tasks.create_missing_checkout_sessions",
+        "schedule": schedule(60.0),
+    },
+    # Keeps the blacklist cache marked ready; the marker outlives two runs
+    "rebuild-token-blacklist-cache": {
+        "task": "user.tasks.rebuild_token_blacklist_cache",
+        "schedule": schedule(3600.0),
+    },
+    "purge-expired-tokens": {
+        "task": "user.tasks.purge_expired_tokens",
+        "schedule": crontab(hour=1, minute=0),
     },
 }
 
 STRIPE_API_KEY = os.environ.get("STRIPE_API_KEY")
+STRIPE_ENDPOINT_SECRET = os.environ.get("STRIPE_ENDPOINT_SECRET")
+STRIPE_FAKE = os.getenv("STRIPE_FAKE", "False") == "True"
+STRIPE_SUCCESS_URL = os.environ.get(
+    "SUCCESS_URL", "http://localhost:8000/payment/success/"
+)
+STRIPE_CANCEL_URL = os.environ.get(
+    "CANCEL_URL", "http://localhost:8000/payment/cancel/"
+)
+
+# A day overdue costs this many times the book's daily price
+FINE_MULTIPLIER = os.environ.get("FINE_MULTIPLIER", "2")
+
+# Requests slower than this are logged with their SQL
+SLOW_REQUEST_SECONDS = float(os.environ.get("SLOW_REQUEST_SECONDS", 1.0))
+
+# Bearer token Prometheus sends to read /metrics; unset, /metrics refuses everyone
+METRICS_TOKEN = os.environ.get("METRICS_TOKEN") or None
+
+# Smaller responses are sent uncompressed: brotli or gzip would gain a few bytes
+COMPRESSION_MIN_SIZE = int(os.environ.get("COMPRESSION_MIN_SIZE", 1024))
 
 SPECTACULAR_SETTINGS = {
     "TITLE": "Library API",
@@ -177,3 +295,7 @@ SPECTACULAR_SETTINGS = {
     "VERSION": "1.0.0",
     "SERVE_INCLUDE_SCHEMA": False,
 }
+
+# Directory with a schema baked by `manage.py bake_schema`; unset, the schema
+# is generated on the first request to /api/schema/ and kept in memory
+OPENAPI_SCHEMA_DIR = os.environ.get("OPENAPI_SCHEMA_DIR") or None
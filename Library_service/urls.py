@@ -17,11 +17,39 @@ Including another URLconf
 
 from django.contrib import admin
 from django.urls import path, include
-from drf_spectacular.views import (
-    SpectacularAPIView,
-    SpectacularSwaggerView,
-    SpectacularRedocView,
-)
+from books.views import BookListView
+from borrowing.views import BorrowingViewSet
+from core.async_views import async_read_view
+from core.metrics import metrics_view
+from core.schema import CachedSchemaView
+from payment.views import PaymentViewSet
+from drf_spectacular.views import SpectacularSwaggerView, SpectacularRedocView
+
+# Асинхронні копії ендпоінтів читання для ASGI-сервера
+async_urlpatterns = [
+    path("book/", async_read_view(BookListView, "list"), name="books-list"),
+    path(
+        "book/<int:pk>/",
+        async_read_view(BookListView, "retrieve"),
+        name="books-detail",
+    ),
+    path(
+        "borrowing/",
+        async_read_view(BorrowingViewSet, "list"),
+        name="borrowing-list",
+    ),
+    path(
+        "borrowing/<int:pk>/",
+        async_read_view(BorrowingViewSet, "retrieve"),
+        name="borrowing-detail",
+    ),
+    path("payment/", async_read_view(PaymentViewSet, "list"), name="payment-list"),
+    path(
+        "payment/<int:pk>/checkout-status/",
+        async_read_view(PaymentViewSet, "checkout_status"),
+        name="payment-checkout-status",
+    ),
+]
 
 urlpatterns = [
     path("admin/", admin.site.urls),
@@ -29,7 +57,9 @@ urlpatterns = [
     path("book/", include("books.urls")),
     path("users/", include("user.urls")),
     path("payment/", include("payment.urls")),
-    path("api/schema/", SpectacularAPIView.as_view(), name="schema"),  # Схема OpenAPI
+    path("async/", include((async_urlpatterns, "async"))),
+    path("metrics", metrics_view, name="metrics"),  # Метрики Prometheus
+    path("api/schema/", CachedSchemaView.as_view(), name="schema"),  # Схема OpenAPI
     path(
         "api/schema/swagger-ui/",
         SpectacularSwaggerView.as_view(url_name="schema"),
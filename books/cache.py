@@ -0,0 +1,152 @@
+import hashlib
+import logging
+import time
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils.http import parse_http_date_safe
+from rest_framework.response import Response
+
+from core.conditional import not_modified_response, set_validators
+from core.db_router import use_primary
+
+logger = logging.getLogger(__name__)
+
+CATALOG_CACHE_TIMEOUT = 300
+VERSION_KEY = "books:catalog:version"
+HITS_KEY = "books:catalog:hits"
+MISSES_KEY = "books:catalog:misses"
+
+
+def _incr(key: str) -> int:
+    try:
+        return cache.incr(key)
+    except ValueError:
+        # incr fails on a missing key; add() keeps a concurrent first write intact
+        if cache.add(key, 1, timeout=None):
+            return 1
+        return cache.incr(key)
+
+
+def _count(key: str) -> None:
+    try:
+        _incr(key)
+    except Exception:
+        pass
+
+
+def get_catalog_version() -> int:
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        # A fresh version after eviction, so entries cached under the lost one never match
+        cache.add(VERSION_KEY, time.time_ns(), timeout=None)
+        version = cache.get(VERSION_KEY)
+    return version
+
+
+def _bump() -> None:
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        get_catalog_version()
+    except Exception:
+        logger.warning("Could not bump the catalog cache version.", exc_info=True)
+
+
+def bump_catalog_version() -> None:
+    """
+    Invalidate every cached catalog payload.
+    The bump runs immediately and again on commit: a reader that refilled
+    the cache from pre-commit rows in between is discarded by the second bump.
+    """
+    _bump()
+    transaction.on_commit(_bump)
+
+
+def catalog_cache_key(request, version: int) -> str:
+    digest = hashlib.sha1(request.build_absolute_uri().encode()).hexdigest()
+    return f"books:catalog:{version}:{digest}"
+
+
+def lookup_catalog_response(request):
+    """
+    Return (key, response) for this URL: the cached response, or None on a miss.
+    The payload is stored with its validators, so hits still answer 304.
+    The key is None when the cache is unavailable.
+    """
+    try:
+        key = catalog_cache_key(request, get_catalog_version())
+        entry = cache.get(key)
+    except Exception:
+        logger.warning("Catalog cache is unavailable.", exc_info=True)
+        return None, None
+
+    if entry is None:
+        _count(MISSES_KEY)
+        return key, None
+
+    _count(HITS_KEY)
+    data, etag, last_modified = entry
+    not_modified = not_modified_response(request, etag, last_modified)
+    if not_modified is not None:
+        return key, not_modified
+    return key, set_validators(Response(data), etag, last_modified)
+
+
+def store_catalog_response(key, response) -> None:
+    if key is None or response.status_code != 200:
+        return
+    entry = (
+        response.data,
+        response.headers.get("ETag"),
+        parse_http_date_safe(response.headers.get("Last-Modified")),
+    )
+    try:
+        cache.set(key, entry, CATALOG_CACHE_TIMEOUT)
+    except Exception:
+        logger.warning("Could not store a catalog payload.", exc_info=True)
+
+
+def cached_catalog_response(request, build_response) -> Response:
+    """
+    Serve the serialized payload for this URL from the cache, or build and store it.
+    Payloads are built from the primary, so an entry is never older than its version.
+    Any cache failure falls back to the database, and so does a cache that
+    is not shared: other processes would never see its version bumps.
+    """
+    if not settings.SHARED_CACHE:
+        return build_response()
+    key, response = lookup_catalog_response(request)
+    if response is None:
+        # A lagging replica could store pre-bump rows under the new version
+        with use_primary():
+            response = build_response()
+        store_catalog_response(key, response)
+    return response
+
+
+async def acached_catalog_response(request, build_response) -> Response:
+    """cached_catalog_response for async views; `build_response` is awaited."""
+    if not settings.SHARED_CACHE:
+        return await build_response()
+    key, response = await sync_to_async(lookup_catalog_response)(request)
+    if response is None:
+        with use_primary():
+            response = await build_response()
+        await sync_to_async(store_catalog_response)(key, response)
+    return response
+
+
+def catalog_cache_stats() -> dict:
+    values = cache.get_many([VERSION_KEY, HITS_KEY, MISSES_KEY])
+    hits = values.get(HITS_KEY, 0)
+    misses = values.get(MISSES_KEY, 0)
+    total = hits + misses
+    return {
+        "version": values.get(VERSION_KEY),
+        "hits": hits,
+        "misses": misses,
+        "hit_ratio": round(hits / total, 4) if total else None,
+    }
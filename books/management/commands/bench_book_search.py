@@ -0,0 +1,164 @@
+import re
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.db.models import Q
+
+from books.models import Book
+from books.search import search_books, trigram_available
+
+SCAN_NODE = re.compile(
+    r"((?:Bitmap |Parallel )?(?:Index Only |Index |Seq )Scan)(?: using| on) (\w+)"
+)
+
+WORDS = [
+    "shadow",
+    "river",
+    "empire",
+    "garden",
+    "winter",
+    "silver",
+    "kingdom",
+    "voyage",
+    "secret",
+    "forest",
+    "machine",
+    "ocean",
+    "crown",
+    "memory",
+    "harbor",
+    "storm",
+    "dream",
+    "castle",
+    "desert",
+    "island",
+    "ember",
+    "frontier",
+    "lantern",
+    "mirror",
+]
+FIRST_NAMES = [
+    "Anna",
+    "Oleh",
+    "Maria",
+    "Taras",
+    "Iryna",
+    "Bohdan",
+    "Olena",
+    "Andrii",
+    "Sofia",
+    "Dmytro",
+    "Kateryna",
+    "Mykola",
+    "Yulia",
+    "Serhii",
+    "Nadia",
+    "Ivan",
+]
+LAST_NAMES = [
+    "Tolkien",
+    "Herbert",
+    "Kovalenko",
+    "Shevchenko",
+    "Bondarenko",
+    "Melnyk",
+    "Tkachenko",
+    "Kravchenko",
+    "Oliinyk",
+    "Lysenko",
+    "Moroz",
+    "Rudenko",
+    "Savchenko",
+    "Marchenko",
+    "Petrenko",
+    "Hrytsenko",
+]
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare index-backed book search with a sequential icontains scan "
+        "on a generated catalog. Everything runs in a transaction that is "
+        "rolled back, so the database is left untouched."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--books", type=int, default=1_000_000)
+        parser.add_argument("--repeat", type=int, default=5)
+        parser.add_argument(
+            "--query",
+            action="append",
+            dest="queries",
+            help="Search text to time; may be given several times.",
+        )
+
+    def handle(self, *args, **options):
+        queries = options["queries"] or ["lantern", "tolkien", "frontier mirror"]
+        if trigram_available():
+            queries.append("Shevcenko")
+
+        with transaction.atomic():
+            started = time.perf_counter()
+            self.generate_catalog(options["books"])
+            self.stdout.write(
+                f"Generated {options['books']} books in "
+                f"{time.perf_counter() - started:.1f}s"
+            )
+
+            for text in queries:
+                indexed = search_books(Book.objects.all(), text)[:20]
+                scan = Book.objects.filter(
+                    Q(title__icontains=text) | Q(author__icontains=text)
+                ).order_by("id")[:20]
+                self.stdout.write(f"\nquery={text!r}")
+                self.report("search", indexed, options["repeat"])
+                self.report("icontains", scan, options["repeat"])
+
+            transaction.set_rollback(True)
+
+    def generate_catalog(self, count):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                """
+                INSERT INTO books_book
+                    (title, author, cover, inventory, daily_price, updated_at)
+                SELECT
+                    initcap((%(words)s)[1 + (i * 7) %% %(word_count)s]) || ' of the '
+                        || initcap((%(words)s)[1 + (i / 13) %% %(word_count)s])
+                        || ' #' || i,
+                    (%(first)s)[1 + (i * 3) %% %(first_count)s] || ' '
+                        || (%(last)s)[1 + (i / 5) %% %(last_count)s],
+                    CASE WHEN i %% 2 = 0 THEN 'HARD' ELSE 'SOFT' END,
+                    1 + i %% 10,
+                    round((0.5 + (i %% 50) / 10.0)::numeric, 2),
+                    now()
+                FROM generate_series(1, %(count)s) AS i
+                """,
+                {
+                    "words": WORDS,
+                    "word_count": len(WORDS),
+                    "first": FIRST_NAMES,
+                    "first_count": len(FIRST_NAMES),
+                    "last": LAST_NAMES,
+                    "last_count": len(LAST_NAMES),
+                    "count": count,
+                },
+            )
+            cursor.execute("ANALYZE books_book")
+
+    def report(self, label, queryset, repeat):
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            rows = list(queryset.all())
+            timings.append((time.perf_counter() - started) * 1000)
+        scans = sorted(
+            {" ".join(node) for node in SCAN_NODE.findall(queryset.explain())}
+        )
+        self.stdout.write(
+            f"  {label:<10} rows={len(rows):<3} "
+            f"median={statistics.median(timings):8.2f}ms "
+            f"max={max(timings):8.2f}ms plan={', '.join(scans)}"
+        )
@@ -0,0 +1,52 @@
+import sys
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from books.importer import import_books, read_rows
+
+FORMATS = {".csv": "csv", ".ndjson": "ndjson", ".jsonl": "ndjson"}
+
+
+class Command(BaseCommand):
+    help = (
+        "Stream books from a CSV or NDJSON file and upsert them on "
+        "(title, author, cover). Use '-' to read from stdin."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path")
+        parser.add_argument(
+            "--format",
+            choices=sorted(set(FORMATS.values())),
+            help="Defaults to the file extension.",
+        )
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        file_format = options["format"] or FORMATS.get(Path(path).suffix.lower())
+        if file_format is None:
+            raise CommandError("Cannot tell the format from the path, pass --format.")
+
+        if path == "-":
+            report = self.run(sys.stdin, file_format, options["batch_size"])
+        else:
+            try:
+                with open(path, encoding="utf-8", newline="") as lines:
+                    report = self.run(lines, file_format, options["batch_size"])
+            except OSError as error:
+                raise CommandError(error)
+
+        for error in report.errors:
+            self.stderr.write(f"line {error['line']}: {error['errors']}")
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Written {report.written} books, rejected {report.rejected} "
+                f"in {report.elapsed:.1f}s ({report.rows_per_second} rows/s)"
+            )
+        )
+
+    @staticmethod
+    def run(lines, file_format, batch_size):
+        return import_books(read_rows(lines, file_format), batch_size=batch_size)
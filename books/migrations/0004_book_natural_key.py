@@ -0,0 +1,19 @@
+# Generated by Django 5.1.3 on 2026-10-18 19:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("books", "0003_book_updated_at"),
+    ]
+
+    operations = [
+        migrations.AddConstraint(
+            model_name="book",
+            constraint=models.UniqueConstraint(
+                fields=("title", "author", "cover"), name="book_natural_key"
+            ),
+        ),
+    ]
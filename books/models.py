@@ -1,7 +1,35 @@
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
+from django.db.models import F
+from django.db.models.functions import Now
 from django.core.validators import MinValueValidator
 from decimal import Decimal
 
+from books.cache import bump_catalog_version
+from books.search import book_search_vector
+
+
+class BookQuerySet(models.QuerySet):
+    def reserve(self, book_id) -> bool:
+        """
+        Take one copy of the book off the shelf with a single conditional UPDATE.
+        Returns False when no copy is left, i.e. the caller lost the race.
+        """
+        reserved = bool(
+            self.filter(pk=book_id, inventory__gt=0).update(
+                inventory=F("inventory") - 1, updated_at=Now()
+            )
+        )
+        if reserved:
+            bump_catalog_version()
+        return reserved
+
+    def release(self, book_id) -> None:
+        """Put one copy of the book back on the shelf."""
+        self.filter(pk=book_id).update(inventory=F("inventory") + 1, updated_at=Now())
+        bump_catalog_version()
+
 
 class Book(models.Model):
     class CoverType(models.TextChoices):
@@ -17,6 +45,27 @@ class Book(models.Model):
         decimal_places=2,
         validators=[MinValueValidator(Decimal("0.01"))],
     )
+    updated_at = models.DateTimeField(auto_now=True)
+
+    # Stored so ranking reads the vector instead of re-parsing title and author
+    search_vector = models.GeneratedField(
+        expression=book_search_vector(),
+        output_field=SearchVectorField(),
+        db_persist=True,
+    )
+
+    objects = BookQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            GinIndex(fields=["search_vector"], name="book_search_vector_idx"),
+        ]
+        constraints = [
+            # Natural key that bulk imports upsert on
+            models.UniqueConstraint(
+                fields=["title", "author", "cover"], name="book_natural_key"
+            ),
+        ]
 
     def __str__(self) -> str:
         return f"{self.title} by {self.author} ({self.get_cover_display()})"
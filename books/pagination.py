@@ -0,0 +1,15 @@
+from rest_framework.pagination import PageNumberPagination
+
+from core.pagination import KeysetPagination
+
+
+class BookPagination(KeysetPagination):
+    ordering = ("id",)
+
+
+class BookSearchPagination(PageNumberPagination):
+    """Search results are ordered by rank, which has no stable keyset."""
+
+    page_size = 20
+    page_size_query_param = "page_size"
+    max_page_size = 100
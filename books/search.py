@@ -0,0 +1,40 @@
+from functools import cache
+
+from django.contrib.postgres.search import (
+    SearchQuery,
+    SearchRank,
+    SearchVector,
+    TrigramWordSimilarity,
+)
+from django.db import connection
+from django.db.models import F, Q
+
+SEARCH_CONFIG = "english"
+
+
+def book_search_vector():
+    """Expression behind the stored Book.search_vector column."""
+    return SearchVector("title", "author", config=SEARCH_CONFIG)
+
+
+@cache
+def trigram_available() -> bool:
+    """pg_trgm is contrib, so some Postgres builds and managed services lack it."""
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+        return cursor.fetchone() is not None
+
+
+def search_books(queryset, text: str):
+    """
+    Rank books by full-text match on title and author.
+    With pg_trgm installed, also match authors by trigram word similarity so
+    typos like "Tolkein" still find "Tolkien". Both branches are GIN-indexed.
+    """
+    query = SearchQuery(text, config=SEARCH_CONFIG, search_type="websearch")
+    match = Q(search_vector=query)
+    rank = SearchRank(F("search_vector"), query)
+    if trigram_available():
+        match |= Q(author__trigram_word_similar=text)
+        rank = rank + TrigramWordSimilarity(text, "author")
+    return queryset.filter(match).annotate(rank=rank).order_by("-rank", "id")
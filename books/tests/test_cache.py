@@ -0,0 +1,111 @@
+from decimal import Decimal
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import override_settings
+from rest_framework import status
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import AccessToken
+
+from books.cache import get_catalog_version
+from books.models import Book
+
+User = get_user_model()
+
+
+@override_settings(SHARED_CACHE=True)
+class CatalogCacheTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.book = Book.objects.create(
+            title="Dune",
+            author="Frank Herbert",
+            cover=Book.CoverType.HARD,
+            inventory=3,
+            daily_price=Decimal("1.50"),
+        )
+
+    def test_repeated_reads_are_served_from_cache(self):
+        first = self.client.get(f"/book/{self.book.id}/")
+        with self.assertNumQueries(0):
+            second = self.client.get(f"/book/{self.book.id}/")
+        self.assertEqual(first.data, second.data)
+
+    @override_settings(SHARED_CACHE=False)
+    def test_per_process_cache_is_not_used(self):
+        self.client.get(f"/book/{self.book.id}/")
+        # Another process saved the book: its version bump never reaches this one
+        with patch("books.cache._bump"):
+            self.book.title = "Dune Messiah"
+            self.book.save()
+
+        response = self.client.get(f"/book/{self.book.id}/")
+        self.assertEqual(response.data["title"], "Dune Messiah")
+
+    def test_save_invalidates_cached_payloads(self):
+        self.client.get(f"/book/{self.book.id}/")
+        self.book.title = "Dune Messiah"
+        self.book.save()
+
+        response = self.client.get(f"/book/{self.book.id}/")
+        self.assertEqual(response.data["title"], "Dune Messiah")
+
+    def test_delete_invalidates_cached_list(self):
+        self.client.get("/book/")
+        self.book.delete()
+
+        response = self.client.get("/book/")
+        self.assertEqual(response.data["results"], [])
+
+    def test_inventory_changes_bump_version(self):
+        version = get_catalog_version()
+        self.assertTrue(Book.objects.reserve(self.book.id))
+        self.assertGreater(get_catalog_version(), version)
+
+        version = get_catalog_version()
+        Book.objects.release(self.book.id)
+        self.assertGreater(get_catalog_version(), version)
+
+    def test_failed_reserve_keeps_version(self):
+        Book.objects.filter(pk=self.book.id).update(inventory=0)
+        version = get_catalog_version()
+        self.assertFalse(Book.objects.reserve(self.book.id))
+        self.assertEqual(get_catalog_version(), version)
+
+    def test_not_found_is_not_cached(self):
+        self.client.get("/book/999999/")
+        with self.assertNumQueries(1):
+            response = self.client.get("/book/999999/")
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_unavailable_cache_falls_back_to_database(self):
+        with patch("books.cache.cache.get", side_effect=ConnectionError("down")):
+            with self.assertLogs("books.cache", "WARNING"):
+                response = self.client.get(f"/book/{self.book.id}/")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["title"], "Dune")
+
+    def test_cache_stats_count_hits_and_misses(self):
+        admin = User.objects.create_superuser(
+            email="admin@example.com", password="password"
+        )
+        self.client.get(f"/book/{self.book.id}/")
+        self.client.get(f"/book/{self.book.id}/")
+
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(admin)}"
+        )
+        response = self.client.get("/book/cache-stats/")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["hits"], 1)
+        self.assertEqual(response.data["misses"], 1)
+        self.assertEqual(response.data["hit_ratio"], 0.5)
+
+    def test_cache_stats_are_staff_only(self):
+        user = User.objects.create_user(email="user@example.com", password="password")
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(user)}"
+        )
+        response = self.client.get("/book/cache-stats/")
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
@@ -0,0 +1,128 @@
+import io
+import json
+import tempfile
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from rest_framework import status
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import AccessToken
+
+from books.cache import get_catalog_version
+from books.importer import import_books, read_rows
+from books.models import Book
+
+User = get_user_model()
+
+CSV = """title,author,cover,inventory,daily_price
+Dune,Frank Herbert,HARD,3,1.50
+The Hobbit,J. R. R. Tolkien,SOFT,5,0.99
+Broken,Nobody,PAPER,1,1.00
+Free,Nobody,SOFT,0,1.00
+"""
+
+
+class ImportBooksTests(APITestCase):
+    def test_imports_valid_rows_and_reports_rejected(self):
+        report = import_books(read_rows(io.StringIO(CSV), "csv"))
+
+        self.assertEqual(report.written, 2)
+        self.assertEqual(report.rejected, 2)
+        self.assertEqual([error["line"] for error in report.errors], [4, 5])
+        self.assertIn("cover", report.errors[0]["errors"])
+        self.assertIn("inventory", report.errors[1]["errors"])
+        self.assertCountEqual(
+            Book.objects.values_list("title", flat=True), ["Dune", "The Hobbit"]
+        )
+
+    def test_upserts_on_natural_key(self):
+        book = Book.objects.create(
+            title="Dune",
+            author="Frank Herbert",
+            cover=Book.CoverType.HARD,
+            inventory=1,
+            daily_price=Decimal("9.99"),
+        )
+        import_books(read_rows(io.StringIO(CSV), "csv"))
+
+        book.refresh_from_db()
+        self.assertEqual(book.inventory, 3)
+        self.assertEqual(book.daily_price, Decimal("1.50"))
+        self.assertEqual(Book.objects.filter(title="Dune").count(), 1)
+
+    def test_last_duplicate_in_a_batch_wins(self):
+        lines = [
+            json.dumps(
+                {
+                    "title": "Dune",
+                    "author": "Frank Herbert",
+                    "cover": "HARD",
+                    "inventory": inventory,
+                    "daily_price": "1.50",
+                }
+            )
+            for inventory in (1, 2, 3)
+        ]
+        report = import_books(read_rows(lines, "ndjson"), batch_size=2)
+
+        self.assertEqual(report.rejected, 0)
+        self.assertEqual(Book.objects.get().inventory, 3)
+
+    def test_invalid_json_lines_are_rejected(self):
+        lines = ["not json\n", "\n", "[1, 2]\n"]
+        report = import_books(read_rows(lines, "ndjson"))
+
+        self.assertEqual(report.written, 0)
+        self.assertEqual([error["line"] for error in report.errors], [1, 3])
+
+    def test_import_bumps_catalog_version(self):
+        version = get_catalog_version()
+        import_books(read_rows(io.StringIO(CSV), "csv"))
+        self.assertGreater(get_catalog_version(), version)
+
+    def test_management_command(self):
+        with tempfile.NamedTemporaryFile("w", suffix=".csv") as file:
+            file.write(CSV)
+            file.flush()
+            out, err = io.StringIO(), io.StringIO()
+            call_command("import_books", file.name, stdout=out, stderr=err)
+
+        self.assertIn("Written 2 books, rejected 2", out.getvalue())
+        self.assertIn("line 4:", err.getvalue())
+        self.assertEqual(Book.objects.count(), 2)
+
+
+class ImportEndpointTests(APITestCase):
+    def setUp(self):
+        self.admin = User.objects.create_superuser(
+            email="admin@example.com", password="password"
+        )
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(self.admin)}"
+        )
+
+    def test_staff_can_stream_csv(self):
+        response = self.client.post(
+            "/book/import/", data=CSV.encode(), content_type="text/csv"
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["written"], 2)
+        self.assertEqual(response.data["rejected"], 2)
+        self.assertEqual(Book.objects.count(), 2)
+
+    def test_unsupported_content_type(self):
+        response = self.client.post("/book/import/", {"title": "Dune"}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_415_UNSUPPORTED_MEDIA_TYPE)
+
+    def test_non_staff_cannot_import(self):
+        user = User.objects.create_user(email="user@example.com", password="password")
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(user)}"
+        )
+        response = self.client.post(
+            "/book/import/", data=CSV.encode(), content_type="text/csv"
+        )
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertFalse(Book.objects.exists())
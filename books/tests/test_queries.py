@@ -0,0 +1,54 @@
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import override_settings
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import AccessToken
+
+from books.models import Book
+
+User = get_user_model()
+
+
+class BookQueryBudgetTests(APITestCase):
+    """Each endpoint runs a fixed number of queries however many rows it returns."""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            email="user@example.com", password="password"
+        )
+        Book.objects.bulk_create(
+            Book(
+                title=f"Book {number}",
+                author="Author",
+                cover=Book.CoverType.SOFT,
+                inventory=5,
+                daily_price=Decimal("1.00"),
+            )
+            for number in range(30)
+        )
+        self.book = Book.objects.first()
+
+    def test_list_as_anonymous_user(self):
+        with self.assertNumQueries(1):
+            self.client.get("/book/")
+
+    def test_list_as_authenticated_user(self):
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(self.user)}"
+        )
+        # User lookup for the token, then the page
+        with self.assertNumQueries(2):
+            self.client.get("/book/")
+
+    def test_retrieve(self):
+        with self.assertNumQueries(1):
+            self.client.get(f"/book/{self.book.id}/")
+
+    @override_settings(SHARED_CACHE=True)
+    def test_cached_list_skips_the_database(self):
+        self.client.get("/book/")
+        with self.assertNumQueries(0):
+            self.client.get("/book/")
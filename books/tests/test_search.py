@@ -0,0 +1,78 @@
+from decimal import Decimal
+from django.db import connection
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from books.models import Book
+from books.search import search_books, trigram_available
+
+
+def pg_trgm_installed():
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'")
+        return cursor.fetchone() is not None
+
+
+class BookSearchTests(APITestCase):
+    def setUp(self):
+        def book(title, author):
+            return Book.objects.create(
+                title=title,
+                author=author,
+                cover=Book.CoverType.HARD,
+                inventory=3,
+                daily_price=Decimal("2.00"),
+            )
+
+        self.hobbit = book("The Hobbit", "J. R. R. Tolkien")
+        self.rings = book("The Lord of the Rings", "J. R. R. Tolkien")
+        self.dune = book("Dune", "Frank Herbert")
+        self.children = book("Children of Dune", "Frank Herbert")
+        self.dragons = book("Dragons of Tolkien's World", "Jonathan Evans")
+
+    def search(self, text):
+        response = self.client.get("/book/", {"search": text})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [book["id"] for book in response.data["results"]]
+
+    def test_matches_title(self):
+        self.assertCountEqual(self.search("dune"), [self.dune.id, self.children.id])
+
+    def test_matches_author(self):
+        ids = self.search("herbert")
+        self.assertCountEqual(ids, [self.dune.id, self.children.id])
+
+    def test_stemmed_words_match(self):
+        self.assertEqual(self.search("hobbits"), [self.hobbit.id])
+
+    def test_results_are_ranked(self):
+        ids = self.search("tolkien")
+        # Author matches rank above a passing mention in the title
+        self.assertEqual(ids[-1], self.dragons.id)
+        self.assertCountEqual(ids[:2], [self.hobbit.id, self.rings.id])
+
+    def test_no_match(self):
+        self.assertEqual(self.search("asimov"), [])
+
+    def test_search_results_are_paged(self):
+        response = self.client.get("/book/", {"search": "tolkien", "page_size": 1})
+        self.assertEqual(response.data["count"], 3)
+        self.assertEqual(len(response.data["results"]), 1)
+        self.assertIsNotNone(response.data["next"])
+
+    def test_blank_search_lists_everything(self):
+        response = self.client.get("/book/", {"search": "  "})
+        self.assertEqual(len(response.data["results"]), 5)
+
+    def test_full_text_branch_can_use_the_gin_index(self):
+        with connection.cursor() as cursor:
+            cursor.execute("SET LOCAL enable_seqscan = off")
+        plan = search_books(Book.objects.all(), "dune").explain()
+        self.assertIn("book_search_vector_idx", plan)
+
+    def test_author_typos_are_tolerated(self):
+        if not trigram_available():
+            self.skipTest("pg_trgm is not available on this server")
+        ids = self.search("Tolkein")
+        self.assertIn(self.hobbit.id, ids)
+        self.assertIn(self.rings.id, ids)
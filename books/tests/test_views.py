@@ -45,13 +45,13 @@ class BookListViewTests(APITestCase):
     def test_list_books_as_anonymous_user(self):
         response = self.client.get("/book/")
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 2)
+        self.assertEqual(len(response.data["results"]), 2)
 
     def test_list_books_as_authenticated_user(self):
         self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {self.user_token}")
         response = self.client.get("/book/")
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 2)
+        self.assertEqual(len(response.data["results"]), 2)
 
     def test_retrieve_book_as_anonymous_user(self):
         response = self.client.get(f"/book/{self.book1.id}/")
@@ -1,9 +1,30 @@
 from rest_framework import permissions, viewsets
-from rest_framework_simplejwt.authentication import JWTAuthentication
-from drf_spectacular.utils import extend_schema, extend_schema_view
+from rest_framework.decorators import action
+from rest_framework.exceptions import ParseError, UnsupportedMediaType
+from rest_framework.response import Response
+from drf_spectacular.types import OpenApiTypes
+from drf_spectacular.utils import extend_schema, extend_schema_view, OpenApiParameter
 
+from core.async_views import AsyncReadMixin
+from core.conditional import ConditionalGetMixin
+from core.values import ValuesListMixin
+from books.cache import (
+    acached_catalog_response,
+    cached_catalog_response,
+    catalog_cache_stats,
+)
+from books.importer import import_books, read_rows
 from books.models import Book
+from books.pagination import BookPagination, BookSearchPagination
+from books.search import search_books
 from books.serializers import BookSerializer, BookDetailSerializer, BookListSerializer
+from user.authentication import CachedJWTAuthentication
+
+IMPORT_CONTENT_TYPES = {
+    "text/csv": "csv",
+    "application/x-ndjson": "ndjson",
+    "application/jsonl": "ndjson",
+}
 
 
 class IsAdminOrReadOnly(permissions.BasePermission):
@@ -22,7 +43,21 @@ class IsAdminOrReadOnly(permissions.BasePermission):
 @extend_schema_view(
     list=extend_schema(
         summary="List all books",
-        description="Retrieve a list of all books with minimal details.",
+        description=(
+            "Retrieve a list of all books with minimal details. "
+            "With `search`, return books ranked by relevance instead."
+        ),
+        parameters=[
+            OpenApiParameter(
+                name="search",
+                description=(
+                    "Full-text search over title and author, "
+                    "tolerant to typos in the author name"
+                ),
+                required=False,
+                type=str,
+            ),
+        ],
         responses={200: BookListSerializer(many=True)},
     ),
     retrieve=extend_schema(
@@ -53,16 +88,41 @@ class IsAdminOrReadOnly(permissions.BasePermission):
         description="Delete a book. Only accessible to admin users.",
         responses={204: None},
     ),
+    bulk_import=extend_schema(
+        summary="Bulk import books",
+        description=(
+            "Stream a CSV or NDJSON body (`text/csv` or `application/x-ndjson`) "
+            "with title, author, cover, inventory and daily_price. Rows are "
+            "validated like single creates and upserted on (title, author, cover). "
+            "Only accessible to admin users."
+        ),
+        request={
+            "text/csv": OpenApiTypes.STR,
+            "application/x-ndjson": OpenApiTypes.STR,
+        },
+        responses={200: OpenApiTypes.OBJECT},
+    ),
+    cache_stats=extend_schema(
+        summary="Catalog cache statistics",
+        description=(
+            "Current catalog version and hit/miss counters of the book cache. "
+            "Only accessible to admin users."
+        ),
+        responses={200: OpenApiTypes.OBJECT},
+    ),
 )
-class BookListView(viewsets.ModelViewSet):
+class BookListView(
+    AsyncReadMixin, ValuesListMixin, ConditionalGetMixin, viewsets.ModelViewSet
+):
     """
     API endpoint that allows books to be viewed or edited.
     - Read-only access for all users.
     - Create, update, and delete access for admin users only.
     """
 
-    authentication_classes = [JWTAuthentication]
+    authentication_classes = [CachedJWTAuthentication]
     permission_classes = [IsAdminOrReadOnly]
+    pagination_class = BookPagination
     queryset = Book.objects.all()
     serializer_class = BookSerializer
     action_serializer_classes = {
@@ -76,9 +136,81 @@ class BookListView(viewsets.ModelViewSet):
         """
         return self.action_serializer_classes.get(self.action, self.serializer_class)
 
+    @property
+    def paginator(self):
+        """
+        Ranked search results are paged by page number, everything else by keyset.
+        """
+        if not hasattr(self, "_paginator"):
+            if self.search_text:
+                self._paginator = BookSearchPagination()
+            else:
+                self._paginator = self.pagination_class()
+        return self._paginator
+
+    @property
+    def search_text(self):
+        if self.action != "list":
+            return None
+        return self.request.query_params.get("search", "").strip() or None
+
+    def list(self, request, *args, **kwargs):
+        # Серіалізовані сторінки каталогу беремо з кешу
+        return cached_catalog_response(
+            request, lambda: super(BookListView, self).list(request, *args, **kwargs)
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        return cached_catalog_response(
+            request,
+            lambda: super(BookListView, self).retrieve(request, *args, **kwargs),
+        )
+
+    async def alist(self, request, **kwargs):
+        return await acached_catalog_response(
+            request, lambda: super(BookListView, self).alist(request, **kwargs)
+        )
+
+    async def aretrieve(self, request, **kwargs):
+        return await acached_catalog_response(
+            request, lambda: super(BookListView, self).aretrieve(request, **kwargs)
+        )
+
+    @action(
+        detail=False,
+        methods=["post"],
+        url_path="import",
+        permission_classes=[permissions.IsAdminUser],
+    )
+    def bulk_import(self, request):
+        file_format = IMPORT_CONTENT_TYPES.get(request.content_type.split(";")[0])
+        if file_format is None:
+            raise UnsupportedMediaType(request.content_type)
+
+        # Тіло читаємо потоком, не завантажуючи файл у пам'ять
+        lines = (line.decode("utf-8") for line in request.stream or ())
+        try:
+            report = import_books(read_rows(lines, file_format))
+        except UnicodeDecodeError:
+            raise ParseError("The body must be UTF-8 encoded.")
+        return Response(report.as_dict())
+
+    @action(
+        detail=False,
+        methods=["get"],
+        url_path="cache-stats",
+        permission_classes=[permissions.IsAdminUser],
+    )
+    def cache_stats(self, request):
+        return Response(catalog_cache_stats())
+
     def get_queryset(self):
         """
         Return the queryset for the books.
         - All books are available for viewing.
+        - `search` filters and ranks the list by relevance.
         """
-        return super().get_queryset()
+        queryset = super().get_queryset()
+        if self.search_text:
+            queryset = search_books(queryset, self.search_text)
+        return queryset
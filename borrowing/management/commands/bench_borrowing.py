@@ -0,0 +1,105 @@
+import threading
+import time
+import uuid
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from rest_framework.exceptions import ValidationError
+
+from books.models import Book
+from borrowing.serializers import BorrowingCreateSerializer
+
+
+class Command(BaseCommand):
+    help = (
+        "Fire parallel borrows at a single book and report throughput "
+        "and whether the inventory was oversold."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, default=16)
+        parser.add_argument("--attempts", type=int, default=400)
+        parser.add_argument("--inventory", type=int, default=100)
+
+    def handle(self, *args, **options):
+        workers = options["workers"]
+        attempts = options["attempts"]
+        inventory = options["inventory"]
+
+        marker = uuid.uuid4().hex[:8]
+        user = get_user_model().objects.create_user(
+            email=f"bench-{marker}@example.com", password=None
+        )
+        book = Book.objects.create(
+            title=f"Benchmark {marker}",
+            author="Benchmark",
+            cover=Book.CoverType.SOFT,
+            inventory=inventory,
+            daily_price=Decimal("1.00"),
+        )
+        data = {
+            "book": book.pk,
+            "user": user.pk,
+            "borrow_date": date.today(),
+            "expected_return_date": date.today() + timedelta(days=7),
+        }
+
+        results = {"borrowed": 0, "out_of_stock": 0}
+        lock = threading.Lock()
+        barrier = threading.Barrier(workers)
+
+        def worker(count):
+            borrowed = out_of_stock = 0
+            try:
+                barrier.wait()
+                for _ in range(count):
+                    serializer = BorrowingCreateSerializer(data=data)
+                    try:
+                        serializer.is_valid(raise_exception=True)
+                        serializer.save(user=user)
+                        borrowed += 1
+                    except ValidationError as error:
+                        if "out of stock" not in str(error.detail):
+                            raise
+                        out_of_stock += 1
+            finally:
+                connection.close()
+            with lock:
+                results["borrowed"] += borrowed
+                results["out_of_stock"] += out_of_stock
+
+        per_worker, extra = divmod(attempts, workers)
+        threads = [
+            threading.Thread(target=worker, args=(per_worker + (i < extra),))
+            for i in range(workers)
+        ]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+
+        book.refresh_from_db()
+        borrowings = book.borrowings.count()
+        book.delete()
+        user.delete()
+
+        self.stdout.write(
+            f"workers={workers} attempts={attempts} inventory={inventory}\n"
+            f"borrowed={results['borrowed']} out_of_stock={results['out_of_stock']} "
+            f"rows={borrowings} remaining={book.inventory}\n"
+            f"elapsed={elapsed:.3f}s throughput={attempts / elapsed:.1f} req/s"
+        )
+
+        expected = min(attempts, inventory)
+        if (
+            results["borrowed"] != expected
+            or borrowings != expected
+            or book.inventory != inventory - expected
+        ):
+            raise CommandError("Inventory was oversold or lost updates.")
+        self.stdout.write(self.style.SUCCESS("No overselling detected."))
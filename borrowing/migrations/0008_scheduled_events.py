@@ -0,0 +1,91 @@
+# Generated by Django 5.1.3 on 2026-10-18 20:28
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def schedule_active_borrowings(apps, schema_editor):
+    """Events for the borrowings the old poll was watching, same as new ones get."""
+    schema_editor.execute(
+        """
+        INSERT INTO borrowing_scheduledevent (borrowing_id, type, fire_at)
+        SELECT b.id, e.type, e.fire_at
+        FROM borrowing_borrowing AS b
+        CROSS JOIN LATERAL (
+            VALUES
+                (
+                    'OVERDUE',
+                    GREATEST(
+                        ((b.expected_return_date + 1) + time '09:00') AT TIME ZONE %s,
+                        b.overdue_notified_at + interval '1 day'
+                    )
+                ),
+                (
+                    'REMINDER',
+                    ((b.expected_return_date - 1) + time '09:00') AT TIME ZONE %s
+                )
+        ) AS e (type, fire_at)
+        WHERE b.actual_return_date IS NULL
+            AND (e.type = 'OVERDUE' OR e.fire_at > now())
+        ON CONFLICT (borrowing_id, type) DO NOTHING
+        """,
+        [settings.TIME_ZONE, settings.TIME_ZONE],
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("borrowing", "0007_hot_query_indexes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ScheduledEvent",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "type",
+                    models.CharField(
+                        choices=[("REMINDER", "Reminder"), ("OVERDUE", "Overdue")],
+                        max_length=10,
+                    ),
+                ),
+                ("fire_at", models.DateTimeField()),
+            ],
+        ),
+        migrations.RemoveIndex(
+            model_name="borrowing",
+            name="borrowing_overdue_idx",
+        ),
+        migrations.AddField(
+            model_name="scheduledevent",
+            name="borrowing",
+            field=models.ForeignKey(
+                db_index=False,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="scheduled_events",
+                to="borrowing.borrowing",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="scheduledevent",
+            index=models.Index(fields=["fire_at"], name="scheduled_event_fire_at_idx"),
+        ),
+        migrations.AddConstraint(
+            model_name="scheduledevent",
+            constraint=models.UniqueConstraint(
+                fields=("borrowing", "type"), name="scheduled_event_borrowing_type"
+            ),
+        ),
+        migrations.RunPython(schedule_active_borrowings, migrations.RunPython.noop),
+    ]
@@ -1,6 +1,7 @@
 from decimal import Decimal
 from django.db import models
-from django.db.models import F
+from django.db.models import F, Q
+from django.utils import timezone
 from books.models import Book
 from payment.models import Payment
 
@@ -22,6 +23,31 @@ class Borrowing(models.Model):
         null=True,
         blank=True,
     )
+    overdue_notified_at = models.DateTimeField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            # Keyset pagination: newest borrowings first, overall and per user
+            models.Index(
+                fields=["borrow_date", "id"], name="borrowing_borrow_date_id_idx"
+            ),
+            models.Index(
+                fields=["user", "borrow_date", "id"],
+                name="borrowing_user_date_id_idx",
+            ),
+            # Active (not returned) borrowings: is_active=true lists, overall and per user
+            models.Index(
+                fields=["user", "borrow_date", "id"],
+                name="borrowing_active_user_idx",
+                condition=Q(actual_return_date__isnull=True),
+            ),
+            models.Index(
+                fields=["borrow_date", "id"],
+                name="borrowing_active_date_idx",
+                condition=Q(actual_return_date__isnull=True),
+            ),
+        ]
 
     def calculate_total_price(self) -> Decimal:
         """Calculate the total price for borrowing based on the duration and daily price."""
@@ -37,3 +63,72 @@ class Borrowing(models.Model):
 
     def __str__(self) -> str:
         return f"Borrowing: {self.book.title} by {self.user.username}"
+
+
+class ScheduledEvent(models.Model):
+    """
+    A due-date event of a borrowing, waiting in a timing-wheel table until fire_at.
+    Fired reminders are deleted; overdue events move on to their next reminder.
+    """
+
+    class EventType(models.TextChoices):
+        REMINDER = "REMINDER", "Reminder"
+        OVERDUE = "OVERDUE", "Overdue"
+
+    # The unique (borrowing, type) index serves lookups by borrowing
+    borrowing = models.ForeignKey(
+        Borrowing,
+        on_delete=models.CASCADE,
+        related_name="scheduled_events",
+        db_index=False,
+    )
+    type = models.CharField(max_length=10, choices=EventType.choices)
+    fire_at = models.DateTimeField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["borrowing", "type"], name="scheduled_event_borrowing_type"
+            ),
+        ]
+        indexes = [
+            models.Index(fields=["fire_at"], name="scheduled_event_fire_at_idx"),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.type} for borrowing #{self.borrowing_id} at {self.fire_at}"
+
+
+class Notification(models.Model):
+    """Outbox row for a Telegram message, written in the same transaction as the change."""
+
+    class NotificationStatus(models.TextChoices):
+        PENDING = "PENDING", "Pending"
+        SENDING = "SENDING", "Sending"
+        SENT = "SENT", "Sent"
+        FAILED = "FAILED", "Failed"
+
+    chat_id = models.CharField(max_length=64, blank=True)
+    text = models.TextField()
+    status = models.CharField(
+        max_length=10,
+        choices=NotificationStatus.choices,
+        default=NotificationStatus.PENDING,
+    )
+    attempts = models.PositiveSmallIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["next_attempt_at"],
+                condition=Q(status="PENDING"),
+                name="notification_pending_idx",
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return f"Notification #{self.pk}: {self.status}"
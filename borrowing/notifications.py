@@ -0,0 +1,67 @@
+import os
+
+import requests
+from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import NewConnectionError
+
+from borrowing.models import Notification
+
+load_dotenv()
+
+TELEGRAM_API_URL = os.environ.get("TELEGRAM_URL")
+CHAT_ID = os.environ.get("TELEGRAM_CHAT_ID")
+TELEGRAM_TIMEOUT = (3.05, 10)
+
+_session = None
+
+
+def build_notification(text: str, chat_id: str | None = None) -> Notification:
+    """Return an unsaved outbox row, for callers that bulk_create many at once."""
+    return Notification(chat_id=chat_id or CHAT_ID or "", text=text)
+
+
+def enqueue_notification(text: str, chat_id: str | None = None) -> Notification:
+    """
+    Queue a Telegram message in the outbox.
+    Call it inside the transaction that makes the change being announced,
+    so the message is stored if and only if the change commits.
+    """
+    notification = build_notification(text, chat_id)
+    notification.save()
+    return notification
+
+
+def get_session() -> requests.Session:
+    """Return the per-process HTTP session, so deliveries reuse pooled connections."""
+    global _session
+    if _session is None:
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=4)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        _session = session
+    return _session
+
+
+def telegram_configured() -> bool:
+    return bool(TELEGRAM_API_URL)
+
+
+def send_telegram_message(chat_id: str, text: str) -> requests.Response:
+    return get_session().post(
+        TELEGRAM_API_URL,
+        data={"chat_id": chat_id, "text": text},
+        timeout=TELEGRAM_TIMEOUT,
+    )
+
+
+def never_reached_telegram(error: requests.RequestException) -> bool:
+    """
+    Tell whether a failed request certainly did not reach Telegram.
+    Only such failures are retried, so a message is delivered at most once.
+    """
+    if isinstance(error, requests.ConnectTimeout):
+        return True
+    reason = getattr(error.args[0], "reason", None) if error.args else None
+    return isinstance(reason, NewConnectionError)
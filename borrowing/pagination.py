@@ -0,0 +1,7 @@
+from core.pagination import KeysetPagination
+
+
+class BorrowingPagination(KeysetPagination):
+    """Newest borrowings first, with id breaking ties within a day."""
+
+    ordering = ("-borrow_date", "-id")
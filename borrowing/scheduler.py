@@ -0,0 +1,114 @@
+from datetime import datetime, time, timedelta
+
+from django.db import connection
+from django.utils import timezone
+
+from .models import ScheduledEvent
+
+FIRE_TIME = time(9, 0)
+REMINDER_LEAD = timedelta(days=1)
+OVERDUE_RENOTIFY_INTERVAL = timedelta(days=1)
+
+
+def fire_time(day):
+    """Events fire in the morning, in the project's time zone."""
+    return timezone.make_aware(datetime.combine(day, FIRE_TIME))
+
+
+def due_date_events(borrowing, now=None):
+    """
+    The events of an active borrowing: a reminder the day before it is due,
+    unless that moment has passed, and an overdue notice the day after.
+    A borrowing announced as overdue recently waits for its renotification.
+    """
+    now = now or timezone.now()
+    due = borrowing.expected_return_date
+    overdue_at = fire_time(due + timedelta(days=1))
+    if borrowing.overdue_notified_at is not None:
+        overdue_at = max(
+            overdue_at, borrowing.overdue_notified_at + OVERDUE_RENOTIFY_INTERVAL
+        )
+    events = [
+        ScheduledEvent(
+            borrowing=borrowing,
+            type=ScheduledEvent.EventType.OVERDUE,
+            fire_at=overdue_at,
+        )
+    ]
+    reminder_at = fire_time(due - REMINDER_LEAD)
+    if reminder_at > now:
+        events.append(
+            ScheduledEvent(
+                borrowing=borrowing,
+                type=ScheduledEvent.EventType.REMINDER,
+                fire_at=reminder_at,
+            )
+        )
+    return events
+
+
+def schedule_due_date_events(borrowing):
+    """Register the borrowing's events; call it in the transaction that creates it."""
+    return ScheduledEvent.objects.bulk_create(due_date_events(borrowing))
+
+
+def cancel_due_date_events(borrowing_id):
+    """Drop the pending events of a returned borrowing."""
+    ScheduledEvent.objects.filter(borrowing_id=borrowing_id).delete()
+
+
+def reschedule_due_date_events(borrowing):
+    """Replace the events of a borrowing whose dates were edited."""
+    cancel_due_date_events(borrowing.pk)
+    if borrowing.actual_return_date is None:
+        schedule_due_date_events(borrowing)
+
+
+def next_overdue_fire_at(fire_at, now):
+    """The first renotification moment after now, keeping the daily rhythm."""
+    missed = (now - fire_at) // OVERDUE_RENOTIFY_INTERVAL
+    return fire_at + (missed + 1) * OVERDUE_RENOTIFY_INTERVAL
+
+
+def schedule_active_borrowings(now=None):
+    """
+    Create the missing events of every active borrowing in one statement,
+    for rows written without the ORM such as bulk loads.
+    Borrowings announced as overdue recently wait for their renotification.
+    """
+    now = now or timezone.now()
+    with connection.cursor() as cursor:
+        cursor.execute(
+            """
+            INSERT INTO borrowing_scheduledevent (borrowing_id, type, fire_at)
+            SELECT b.id, e.type, e.fire_at
+            FROM borrowing_borrowing AS b
+            CROSS JOIN LATERAL (
+                VALUES
+                    (
+                        'OVERDUE',
+                        GREATEST(
+                            ((b.expected_return_date + 1) + %(fire_time)s)
+                                AT TIME ZONE %(tz)s,
+                            b.overdue_notified_at + %(renotify)s
+                        )
+                    ),
+                    (
+                        'REMINDER',
+                        ((b.expected_return_date - %(lead_days)s) + %(fire_time)s)
+                            AT TIME ZONE %(tz)s
+                    )
+            ) AS e (type, fire_at)
+            WHERE b.actual_return_date IS NULL
+                AND (e.type = 'OVERDUE' OR e.fire_at > %(now)s)
+            ON CONFLICT (borrowing_id, type) DO NOTHING
+            """,
+            {
+                "fire_time": FIRE_TIME,
+                "tz": timezone.get_current_timezone_name(),
+                "renotify": OVERDUE_RENOTIFY_INTERVAL,
+                "lead_days": REMINDER_LEAD.days,
+                "now": now,
+            },
+        )
+        return cursor.rowcount
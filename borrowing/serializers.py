@@ -1,8 +1,16 @@
+from functools import cache
+
+from django.db import transaction
+from django.db.models.functions import Now
+from django.utils import timezone
 from rest_framework import serializers
+from books.models import Book
 from books.serializers import BookSerializer
+from payment.fines import settle_fine
 from payment.serializers import PaymentSerializer
 from user.serializers import UserSerializer
 from borrowing.models import Borrowing
+from borrowing.scheduler import cancel_due_date_events, schedule_due_date_events
 
 
 class BorrowingSerializer(serializers.ModelSerializer):
@@ -22,6 +30,22 @@ class BorrowingSerializer(serializers.ModelSerializer):
             "payment",
         ]
 
+    @classmethod
+    @cache
+    def queryset_fields(cls):
+        """Columns the list and retrieve querysets load, joined nested models included."""
+        fields = []
+        for name, field in cls().fields.items():
+            if isinstance(field, serializers.BaseSerializer):
+                fields += [
+                    f"{name}__{nested.source}"
+                    for nested in field.fields.values()
+                    if not nested.write_only
+                ]
+            else:
+                fields.append(field.source)
+        return tuple(fields)
+
 
 class BorrowingCreateSerializer(serializers.ModelSerializer):
     class Meta:
@@ -40,18 +64,23 @@ class BorrowingCreateSerializer(serializers.ModelSerializer):
         return data
 
     def create(self, validated_data):
-        # Витягуємо книгу
         book = validated_data.get("book")
-        # Зменшуємо інвентар
-        book.inventory -= 1
-        book.save()  # Зберігаємо зміни в базі даних
-        return super().create(validated_data)
+        # Резервуємо примірник і створюємо позику в одній транзакції
+        with transaction.atomic():
+            if not Book.objects.reserve(book.pk):
+                raise serializers.ValidationError("The book is out of stock.")
+            borrowing = super().create(validated_data)
+            # Нагадування і сповіщення про прострочення плануємо одразу
+            schedule_due_date_events(borrowing)
+            return borrowing
 
 
 class BorrowingReturnSerializer(serializers.ModelSerializer):
     class Meta:
         model = Borrowing
         fields = ["actual_return_date"]
+        # Без дати книгу вважаємо поверненою сьогодні; null лишив би позику активною
+        extra_kwargs = {"actual_return_date": {"required": False, "allow_null": False}}
 
     def validate(self, data):
         if self.instance.actual_return_date is not None:
@@ -61,8 +90,22 @@ class BorrowingReturnSerializer(serializers.ModelSerializer):
         return data
 
     def update(self, instance, validated_data):
-        instance.actual_return_date = validated_data.get("actual_return_date")
-        # Повертаємо книгу до інвентаря
-        instance.book.inventory += 1
-        instance.book.save()
-        return super().update(instance, validated_data)
+        actual_return_date = validated_data.get(
+            "actual_return_date", timezone.localdate()
+        )
+        with transaction.atomic():
+            returned = Borrowing.objects.filter(
+                pk=instance.pk, actual_return_date__isnull=True
+            ).update(actual_return_date=actual_return_date, updated_at=Now())
+            if not returned:
+                raise serializers.ValidationError(
+                    "This borrowing has already been returned."
+                )
+            # Повертаємо книгу до інвентаря
+            Book.objects.release(instance.book_id)
+            cancel_due_date_events(instance.pk)
+            # Остаточний штраф за прострочене повернення
+            settle_fine(instance.pk)
+        instance.actual_return_date = actual_return_date
+        instance.book.refresh_from_db(fields=["inventory"])
+        return instance
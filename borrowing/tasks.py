@@ -1,37 +1,197 @@
-import os
-import requests
+import logging
+from collections import defaultdict
+from datetime import timedelta
 
+import requests
 from celery import shared_task
-from datetime import date
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
 
-from dotenv import load_dotenv
+from .models import Borrowing, Notification, ScheduledEvent
+from .notifications import (
+    build_notification,
+    never_reached_telegram,
+    send_telegram_message,
+    telegram_configured,
+)
+from .scheduler import next_overdue_fire_at
 
-from .models import Borrowing
+logger = logging.getLogger(__name__)
 
-load_dotenv()
+NOTIFICATION_BATCH_SIZE = 100
+NOTIFICATION_MAX_BATCHES = 20
+NOTIFICATION_MAX_ATTEMPTS = 5
+NOTIFICATION_BACKOFF = timedelta(seconds=30)
 
-TELEGRAM_API_URL = os.environ.get("TELEGRAM_URL")
-CHAT_ID = os.environ.get("TELEGRAM_CHAT_ID")
+REMINDER = ScheduledEvent.EventType.REMINDER
+OVERDUE = ScheduledEvent.EventType.OVERDUE
+
+EVENT_BATCH_SIZE = 1000
+EVENT_MAX_BATCHES = 20
 
 
 @shared_task
-def notify_overdue_borrowings():
-    overdue_borrowings = Borrowing.objects.filter(
-        expected_return_date__lt=date.today(), actual_return_date__isnull=True
+def fire_due_events(batch_size=EVENT_BATCH_SIZE):
+    """
+    Fire the scheduled due-date events whose time has come.
+    A run reads only the due end of the fire_at index, so it costs one
+    index probe when nothing is due and grows with the events that fire.
+    Events are claimed with SKIP LOCKED, so overlapping runs never fire one twice.
+    """
+    now = timezone.now()
+    # Borrowings returned without the return endpoint, e.g. by a staff
+    # update, may still have events; they are dropped instead of fired
+    ScheduledEvent.objects.filter(
+        fire_at__lte=now, borrowing__actual_return_date__isnull=False
+    ).delete()
+    fired = sent = 0
+    for _ in range(EVENT_MAX_BATCHES):
+        with transaction.atomic():
+            events = list(due_events(now)[:batch_size])
+            if not events:
+                break
+            sent += fire_events(events, now)
+        fired += len(events)
+        if len(events) < batch_size:
+            break
+
+    logger.info("Due-date events: fired=%s sent=%s", fired, sent)
+    return {"fired": fired, "sent": sent}
+
+
+def due_events(now):
+    """Due events with their borrowing, grouped by user; served by scheduled_event_fire_at_idx."""
+    return (
+        ScheduledEvent.objects.select_for_update(skip_locked=True, of=("self",))
+        .filter(fire_at__lte=now, borrowing__actual_return_date__isnull=True)
+        .select_related("borrowing__book", "borrowing__user")
+        .only(
+            "type",
+            "fire_at",
+            "borrowing__expected_return_date",
+            "borrowing__user__email",
+            "borrowing__book__title",
+        )
+        .order_by("fire_at")
     )
-    for borrowing in overdue_borrowings:
-        message = (
-            f"Книга '{borrowing.book.title}' прострочена. "
-            f"Очікувана дата повернення: {borrowing.expected_return_date}."
+
+
+def fire_events(events, now):
+    """
+    Queue one digest per user and event type, then delete the fired reminders
+    and move the overdue events on to their next renotification.
+    """
+    digests = defaultdict(list)
+    for event in sorted(events, key=lambda event: event.borrowing.user_id):
+        digests[event.borrowing.user, event.type].append(event.borrowing)
+
+    Notification.objects.bulk_create(
+        due_date_digest(user, event_type, borrowings)
+        for (user, event_type), borrowings in digests.items()
+    )
+
+    reminders = [event.id for event in events if event.type == REMINDER]
+    overdue = [event for event in events if event.type == OVERDUE]
+    ScheduledEvent.objects.filter(id__in=reminders).delete()
+    for event in overdue:
+        event.fire_at = next_overdue_fire_at(event.fire_at, now)
+    ScheduledEvent.objects.bulk_update(overdue, ["fire_at"])
+    Borrowing.objects.filter(id__in=[event.borrowing_id for event in overdue]).update(
+        overdue_notified_at=now
+    )
+    return len(digests)
+
+
+def due_date_digest(user, event_type, borrowings):
+    if event_type == REMINDER:
+        header = f"Нагадування для {user.email}: завтра потрібно повернути книги:"
+        lines = [f"- '{borrowing.book.title}'" for borrowing in borrowings]
+    else:
+        header = f"Прострочені книги користувача {user.email}:"
+        lines = [
+            f"- '{borrowing.book.title}', очікувана дата повернення: "
+            f"{borrowing.expected_return_date}"
+            for borrowing in borrowings
+        ]
+    return build_notification("\n".join([header, *lines]))
+
+
+@shared_task
+def deliver_notifications(batch_size=NOTIFICATION_BATCH_SIZE):
+    """
+    Drain the notification outbox in batches.
+    Rows are claimed (PENDING -> SENDING) in their own transaction before
+    anything is sent, so concurrent workers never pick up the same row and a
+    crashed worker never resends one. Failures that certainly did not reach
+    Telegram are retried with exponential backoff.
+    """
+    if not telegram_configured():
+        logger.warning("TELEGRAM_URL is not set, notifications stay queued.")
+        return 0
+
+    sent = 0
+    for _ in range(NOTIFICATION_MAX_BATCHES):
+        batch = claim_notifications(batch_size)
+        if not batch:
+            break
+        sent += deliver_batch(batch)
+    return sent
+
+
+def claim_notifications(batch_size):
+    with transaction.atomic():
+        ids = list(
+            Notification.objects.select_for_update(skip_locked=True)
+            .filter(
+                status=Notification.NotificationStatus.PENDING,
+                next_attempt_at__lte=timezone.now(),
+            )
+            .order_by("next_attempt_at")
+            .values_list("id", flat=True)[:batch_size]
         )
-        data = {"chat_id": CHAT_ID, "text": message}
-        response = requests.post(TELEGRAM_API_URL, data=data)
-        if response.status_code != 200:
-            raise Exception(f"Не вдалося відправити повідомлення: {response.text}")
+        Notification.objects.filter(id__in=ids).update(
+            status=Notification.NotificationStatus.SENDING,
+            attempts=F("attempts") + 1,
+        )
+    return list(Notification.objects.filter(id__in=ids).order_by("id"))
+
 
+def deliver_batch(batch):
+    delivered = []
+    for notification in batch:
+        try:
+            response = send_telegram_message(notification.chat_id, notification.text)
+        except requests.RequestException as error:
+            reschedule(notification, repr(error), retry=never_reached_telegram(error))
+            continue
 
-def send_telegram_message(chat_id, message):
-    data = {"chat_id": chat_id, "text": message}
-    response = requests.post(TELEGRAM_API_URL, data=data)
-    if response.status_code != 200:
-        raise Exception(f"Не вдалося відправити повідомлення: {response.text}")
+        if response.status_code == 200:
+            delivered.append(notification.id)
+        else:
+            # 429 and 5xx are rejections, anything else will never succeed
+            retry = response.status_code == 429 or response.status_code >= 500
+            reschedule(
+                notification,
+                f"Не вдалося відправити повідомлення: {response.text}",
+                retry=retry,
+            )
+
+    Notification.objects.filter(id__in=delivered).update(
+        status=Notification.NotificationStatus.SENT, sent_at=timezone.now()
+    )
+    return len(delivered)
+
+
+def reschedule(notification, error, retry):
+    if retry and notification.attempts < NOTIFICATION_MAX_ATTEMPTS:
+        status = Notification.NotificationStatus.PENDING
+    else:
+        status = Notification.NotificationStatus.FAILED
+    backoff = NOTIFICATION_BACKOFF * 2 ** (notification.attempts - 1)
+    Notification.objects.filter(id=notification.id).update(
+        status=status,
+        next_attempt_at=timezone.now() + backoff,
+        last_error=error,
+    )
+    logger.warning("Notification %s not delivered: %s", notification.id, error)
@@ -0,0 +1,63 @@
+import threading
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TransactionTestCase
+from rest_framework.exceptions import ValidationError
+
+from books.models import Book
+from borrowing.models import Borrowing
+from borrowing.serializers import BorrowingCreateSerializer
+
+User = get_user_model()
+
+
+class BorrowingConcurrencyTests(TransactionTestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email="user@example.com", password="password"
+        )
+        self.book = Book.objects.create(
+            title="Popular Book",
+            author="Popular Author",
+            cover=Book.CoverType.HARD,
+            inventory=3,
+            daily_price=Decimal("1.50"),
+        )
+
+    def test_parallel_borrows_do_not_oversell(self):
+        workers = 8
+        barrier = threading.Barrier(workers)
+        outcomes = []
+
+        def borrow():
+            serializer = BorrowingCreateSerializer(
+                data={
+                    "user": self.user.id,
+                    "book": self.book.id,
+                    "borrow_date": date.today(),
+                    "expected_return_date": date.today() + timedelta(days=3),
+                }
+            )
+            try:
+                barrier.wait()
+                serializer.is_valid(raise_exception=True)
+                serializer.save()
+                outcomes.append(True)
+            except ValidationError:
+                outcomes.append(False)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=borrow) for _ in range(workers)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.book.refresh_from_db()
+        self.assertEqual(outcomes.count(True), 3)
+        self.assertEqual(self.book.inventory, 0)
+        self.assertEqual(Borrowing.objects.filter(book=self.book).count(), 3)
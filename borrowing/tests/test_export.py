@@ -0,0 +1,99 @@
+import csv
+import io
+import json
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from rest_framework import status
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import AccessToken
+
+from books.models import Book
+from borrowing.models import Borrowing
+
+User = get_user_model()
+
+
+class BorrowingExportTests(APITestCase):
+    def setUp(self):
+        self.admin_user = User.objects.create_superuser(
+            email="admin@example.com", password="password"
+        )
+        self.user = User.objects.create_user(
+            email="user@example.com", password="password"
+        )
+        self.book = Book.objects.create(
+            title="Dune, Part One",
+            author="Frank Herbert",
+            cover=Book.CoverType.HARD,
+            inventory=5,
+            daily_price=Decimal("1.50"),
+        )
+        today = date.today()
+        self.old = Borrowing.objects.create(
+            borrow_date=today - timedelta(days=30),
+            expected_return_date=today - timedelta(days=20),
+            actual_return_date=today - timedelta(days=21),
+            book=self.book,
+            user=self.user,
+        )
+        self.active = Borrowing.objects.create(
+            borrow_date=today,
+            expected_return_date=today + timedelta(days=5),
+            book=self.book,
+            user=self.admin_user,
+        )
+        self.authenticate(self.admin_user)
+
+    def authenticate(self, user):
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(user)}"
+        )
+
+    def export(self, **params):
+        response = self.client.get("/borrowing/export/", params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        return b"".join(response.streaming_content).decode()
+
+    def test_csv_export(self):
+        rows = list(csv.DictReader(io.StringIO(self.export())))
+
+        self.assertEqual(
+            [int(row["id"]) for row in rows], [self.old.id, self.active.id]
+        )
+        self.assertEqual(rows[0]["book__title"], "Dune, Part One")
+        self.assertEqual(rows[0]["user__email"], "user@example.com")
+        self.assertEqual(rows[1]["actual_return_date"], "")
+
+    def test_ndjson_export(self):
+        lines = self.export(output="ndjson").splitlines()
+
+        rows = [json.loads(line) for line in lines]
+        self.assertEqual(rows[0]["id"], self.old.id)
+        self.assertEqual(rows[0]["borrow_date"], self.old.borrow_date.isoformat())
+        self.assertIsNone(rows[1]["actual_return_date"])
+
+    def test_filters(self):
+        def ids(**params):
+            lines = self.export(output="ndjson", **params).splitlines()
+            return [json.loads(line)["id"] for line in lines]
+
+        self.assertEqual(ids(is_active="true"), [self.active.id])
+        self.assertEqual(ids(user_id=self.user.id), [self.old.id])
+        self.assertEqual(ids(date_from=date.today().isoformat()), [self.active.id])
+        self.assertEqual(
+            ids(date_to=(date.today() - timedelta(days=1)).isoformat()),
+            [self.old.id],
+        )
+
+    def test_invalid_parameters(self):
+        for params in ({"output": "xml"}, {"date_from": "yesterday"}):
+            response = self.client.get("/borrowing/export/", params)
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_staff_only(self):
+        self.authenticate(self.user)
+        response = self.client.get("/borrowing/export/")
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
@@ -0,0 +1,126 @@
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from books.models import Book
+from borrowing.scheduler import schedule_active_borrowings
+from borrowing.tasks import due_events
+from borrowing.views import BorrowingViewSet
+from payment.models import Payment
+from payment.tasks import CHECKOUT_SWEEP_DELAY, stale_checkout_payments
+
+User = get_user_model()
+
+USERS = 200
+BORROWINGS = 50_000
+
+
+class HotQueryIndexTests(TestCase):
+    """
+    EXPLAIN the hot borrowing and payment queries on a seeded table,
+    so a dropped or unusable index fails here instead of in production.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        User.objects.bulk_create(
+            User(email=f"reader{number}@example.com") for number in range(USERS)
+        )
+        cls.user = User.objects.order_by("id").first()
+        cls.staff = User.objects.create_superuser(
+            email="admin@example.com", password="password"
+        )
+        book = Book.objects.create(
+            title="Seed",
+            author="Seed",
+            cover=Book.CoverType.SOFT,
+            inventory=1,
+            daily_price=1,
+        )
+        user_ids = list(User.objects.values_list("id", flat=True)[:USERS])
+        with connection.cursor() as cursor:
+            # Every tenth borrowing is active and recent; the rest were returned
+            cursor.execute(
+                """
+                INSERT INTO borrowing_borrowing
+                    (borrow_date, expected_return_date, actual_return_date,
+                     book_id, user_id, updated_at)
+                SELECT
+                    d, d + 14, CASE WHEN i %% 10 = 0 THEN NULL ELSE d + 7 END,
+                    %(book)s, (%(users)s)[1 + i %% %(user_count)s], now()
+                FROM generate_series(1, %(count)s) AS i,
+                    LATERAL (
+                        SELECT current_date - CASE
+                            WHEN i %% 10 = 0 THEN i %% 20 ELSE i %% 365 END AS d
+                    ) AS dates
+                """,
+                {
+                    "book": book.id,
+                    "users": user_ids,
+                    "user_count": len(user_ids),
+                    "count": BORROWINGS,
+                },
+            )
+            # Almost every payment has its Stripe session
+            cursor.execute(
+                """
+                INSERT INTO payment_payment
+                    (status, type, borrowing_id, session_url, session_id,
+                     money_to_pay, created_at, updated_at)
+                SELECT
+                    'PENDING', 'PAYMENT', id, '',
+                    CASE WHEN id % 500 = 0 THEN NULL ELSE 'cs_' || id END,
+                    1, now() - (id % 1000) * interval '1 minute', now()
+                FROM borrowing_borrowing
+                """
+            )
+            schedule_active_borrowings()
+            cursor.execute("ANALYZE borrowing_borrowing")
+            cursor.execute("ANALYZE borrowing_scheduledevent")
+            cursor.execute("ANALYZE payment_payment")
+
+    def list_page_queryset(self, user, **params):
+        request = Request(APIRequestFactory().get("/borrowing/", params))
+        request.user = user
+        view = BorrowingViewSet(
+            request=request, action="list", format_kwarg=None, kwargs={}
+        )
+        return view.paginator.get_page_queryset(
+            view.filter_queryset(view.get_queryset()), request
+        )
+
+    def assertUsesIndex(self, queryset, index):
+        plan = queryset.explain()
+        self.assertIn(index, plan)
+        self.assertNotIn("Seq Scan on borrowing_borrowing", plan)
+        self.assertNotIn("Seq Scan on payment_payment", plan)
+
+    def test_active_borrowings_of_a_user(self):
+        queryset = self.list_page_queryset(self.user, is_active="true")
+        self.assertUsesIndex(queryset, "borrowing_active_user_idx")
+
+    def test_active_borrowings_for_staff(self):
+        queryset = self.list_page_queryset(self.staff, is_active="true")
+        self.assertUsesIndex(queryset, "borrowing_active_date_idx")
+
+    def test_borrowings_of_a_user(self):
+        queryset = self.list_page_queryset(self.user)
+        self.assertUsesIndex(queryset, "borrowing_user_date_id_idx")
+
+    def test_due_events_scan(self):
+        self.assertUsesIndex(due_events(timezone.now()), "scheduled_event_fire_at_idx")
+
+    def test_webhook_session_lookup(self):
+        queryset = Payment.objects.filter(
+            session_id__in=["cs_1", "cs_2"], status=Payment.PaymentStatus.PENDING
+        )
+        self.assertUsesIndex(queryset, "payment_session_id_key")
+
+    def test_missing_checkout_session_sweep(self):
+        now = timezone.now() + CHECKOUT_SWEEP_DELAY + timedelta(minutes=1)
+        self.assertUsesIndex(stale_checkout_payments(now), "payment_session_id_key")
@@ -0,0 +1,126 @@
+from datetime import date, timedelta
+from decimal import Decimal
+from unittest.mock import Mock, patch
+
+import requests
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import AccessToken
+
+from books.models import Book
+from borrowing.models import Borrowing, Notification
+from borrowing.notifications import enqueue_notification
+from borrowing.tasks import deliver_notifications
+
+User = get_user_model()
+
+
+@patch("borrowing.notifications.TELEGRAM_API_URL", "https://telegram.test/send")
+class DeliverNotificationsTests(APITestCase):
+    def setUp(self):
+        self.session = Mock()
+        patcher = patch(
+            "borrowing.notifications.get_session", return_value=self.session
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_delivers_pending_notifications_once(self):
+        enqueue_notification("First", chat_id="42")
+        enqueue_notification("Second", chat_id="42")
+        self.session.post.return_value = Mock(status_code=200)
+
+        self.assertEqual(deliver_notifications(), 2)
+        self.assertEqual(self.session.post.call_count, 2)
+        self.assertEqual(
+            Notification.objects.filter(
+                status=Notification.NotificationStatus.SENT
+            ).count(),
+            2,
+        )
+
+        # Delivered rows are never picked up again
+        self.assertEqual(deliver_notifications(), 0)
+        self.assertEqual(self.session.post.call_count, 2)
+
+    def test_rejected_notification_is_retried_with_backoff(self):
+        notification = enqueue_notification("Retry me", chat_id="42")
+        self.session.post.return_value = Mock(status_code=502, text="Bad Gateway")
+
+        with self.assertLogs("borrowing.tasks", "WARNING"):
+            self.assertEqual(deliver_notifications(), 0)
+        notification.refresh_from_db()
+        self.assertEqual(notification.status, Notification.NotificationStatus.PENDING)
+        self.assertEqual(notification.attempts, 1)
+        self.assertGreater(notification.next_attempt_at, timezone.now())
+
+        # Not due yet, so the next run leaves it alone
+        deliver_notifications()
+        self.assertEqual(self.session.post.call_count, 1)
+
+    def test_ambiguous_failure_is_not_retried(self):
+        notification = enqueue_notification("Maybe sent", chat_id="42")
+        self.session.post.side_effect = requests.ReadTimeout("read timed out")
+
+        with self.assertLogs("borrowing.tasks", "WARNING"):
+            deliver_notifications()
+        notification.refresh_from_db()
+        self.assertEqual(notification.status, Notification.NotificationStatus.FAILED)
+
+    def test_connect_timeout_is_retried(self):
+        notification = enqueue_notification("Not sent", chat_id="42")
+        self.session.post.side_effect = requests.ConnectTimeout("connect timed out")
+
+        with self.assertLogs("borrowing.tasks", "WARNING"):
+            deliver_notifications()
+        notification.refresh_from_db()
+        self.assertEqual(notification.status, Notification.NotificationStatus.PENDING)
+
+    def test_gives_up_after_max_attempts(self):
+        notification = enqueue_notification("Never", chat_id="42")
+        Notification.objects.filter(pk=notification.pk).update(attempts=4)
+        self.session.post.return_value = Mock(status_code=500, text="Error")
+
+        with self.assertLogs("borrowing.tasks", "WARNING"):
+            deliver_notifications()
+        notification.refresh_from_db()
+        self.assertEqual(notification.status, Notification.NotificationStatus.FAILED)
+        self.assertEqual(notification.attempts, 5)
+
+
+class BorrowingOutboxTests(APITestCase):
+    def setUp(self):
+        self.admin_user = User.objects.create_superuser(
+            email="admin@example.com", password="password"
+        )
+        self.book = Book.objects.create(
+            title="Test Book",
+            author="Test Author",
+            cover=Book.CoverType.HARD,
+            inventory=5,
+            daily_price=Decimal("1.50"),
+        )
+        self.borrowing = Borrowing.objects.create(
+            borrow_date=date.today(),
+            expected_return_date=date.today() + timedelta(days=5),
+            book=self.book,
+            user=self.admin_user,
+        )
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(self.admin_user)}"
+        )
+
+    @patch("borrowing.notifications.send_telegram_message")
+    def test_return_borrowing_queues_notification(self, send_telegram_message):
+        response = self.client.post(
+            reverse("borrowing:borrowing-return-borrowing", args=[self.borrowing.id]),
+            {"actual_return_date": date.today()},
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        send_telegram_message.assert_not_called()
+        notification = Notification.objects.get()
+        self.assertIn(self.book.title, notification.text)
+        self.assertEqual(notification.status, Notification.NotificationStatus.PENDING)
@@ -0,0 +1,74 @@
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import AccessToken
+
+from books.models import Book
+from borrowing.models import Borrowing
+from payment.models import Payment
+
+User = get_user_model()
+
+
+class BorrowingQueryBudgetTests(APITestCase):
+    """Nested book, user and payment come from one JOIN, not a query per row."""
+
+    def setUp(self):
+        self.admin_user = User.objects.create_superuser(
+            email="admin@example.com", password="password"
+        )
+        self.users = [
+            User.objects.create_user(email=f"user{number}@example.com", password="x")
+            for number in range(3)
+        ]
+        self.books = [
+            Book.objects.create(
+                title=f"Book {number}",
+                author="Author",
+                cover=Book.CoverType.SOFT,
+                inventory=5,
+                daily_price=Decimal("1.00"),
+            )
+            for number in range(3)
+        ]
+        for number in range(30):
+            borrowing = Borrowing.objects.create(
+                borrow_date=date.today(),
+                expected_return_date=date.today() + timedelta(days=3),
+                book=self.books[number % 3],
+                user=self.users[number % 3],
+            )
+            borrowing.payment = Payment.objects.create(
+                borrowing=borrowing, money_to_pay=Decimal("3.00")
+            )
+            borrowing.save()
+        self.borrowing = borrowing
+
+    def authenticate(self, user):
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(user)}"
+        )
+
+    def test_list_as_staff(self):
+        self.authenticate(self.admin_user)
+        # User lookup for the token, then the page
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse("borrowing:borrowing-list"))
+        self.assertEqual(len(response.data["results"]), 30)
+        self.assertIsNotNone(response.data["results"][0]["payment"])
+
+    def test_list_as_user(self):
+        self.authenticate(self.users[0])
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse("borrowing:borrowing-list"))
+        self.assertEqual(len(response.data["results"]), 10)
+
+    def test_retrieve(self):
+        self.authenticate(self.admin_user)
+        with self.assertNumQueries(2):
+            self.client.get(
+                reverse("borrowing:borrowing-detail", args=[self.borrowing.id])
+            )
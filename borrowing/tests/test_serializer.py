@@ -55,3 +55,37 @@ class BorrowingSerializerTests(APITestCase):
             str(context.exception.detail["non_field_errors"][0]),
             "This borrowing has already been returned.",
         )
+
+    def test_borrowing_create_serializer_reserves_inventory(self):
+        data = {
+            "user": self.user.id,
+            "book": self.book.id,
+            "borrow_date": date.today(),
+            "expected_return_date": date.today() + timedelta(days=3),
+        }
+        serializer = BorrowingCreateSerializer(data=data)
+        self.assertTrue(serializer.is_valid(), serializer.errors)
+        serializer.save()
+        self.book.refresh_from_db()
+        self.assertEqual(self.book.inventory, 4)
+
+    def test_borrowing_create_serializer_out_of_stock(self):
+        Book.objects.filter(pk=self.book.pk).update(inventory=1)
+        data = {
+            "user": self.user.id,
+            "book": self.book.id,
+            "borrow_date": date.today(),
+            "expected_return_date": date.today() + timedelta(days=3),
+        }
+        first = BorrowingCreateSerializer(data=data)
+        self.assertTrue(first.is_valid(), first.errors)
+        # Both requests pass validation before either one reserves a copy
+        second = BorrowingCreateSerializer(data=data)
+        self.assertTrue(second.is_valid(), second.errors)
+        first.save()
+        with self.assertRaises(ValidationError) as context:
+            second.save()
+        self.assertEqual(str(context.exception.detail[0]), "The book is out of stock.")
+        self.book.refresh_from_db()
+        self.assertEqual(self.book.inventory, 0)
+        self.assertEqual(Borrowing.objects.filter(book=self.book).count(), 2)
@@ -0,0 +1,175 @@
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.utils import timezone
+
+from books.models import Book
+from borrowing.models import Borrowing, Notification, ScheduledEvent
+from borrowing.scheduler import (
+    OVERDUE_RENOTIFY_INTERVAL,
+    cancel_due_date_events,
+    fire_time,
+    next_overdue_fire_at,
+    schedule_active_borrowings,
+    schedule_due_date_events,
+)
+from borrowing.tasks import fire_due_events
+
+User = get_user_model()
+
+
+class DueDateSchedulerTests(TestCase):
+    def setUp(self):
+        self.alice = User.objects.create_user(
+            email="alice@example.com", password="password"
+        )
+        self.bob = User.objects.create_user(
+            email="bob@example.com", password="password"
+        )
+        self.book = Book.objects.create(
+            title="Test Book",
+            author="Test Author",
+            cover=Book.CoverType.HARD,
+            inventory=5,
+            daily_price=Decimal("1.50"),
+        )
+
+    def borrow(self, user, due_in_days, **kwargs):
+        borrowing = Borrowing.objects.create(
+            user=user,
+            book=self.book,
+            borrow_date=date.today() - timedelta(days=10),
+            expected_return_date=date.today() + timedelta(days=due_in_days),
+            **kwargs,
+        )
+        schedule_due_date_events(borrowing)
+        return borrowing
+
+    def test_new_borrowing_gets_a_reminder_and_an_overdue_event(self):
+        borrowing = self.borrow(self.alice, due_in_days=5)
+
+        events = dict(borrowing.scheduled_events.values_list("type", "fire_at"))
+        due = borrowing.expected_return_date
+        self.assertEqual(
+            events,
+            {
+                ScheduledEvent.EventType.REMINDER: fire_time(due - timedelta(days=1)),
+                ScheduledEvent.EventType.OVERDUE: fire_time(due + timedelta(days=1)),
+            },
+        )
+
+    def test_reminder_in_the_past_is_not_scheduled(self):
+        borrowing = self.borrow(self.alice, due_in_days=-3)
+        self.assertEqual(
+            list(borrowing.scheduled_events.values_list("type", flat=True)),
+            [ScheduledEvent.EventType.OVERDUE],
+        )
+
+    def test_one_digest_per_user_and_overdue_events_move_on(self):
+        self.borrow(self.alice, due_in_days=-3)
+        self.borrow(self.alice, due_in_days=-2)
+        self.borrow(self.bob, due_in_days=-3)
+        # Not due for either event yet
+        self.borrow(self.bob, due_in_days=5)
+
+        result = fire_due_events()
+
+        self.assertEqual(result, {"fired": 3, "sent": 2})
+        digests = Notification.objects.order_by("id")
+        self.assertIn("alice@example.com", digests[0].text)
+        self.assertEqual(digests[0].text.count(self.book.title), 2)
+        self.assertIn("bob@example.com", digests[1].text)
+        self.assertFalse(ScheduledEvent.objects.filter(fire_at__lte=timezone.now()))
+        self.assertEqual(
+            Borrowing.objects.filter(overdue_notified_at__isnull=False).count(), 3
+        )
+
+        # Nothing else is due until the next renotification
+        self.assertEqual(fire_due_events(), {"fired": 0, "sent": 0})
+
+    def test_reminders_fire_once(self):
+        borrowing = self.borrow(self.alice, due_in_days=5)
+        borrowing.scheduled_events.filter(
+            type=ScheduledEvent.EventType.REMINDER
+        ).update(fire_at=timezone.now())
+
+        self.assertEqual(fire_due_events(), {"fired": 1, "sent": 1})
+        self.assertIn("Нагадування", Notification.objects.get().text)
+        self.assertEqual(
+            list(borrowing.scheduled_events.values_list("type", flat=True)),
+            [ScheduledEvent.EventType.OVERDUE],
+        )
+
+    def test_returned_borrowing_fires_nothing(self):
+        borrowing = self.borrow(self.alice, due_in_days=-3)
+        cancel_due_date_events(borrowing.id)
+
+        self.assertEqual(fire_due_events(), {"fired": 0, "sent": 0})
+        self.assertFalse(Notification.objects.exists())
+
+    def test_events_of_a_borrowing_returned_elsewhere_are_dropped(self):
+        borrowing = self.borrow(self.alice, due_in_days=-3)
+        Borrowing.objects.filter(id=borrowing.id).update(
+            actual_return_date=date.today()
+        )
+
+        self.assertEqual(fire_due_events(), {"fired": 0, "sent": 0})
+        self.assertFalse(Notification.objects.exists())
+        self.assertFalse(borrowing.scheduled_events.exists())
+
+    def test_renotification_keeps_the_daily_rhythm(self):
+        fire_at = fire_time(date.today() - timedelta(days=3))
+        now = fire_at + timedelta(days=2, hours=5)
+        self.assertEqual(
+            next_overdue_fire_at(fire_at, now), fire_at + 3 * OVERDUE_RENOTIFY_INTERVAL
+        )
+
+    def test_query_count_does_not_grow_with_events(self):
+        for number in range(20):
+            user = User.objects.create_user(
+                email=f"reader{number}@example.com", password="password"
+            )
+            self.borrow(user, due_in_days=-2)
+        # Returned cleanup, savepoint, claim, digests, overdue update,
+        # watermark, release
+        with self.assertNumQueries(7):
+            result = fire_due_events()
+        self.assertEqual(result, {"fired": 20, "sent": 20})
+
+    def test_backfill_matches_the_orm_schedule(self):
+        scheduled = self.borrow(self.alice, due_in_days=5)
+        expected = set(scheduled.scheduled_events.values_list("type", "fire_at"))
+        scheduled.scheduled_events.all().delete()
+        Borrowing.objects.create(
+            user=self.bob,
+            book=self.book,
+            borrow_date=date.today(),
+            expected_return_date=date.today(),
+            actual_return_date=date.today(),
+        )
+
+        self.assertEqual(schedule_active_borrowings(), 2)
+        self.assertEqual(
+            set(scheduled.scheduled_events.values_list("type", "fire_at")), expected
+        )
+        # Existing events are kept
+        self.assertEqual(schedule_active_borrowings(), 0)
+
+    def test_backfill_waits_for_renotification(self):
+        notified_at = timezone.now() - timedelta(hours=2)
+        borrowing = Borrowing.objects.create(
+            user=self.alice,
+            book=self.book,
+            borrow_date=date.today() - timedelta(days=10),
+            expected_return_date=date.today() - timedelta(days=3),
+            overdue_notified_at=notified_at,
+        )
+
+        schedule_active_borrowings()
+
+        self.assertEqual(
+            borrowing.scheduled_events.get().fire_at,
+            notified_at + OVERDUE_RENOTIFY_INTERVAL,
+        )
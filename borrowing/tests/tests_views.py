@@ -8,7 +8,10 @@ from django.urls import reverse
 from unittest.mock import patch
 
 from books.models import Book
-from borrowing.models import Borrowing
+from borrowing.models import Borrowing, ScheduledEvent
+from borrowing.scheduler import fire_time
+from borrowing.tasks import fire_due_events
+from payment.models import Payment
 from django.contrib.auth import get_user_model
 
 User = get_user_model()
@@ -42,7 +45,7 @@ class BorrowingViewSetTests(APITestCase):
         self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {self.user_token}")
         response = self.client.get(reverse("borrowing:borrowing-list"))
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 1)
+        self.assertEqual(len(response.data["results"]), 1)
 
     def test_create_borrowing_as_anonymous_user(self):
         data = {
@@ -74,3 +77,87 @@ class BorrowingViewSetTests(APITestCase):
             data,
         )
         self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    @patch("payment.tasks.create_checkout_session.delay")
+    def test_create_borrowing_returns_pending_payment(self, delay):
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {self.admin_token}")
+        data = {
+            "user": self.admin_user.id,
+            "book": self.book.id,
+            "borrow_date": date.today(),
+            "expected_return_date": date.today() + timedelta(days=3),
+        }
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(reverse("borrowing:borrowing-list"), data)
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        payment = Payment.objects.get(borrowing_id=response.data["id"])
+        self.assertEqual(payment.status, Payment.PaymentStatus.PENDING)
+        self.assertEqual(payment.money_to_pay, Decimal("4.50"))
+        self.assertEqual(response.data["payment_id"], payment.id)
+        self.assertEqual(response.data["payment_status"], "PENDING")
+        self.assertTrue(
+            response.data["payment_status_url"].endswith(
+                f"/payment/{payment.id}/checkout-status/"
+            )
+        )
+        delay.assert_called_once_with(payment.id)
+
+    @patch("payment.tasks.create_checkout_session.delay")
+    def test_due_date_events_follow_the_borrowing(self, delay):
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {self.admin_token}")
+        data = {
+            "user": self.admin_user.id,
+            "book": self.book.id,
+            "borrow_date": date.today(),
+            "expected_return_date": date.today() + timedelta(days=3),
+        }
+        response = self.client.post(reverse("borrowing:borrowing-list"), data)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        events = ScheduledEvent.objects.filter(borrowing_id=response.data["id"])
+        self.assertEqual(
+            set(events.values_list("type", flat=True)),
+            {ScheduledEvent.EventType.REMINDER, ScheduledEvent.EventType.OVERDUE},
+        )
+
+        response = self.client.post(
+            reverse("borrowing:borrowing-return-borrowing", args=[response.data["id"]]),
+            {"actual_return_date": date.today()},
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertFalse(events.exists())
+
+    def test_staff_update_reschedules_due_date_events(self):
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {self.admin_token}")
+        url = reverse("borrowing:borrowing-detail", args=[self.borrowing.id])
+        events = ScheduledEvent.objects.filter(borrowing=self.borrowing)
+        due = date.today() - timedelta(days=2)
+
+        response = self.client.patch(url, {"expected_return_date": due})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            list(events.values_list("type", "fire_at")),
+            [(ScheduledEvent.EventType.OVERDUE, fire_time(due + timedelta(days=1)))],
+        )
+
+        response = self.client.patch(url, {"actual_return_date": date.today()})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertFalse(events.exists())
+        self.assertEqual(fire_due_events(), {"fired": 0, "sent": 0})
+
+    def test_return_without_date_happens_once(self):
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {self.admin_token}")
+        url = reverse("borrowing:borrowing-return-borrowing", args=[self.borrowing.id])
+
+        response = self.client.post(url, {"actual_return_date": None}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        response = self.client.post(url, {})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["actual_return_date"], date.today().isoformat())
+
+        for data in ({}, {"actual_return_date": date.today()}):
+            response = self.client.post(url, data)
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.book.refresh_from_db()
+        self.assertEqual(self.book.inventory, 6)
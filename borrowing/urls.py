@@ -1,5 +1,6 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
+from payment.views import stripe_webhook
 from .views import BorrowingViewSet
 
 app_name = "borrowings"
@@ -8,6 +9,6 @@ router = DefaultRouter()
 router.register(r"", BorrowingViewSet, basename="borrowing")
 
 urlpatterns = [
+    path("stripe-webhook/", stripe_webhook, name="stripe-webhook"),
     path("", include(router.urls)),
-    path("stripe-webhook/", BorrowingViewSet.stripe_webhook, name="stripe-webhook"),
 ]
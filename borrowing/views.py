@@ -1,30 +1,28 @@
-import os
-import stripe
-import requests
+from drf_spectacular.types import OpenApiTypes
 from drf_spectacular.utils import extend_schema_view, extend_schema, OpenApiParameter
 
 from rest_framework import viewsets, status, permissions
 from rest_framework.response import Response
 from rest_framework.decorators import action
 from rest_framework.generics import get_object_or_404
-from django.views.decorators.csrf import csrf_exempt
-from django.http import JsonResponse
-from dotenv import load_dotenv
+from django.db import transaction
+from django.urls import reverse
 
+from core.async_views import AsyncReadMixin
+from core.conditional import ConditionalGetMixin
+from core.streaming import StreamingExportMixin
+from core.values import ValuesListMixin
 from payment.models import Payment
+from payment.tasks import schedule_checkout_session
 from .models import Borrowing
+from .pagination import BorrowingPagination
 from .serializers import (
     BorrowingSerializer,
     BorrowingCreateSerializer,
     BorrowingReturnSerializer,
 )
-from .tasks import send_telegram_message
-
-load_dotenv()
-
-TELEGRAM_API_URL = os.environ.get("TELEGRAM_URL")
-CHAT_ID = os.environ.get("TELEGRAM_CHAT_ID")
-stripe.api_key = os.environ.get("STRIPE_API_KEY")
+from .notifications import enqueue_notification
+from .scheduler import reschedule_due_date_events
 
 
 class IsAuthenticatedOrReadOnly(permissions.BasePermission):
@@ -63,7 +61,11 @@ class IsAuthenticatedOrReadOnly(permissions.BasePermission):
     ),
     create=extend_schema(
         summary="Create a Borrowing",
-        description="Create a new borrowing record and generate a payment URL.",
+        description=(
+            "Create a new borrowing record with a PENDING payment. "
+            "The Stripe Checkout session is created in the background; "
+            "poll payment_status_url until it has a session_url."
+        ),
         request=BorrowingCreateSerializer,
         responses={201: BorrowingSerializer},
     ),
@@ -84,16 +86,77 @@ class IsAuthenticatedOrReadOnly(permissions.BasePermission):
         description="Delete a borrowing record by its ID.",
         responses={204: None},
     ),
+    export=extend_schema(
+        summary="Export Borrowings",
+        description=(
+            "Stream borrowings as CSV or NDJSON for reports. "
+            "Only accessible to admin users."
+        ),
+        parameters=[
+            OpenApiParameter(
+                name="output",
+                description="Export format: csv (default) or ndjson",
+                required=False,
+                type=str,
+                enum=["csv", "ndjson"],
+            ),
+            OpenApiParameter(
+                name="user_id",
+                description="Filter by user ID",
+                required=False,
+                type=int,
+            ),
+            OpenApiParameter(
+                name="is_active",
+                description="Filter by active status (true/false)",
+                required=False,
+                type=bool,
+            ),
+            OpenApiParameter(
+                name="date_from",
+                description="Borrowed on or after this date (YYYY-MM-DD)",
+                required=False,
+                type=str,
+            ),
+            OpenApiParameter(
+                name="date_to",
+                description="Borrowed on or before this date (YYYY-MM-DD)",
+                required=False,
+                type=str,
+            ),
+        ],
+        responses={200: OpenApiTypes.BINARY},
+    ),
 )
-class BorrowingViewSet(viewsets.ModelViewSet):
+class BorrowingViewSet(
+    AsyncReadMixin,
+    StreamingExportMixin,
+    ValuesListMixin,
+    ConditionalGetMixin,
+    viewsets.ModelViewSet,
+):
     queryset = Borrowing.objects.all()
     permission_classes = [IsAuthenticatedOrReadOnly]
-
-    def send_telegram_message(self, message):
-        data = {"chat_id": CHAT_ID, "text": message}
-        response = requests.post(TELEGRAM_API_URL, data=data)
-        if response.status_code != 200:
-            raise Exception(f"Не вдалося відправити повідомлення: {response.text}")
+    pagination_class = BorrowingPagination
+    # Вкладені книга, користувач і платіж теж входять у ETag
+    validator_fields = (
+        "updated_at",
+        "book__updated_at",
+        "user__updated_at",
+        "payment__updated_at",
+    )
+    export_fields = (
+        "id",
+        "user_id",
+        "user__email",
+        "book_id",
+        "book__title",
+        "borrow_date",
+        "expected_return_date",
+        "actual_return_date",
+    )
+    export_date_field = "borrow_date"
+    export_filename = "borrowings"
 
     def get_serializer_class(self):
         if self.action == "create":
@@ -106,6 +169,12 @@ class BorrowingViewSet(viewsets.ModelViewSet):
         queryset = super().get_queryset()
         user = self.request.user
 
+        if self.action in ("list", "retrieve"):
+            # Один JOIN замість окремого запиту на кожен вкладений об'єкт
+            queryset = queryset.select_related("book", "user", "payment").only(
+                *BorrowingSerializer.queryset_fields(), *self.validator_fields
+            )
+
         if not user.is_authenticated:
             return queryset.none()
 
@@ -126,91 +195,28 @@ class BorrowingViewSet(viewsets.ModelViewSet):
         return queryset
 
     def perform_create(self, serializer):
-        borrowing = serializer.save(user=self.request.user)
-        self.send_telegram_message(
-            f"Вітаємо!!! Ви взяли книгу '{borrowing.book.title}'. Очікувана дата повернення: {borrowing.expected_return_date}."
-        )
-
-        # Якщо платіж ще не створено
-        payment = Payment.objects.create(
-            borrowing=borrowing,
-            money_to_pay=borrowing.calculate_total_price(),
-            status="PENDING",
-            type="PAYMENT",
-        )
-
-        # Створення платіжної сесії Stripe
-        session = self.create_payment_session(borrowing)
-
-        payment.session_id = session["id"]
-        payment.session_url = session["url"]
-        payment.save()
-
-        self.payment_url = session["url"]
-
-    def create_payment_session(self, borrowing):
-
-        success_url = os.environ.get(
-            "SUCCESS_URL", "http://localhost:8000/payment/success/"
-        )
-        cancel_url = os.environ.get(
-            "CANCEL_URL", "http://localhost:8000/payment/cancel/"
-        )
-
-        session = stripe.checkout.Session.create(
-            payment_method_types=["card"],
-            line_items=[
-                {
-                    "price_data": {
-                        "currency": "usd",
-                        "product_data": {
-                            "name": f"Borrowing: {borrowing.book.title}",
-                        },
-                        "unit_amount": int(
-                            borrowing.calculate_total_price() * 100
-                        ),  # в центах
-                    },
-                    "quantity": 1,
-                },
-            ],
-            mode="payment",
-            success_url=success_url,
-            cancel_url=cancel_url,
-        )
-        return {"id": session.id, "url": session.url}
-
-    @csrf_exempt
-    def stripe_webhook(request):
-        payload = request.body
-        sig_header = request.META["HTTP_STRIPE_SIGNATURE"]
-        endpoint_secret = os.environ.get("STRIPE_ENDPOINT_SECRET")
-
-        try:
-            event = stripe.Webhook.construct_event(payload, sig_header, endpoint_secret)
-        except ValueError as e:
-            return JsonResponse({"error": str(e)}, status=400)
-        except stripe.error.SignatureVerificationError as e:
-            return JsonResponse({"error": str(e)}, status=400)
-
-        # Обробка події успішної оплати
-        if event["type"] == "checkout.session.completed":
-            session = event["data"]["object"]
-            session_id = session.get("id")
-
-            # Знаходимо відповідну оплату
-            payment = Payment.objects.filter(session_id=session_id).first()
-            if payment:
-                # Оновлюємо статус оплати
-                payment.status = "PAID"
-                payment.save()
-
-                # Відправка повідомлення в Telegram
-                borrowing = Borrowing.objects.get(payment=payment)
-                send_telegram_message(
-                    f"Оплата за книгу '{borrowing.book.title}' успішна! Дякуємо!"
-                )
-
-        return JsonResponse({"status": "success"})
+        with transaction.atomic():
+            borrowing = serializer.save(user=self.request.user)
+            enqueue_notification(
+                f"Вітаємо!!! Ви взяли книгу '{borrowing.book.title}'. Очікувана дата повернення: {borrowing.expected_return_date}."
+            )
+            self.payment = Payment.objects.create(
+                borrowing=borrowing,
+                money_to_pay=borrowing.calculate_total_price(),
+                status=Payment.PaymentStatus.PENDING,
+                type=Payment.PaymentType.PAYMENT,
+            )
+            # Сесія Stripe створюється у фоні після коміту
+            schedule_checkout_session(self.payment)
+
+    def perform_update(self, serializer):
+        instance = serializer.instance
+        dates = (instance.expected_return_date, instance.actual_return_date)
+        with transaction.atomic():
+            borrowing = serializer.save()
+            # Нагадування і сповіщення про прострочення йдуть за новими датами
+            if (borrowing.expected_return_date, borrowing.actual_return_date) != dates:
+                reschedule_due_date_events(borrowing)
 
     def create(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data)
@@ -218,7 +224,11 @@ class BorrowingViewSet(viewsets.ModelViewSet):
         self.perform_create(serializer)
         headers = self.get_success_headers(serializer.data)
         response_data = serializer.data
-        response_data["payment_url"] = self.payment_url
+        response_data["payment_id"] = self.payment.id
+        response_data["payment_status"] = self.payment.status
+        response_data["payment_status_url"] = request.build_absolute_uri(
+            reverse("payment-checkout-status", args=[self.payment.id])
+        )
         return Response(response_data, status=status.HTTP_201_CREATED, headers=headers)
 
     @extend_schema(
@@ -232,11 +242,12 @@ class BorrowingViewSet(viewsets.ModelViewSet):
         borrowing = get_object_or_404(Borrowing, pk=pk)
         serializer = BorrowingReturnSerializer(instance=borrowing, data=request.data)
         serializer.is_valid(raise_exception=True)
-        borrowing = serializer.save()
+        with transaction.atomic():
+            borrowing = serializer.save()
 
-        # Відправлення повідомлення про повернення книги
-        self.send_telegram_message(
-            f"Книга '{borrowing.book.title}' була успішно повернута. Дякуємо за вчасне повернення!"
-        )
+            # Повідомлення про повернення книги через outbox
+            enqueue_notification(
+                f"Книга '{borrowing.book.title}' була успішно повернута. Дякуємо за вчасне повернення!"
+            )
 
         return Response(serializer.data, status=status.HTTP_200_OK)
@@ -0,0 +1,13 @@
+from django.apps import AppConfig
+
+
+class CoreConfig(AppConfig):
+    default_auto_field = "django.db.models.BigAutoField"
+    name = "core"
+
+    def ready(self):
+        from core.metrics import install_hooks
+
+        install_hooks()
+        # Connects the Celery signal handlers in web and worker processes
+        import core.task_metrics  # noqa: F401
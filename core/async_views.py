@@ -0,0 +1,173 @@
+import logging
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.http import Http404
+from django.utils.translation import gettext_lazy as _
+from rest_framework.request import Request
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+from core.pagination import KeysetPagination
+from user.authentication import (
+    LOCAL_USER_CACHE_TIMEOUT,
+    USER_CACHE_TIMEOUT,
+    CachedJWTAuthentication,
+    local_cache,
+    token_version,
+    user_cache_key,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncJWTAuthentication(CachedJWTAuthentication):
+    """CachedJWTAuthentication with cache misses read through the async ORM."""
+
+    async def aauthenticate(self, request):
+        header = self.get_header(request)
+        if header is None:
+            return None
+
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+
+        validated_token = self.get_validated_token(raw_token)
+        return await self.aget_user(validated_token), validated_token
+
+    async def aget_user(self, validated_token):
+        try:
+            user_id = validated_token[jwt_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+        key = user_cache_key(user_id, token_version(validated_token))
+        user = local_cache.get(key)
+        if user is not None:
+            return user
+
+        if settings.SHARED_CACHE:
+            try:
+                user = await cache.aget(key)
+            except Exception:
+                logger.warning("Could not read a cached user.", exc_info=True)
+        if user is None:
+            user = await self.aget_user_row(user_id, validated_token)
+            self.check_token_version(user, validated_token)
+            if settings.SHARED_CACHE:
+                try:
+                    await cache.aset(key, user, USER_CACHE_TIMEOUT)
+                except Exception:
+                    logger.warning("Could not cache a user.", exc_info=True)
+        local_cache.set(key, user, LOCAL_USER_CACHE_TIMEOUT)
+        return user
+
+    async def aget_user_row(self, user_id, validated_token):
+        try:
+            user = await self.user_model.objects.aget(
+                **{jwt_settings.USER_ID_FIELD: user_id}
+            )
+        except self.user_model.DoesNotExist:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found")
+
+        if not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+
+        if jwt_settings.CHECK_REVOKE_TOKEN:
+            if validated_token.get(
+                jwt_settings.REVOKE_TOKEN_CLAIM
+            ) != get_md5_hash_password(user.password):
+                raise AuthenticationFailed(
+                    _("The user's password has been changed."), code="password_changed"
+                )
+
+        return user
+
+
+class AsyncReadMixin:
+    """
+    Async list and retrieve for a ConditionalGetMixin viewset. Querysets,
+    filters, permissions, validators and serializers are the viewset's own;
+    only the database reads are awaited instead of blocking a thread.
+    """
+
+    async def aget_queryset(self):
+        # Building a queryset may query the database once per process,
+        # e.g. search_books checks whether pg_trgm is installed
+        return await sync_to_async(lambda: self.filter_queryset(self.get_queryset()))()
+
+    async def alist(self, request, **kwargs):
+        queryset = await self.aget_queryset()
+        paginator = self.paginator
+        if paginator is None:
+            rows = [row async for row in queryset]
+            return self.list_response(request, rows, paginated=False)
+        if isinstance(paginator, KeysetPagination):
+            page_queryset = paginator.get_page_queryset(queryset, request)
+            page = paginator.build_page([row async for row in page_queryset])
+        else:
+            # Page-number pagination counts and slices in one sync call
+            page = await sync_to_async(paginator.paginate_queryset)(
+                queryset, request, self
+            )
+        return self.list_response(request, page, paginated=True)
+
+    async def aretrieve(self, request, **kwargs):
+        queryset = await self.aget_queryset()
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        try:
+            instance = await queryset.aget(
+                **{self.lookup_field: kwargs[lookup_url_kwarg]}
+            )
+        except queryset.model.DoesNotExist:
+            raise Http404
+        self.check_object_permissions(request, instance)
+        return self.retrieve_response(request, instance)
+
+
+def async_read_view(viewset_class, action):
+    """
+    Build an async Django view running `a<action>` of an AsyncReadMixin viewset.
+    It goes through the same negotiation, permission and exception handling
+    as APIView.dispatch, with authentication awaited via AsyncJWTAuthentication.
+    """
+
+    async def view(request, **kwargs):
+        authenticator = AsyncJWTAuthentication()
+        drf_request = Request(request, authenticators=[authenticator])
+        viewset = viewset_class(
+            action=action, args=(), kwargs=kwargs, format_kwarg=None, headers={}
+        )
+        viewset.request = drf_request
+
+        try:
+            user_auth = await authenticator.aauthenticate(drf_request)
+            drf_request.user, drf_request.auth = user_auth or (AnonymousUser(), None)
+            (
+                drf_request.accepted_renderer,
+                drf_request.accepted_media_type,
+            ) = viewset.perform_content_negotiation(drf_request)
+            (
+                drf_request.version,
+                drf_request.versioning_scheme,
+            ) = viewset.determine_version(drf_request, **kwargs)
+            viewset.check_permissions(drf_request)
+            response = await getattr(viewset, f"a{action}")(drf_request, **kwargs)
+        except Exception as exc:
+            response = viewset.handle_exception(exc)
+
+        response = viewset.finalize_response(drf_request, response)
+        # A 304 from get_conditional_response is a plain HttpResponse
+        if hasattr(response, "render"):
+            response.render()
+        return response
+
+    view.csrf_exempt = True
+    view.cls = viewset_class
+    # Same endpoints as the WSGI routes; keep them out of the OpenAPI schema
+    view.initkwargs = {"schema": None}
+    return view
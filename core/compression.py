@@ -0,0 +1,169 @@
+import secrets
+
+import brotli
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+from django.utils.text import compress_sequence, compress_string
+
+# Fast enough for responses built per request; 11 is meant for static files
+BROTLI_QUALITY = 4
+# Same BREACH mitigation as Django's GZipMiddleware, for both codings
+MAX_RANDOM_BYTES = 100
+
+
+def brotli_padding() -> bytes:
+    """
+    An empty-content metadata meta-block of up to MAX_RANDOM_BYTES, which
+    decoders skip, so the response length varies like that of gzip. Goes at
+    a byte boundary, i.e. after flush() and before finish().
+    """
+    size = secrets.randbelow(MAX_RANDOM_BYTES)
+    if not size:
+        # ISLAST=0, MNIBBLES=0 (metadata), MSKIPBYTES=0
+        return b"\x06"
+    # As above with MSKIPBYTES=1, then MSKIPLEN-1 in the next 8 bits
+    header = 0b010110 | (size - 1) << 6
+    return header.to_bytes(2, "little") + bytes(size)
+
+
+def brotli_compress(content):
+    compressor = brotli.Compressor(quality=BROTLI_QUALITY)
+    return (
+        compressor.process(content)
+        + compressor.flush()
+        + brotli_padding()
+        + compressor.finish()
+    )
+
+
+def brotli_sequence(sequence):
+    compressor = brotli.Compressor(quality=BROTLI_QUALITY)
+    for chunk in sequence:
+        # Flush every chunk, so the client gets each part as it is produced
+        data = compressor.process(chunk) + compressor.flush()
+        if data:
+            yield data
+    yield brotli_padding() + compressor.finish()
+
+
+async def abrotli_sequence(sequence):
+    compressor = brotli.Compressor(quality=BROTLI_QUALITY)
+    async for chunk in sequence:
+        data = compressor.process(chunk) + compressor.flush()
+        if data:
+            yield data
+    yield brotli_padding() + compressor.finish()
+
+
+async def agzip_sequence(sequence):
+    async for chunk in sequence:
+        yield compress_string(chunk, max_random_bytes=MAX_RANDOM_BYTES)
+
+
+# Preferred first when the client accepts several with the same quality
+ENCODINGS = {
+    "br": (
+        brotli_compress,
+        brotli_sequence,
+        abrotli_sequence,
+    ),
+    "gzip": (
+        lambda content: compress_string(content, max_random_bytes=MAX_RANDOM_BYTES),
+        lambda sequence: compress_sequence(sequence, max_random_bytes=MAX_RANDOM_BYTES),
+        agzip_sequence,
+    ),
+}
+
+
+def accepted_encodings(header) -> dict:
+    """Map each coding of an Accept-Encoding header to its quality value."""
+    qualities = {}
+    for item in header.split(","):
+        coding, *params = (part.strip() for part in item.split(";"))
+        if not coding:
+            continue
+        quality = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        qualities[coding.lower()] = quality
+    return qualities
+
+
+def negotiate_encoding(header) -> str | None:
+    qualities = accepted_encodings(header)
+    wildcard = qualities.get("*", 0.0)
+    best, best_quality = None, 0.0
+    for coding in ENCODINGS:
+        quality = qualities.get(coding, wildcard)
+        if quality > best_quality:
+            best, best_quality = coding, quality
+    return best
+
+
+class CompressionMiddleware:
+    """
+    Compress responses with brotli or gzip, whichever the client prefers
+    in Accept-Encoding, once the body reaches COMPRESSION_MIN_SIZE bytes.
+    Streaming responses are compressed chunk by chunk. Like GZipMiddleware,
+    a strong ETag becomes weak, which If-None-Match still matches.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.min_size = settings.COMPRESSION_MIN_SIZE
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        return self.compress(request, self.get_response(request))
+
+    async def __acall__(self, request):
+        return self.compress(request, await self.get_response(request))
+
+    def compress(self, request, response):
+        if not response.streaming and len(response.content) < self.min_size:
+            return response
+        if response.has_header("Content-Encoding"):
+            return response
+
+        patch_vary_headers(response, ("Accept-Encoding",))
+        coding = negotiate_encoding(request.META.get("HTTP_ACCEPT_ENCODING", ""))
+        if coding is None:
+            return response
+        compress_content, compress_sequence, acompress_sequence = ENCODINGS[coding]
+
+        if response.streaming:
+            if response.is_async:
+                response.streaming_content = acompress_sequence(
+                    response.streaming_content
+                )
+            else:
+                response.streaming_content = compress_sequence(
+                    response.streaming_content
+                )
+            # The compressed length is known only once the stream is sent
+            del response.headers["Content-Length"]
+        else:
+            compressed = compress_content(response.content)
+            if len(compressed) >= len(response.content):
+                return response
+            response.content = compressed
+            response.headers["Content-Length"] = str(len(compressed))
+
+        etag = response.get("ETag")
+        if etag and etag.startswith('"'):
+            response.headers["ETag"] = "W/" + etag
+        response.headers["Content-Encoding"] = coding
+        return response
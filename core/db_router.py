@@ -0,0 +1,158 @@
+import hashlib
+import logging
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+PRIMARY = "default"
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+PIN_KEY = "core:db:primary-pin:{}"
+
+_replica_reads = ContextVar("replica_reads", default=False)
+
+
+def replica_aliases():
+    """Every database alias except the primary is a replica of it."""
+    return [alias for alias in settings.DATABASES if alias != PRIMARY]
+
+
+@contextmanager
+def use_primary():
+    """Read from the primary inside this block, e.g. while waiting for a fresh write."""
+    token = _replica_reads.set(False)
+    try:
+        yield
+    finally:
+        _replica_reads.reset(token)
+
+
+@contextmanager
+def use_replicas():
+    token = _replica_reads.set(True)
+    try:
+        yield
+    finally:
+        _replica_reads.reset(token)
+
+
+class PrimaryReplicaRouter:
+    """
+    Writes go to the primary. Reads go to a random replica only while
+    ReplicaRoutingMiddleware allows it for a safe request; tasks, commands
+    and anything inside a transaction on the primary read from the primary.
+    """
+
+    def db_for_read(self, model, **hints):
+        if not _replica_reads.get() or connections[PRIMARY].in_atomic_block:
+            return PRIMARY
+        replicas = replica_aliases()
+        return random.choice(replicas) if replicas else PRIMARY
+
+    def db_for_write(self, model, **hints):
+        return PRIMARY
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same rows, so objects from any alias may be related
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == PRIMARY
+
+
+def pin_key(request):
+    """
+    Identify the client by its bearer token or session cookie.
+    Anonymous clients write nothing they would read back, so they are never pinned.
+    """
+    credentials = request.headers.get("Authorization") or request.COOKIES.get(
+        settings.SESSION_COOKIE_NAME
+    )
+    if not credentials:
+        return None
+    return PIN_KEY.format(hashlib.sha1(credentials.encode()).hexdigest())
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Let safe requests read from replicas, except for clients that wrote
+    within the last REPLICA_PIN_SECONDS: their reads stay on the primary
+    until the replicas have caught up, so they always see their own writes.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.enabled = bool(replica_aliases())
+        self.pin_seconds = settings.REPLICA_PIN_SECONDS
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        if not self.enabled:
+            return self.get_response(request)
+
+        key = pin_key(request)
+        if request.method in SAFE_METHODS:
+            pinned = key is not None and self.read_pin(key)
+            with use_primary() if pinned else use_replicas():
+                return self.get_response(request)
+
+        response = self.get_response(request)
+        if key is not None:
+            self.write_pin(key)
+        return response
+
+    async def __acall__(self, request):
+        if not self.enabled:
+            return await self.get_response(request)
+
+        key = pin_key(request)
+        if request.method in SAFE_METHODS:
+            pinned = key is not None and await self.aread_pin(key)
+            with use_primary() if pinned else use_replicas():
+                return await self.get_response(request)
+
+        response = await self.get_response(request)
+        if key is not None:
+            await self.awrite_pin(key)
+        return response
+
+    @staticmethod
+    def read_pin(key):
+        try:
+            return cache.get(key) is not None
+        except Exception:
+            # Without the pin store a client might miss its own write, so stay safe
+            logger.warning("Could not read the primary pin.", exc_info=True)
+            return True
+
+    def write_pin(self, key):
+        try:
+            cache.set(key, 1, self.pin_seconds)
+        except Exception:
+            logger.warning("Could not store the primary pin.", exc_info=True)
+
+    async def aread_pin(self, key):
+        try:
+            return await cache.aget(key) is not None
+        except Exception:
+            logger.warning("Could not read the primary pin.", exc_info=True)
+            return True
+
+    async def awrite_pin(self, key):
+        try:
+            await cache.aset(key, 1, self.pin_seconds)
+        except Exception:
+            logger.warning("Could not store the primary pin.", exc_info=True)
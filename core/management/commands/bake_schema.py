@@ -0,0 +1,30 @@
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from core.schema import SCHEMA_FILE, render_schema
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate the OpenAPI schema once and write it as schema.json and "
+        "schema.yaml, to be served by /api/schema/ via OPENAPI_SCHEMA_DIR."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--output",
+            default=settings.OPENAPI_SCHEMA_DIR,
+            help="Directory to write to; OPENAPI_SCHEMA_DIR by default.",
+        )
+
+    def handle(self, *args, **options):
+        if not options["output"]:
+            raise CommandError("Pass --output or set OPENAPI_SCHEMA_DIR.")
+        directory = Path(options["output"])
+        directory.mkdir(parents=True, exist_ok=True)
+        for name, content in render_schema().items():
+            path = directory / SCHEMA_FILE.format(name)
+            path.write_bytes(content)
+            self.stdout.write(f"{path}: {len(content)} bytes")
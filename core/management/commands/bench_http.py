@@ -0,0 +1,95 @@
+import asyncio
+import statistics
+import time
+
+import httpx
+from django.core.management.base import BaseCommand, CommandError
+
+REQUEST_TIMEOUT = 30
+
+
+class Command(BaseCommand):
+    help = (
+        "Load the read endpoints of a running WSGI server and a running ASGI "
+        "server with the same concurrent requests, and report requests per "
+        "second and latency percentiles for each."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--wsgi-url", default="http://localhost:8000")
+        parser.add_argument("--asgi-url", default="http://localhost:8001/async")
+        parser.add_argument("--concurrency", type=int, default=50)
+        parser.add_argument("--requests", type=int, default=2000)
+        parser.add_argument("--token", help="Access token for authenticated paths.")
+        parser.add_argument(
+            "--path",
+            action="append",
+            dest="paths",
+            help="Path to request, relative to both base URLs; may be repeated.",
+        )
+
+    def handle(self, *args, **options):
+        paths = options["paths"] or ["/book/", "/book/?page_size=50"]
+        if options["token"] and not options["paths"]:
+            paths += ["/borrowing/", "/payment/"]
+        headers = {}
+        if options["token"]:
+            headers["Authorization"] = f"Bearer {options['token']}"
+
+        for label, base_url in (
+            ("wsgi", options["wsgi_url"]),
+            ("asgi", options["asgi_url"]),
+        ):
+            for path in paths:
+                result = asyncio.run(
+                    self.load(
+                        base_url.rstrip("/") + path,
+                        headers,
+                        options["concurrency"],
+                        options["requests"],
+                    )
+                )
+                self.report(label, path, result)
+
+    async def load(self, url, headers, concurrency, total):
+        latencies = []
+        errors = 0
+        remaining = iter(range(total))
+        limits = httpx.Limits(max_connections=concurrency)
+        timeout = httpx.Timeout(REQUEST_TIMEOUT)
+
+        async with httpx.AsyncClient(
+            headers=headers, limits=limits, timeout=timeout
+        ) as client:
+            try:
+                response = await client.get(url)
+            except httpx.HTTPError as error:
+                raise CommandError(f"{url} is not reachable: {error}")
+            if response.status_code != 200:
+                raise CommandError(f"{url} answered {response.status_code}")
+
+            async def worker():
+                nonlocal errors
+                for _ in remaining:
+                    started = time.perf_counter()
+                    try:
+                        response = await client.get(url)
+                        ok = response.status_code == 200
+                    except httpx.HTTPError:
+                        ok = False
+                    latencies.append(time.perf_counter() - started)
+                    errors += not ok
+
+            started = time.perf_counter()
+            await asyncio.gather(*(worker() for _ in range(concurrency)))
+            elapsed = time.perf_counter() - started
+        return latencies, errors, elapsed
+
+    def report(self, label, path, result):
+        latencies, errors, elapsed = result
+        cuts = statistics.quantiles(latencies, n=100)
+        self.stdout.write(
+            f"{label} {path:<24} {len(latencies) / elapsed:8.1f} req/s "
+            f"p50={cuts[49] * 1000:7.1f}ms p99={cuts[98] * 1000:7.1f}ms "
+            f"errors={errors}"
+        )
@@ -0,0 +1,75 @@
+import time
+from itertools import cycle, islice
+
+from django.core.management.base import BaseCommand
+from rest_framework.renderers import JSONRenderer
+
+from books.serializers import BookListSerializer
+from borrowing.serializers import BorrowingSerializer
+from core.compression import ENCODINGS
+from core.management.commands.bench_serializers import list_querysets
+from core.renderers import ORJSONRenderer
+from core.values import values_serializer
+
+ENDPOINTS = {BookListSerializer: "/book/", BorrowingSerializer: "/borrowing/"}
+
+
+class Command(BaseCommand):
+    help = (
+        "Render /book/ and /borrowing/ payloads with JSONRenderer and "
+        "ORJSONRenderer, then compress them with gzip and brotli, and "
+        "report the time and size of each step."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--rows",
+            type=int,
+            nargs="+",
+            default=[1_000, 100_000],
+            help="Payload sizes; rows are repeated when the table has fewer.",
+        )
+        parser.add_argument("--repeat", type=int, default=3)
+
+    def handle(self, *args, **options):
+        repeat = options["repeat"]
+        for serializer_class, queryset in list_querysets():
+            endpoint = ENDPOINTS.get(serializer_class)
+            if endpoint is None:
+                continue
+            fast = values_serializer(serializer_class)
+            for rows in options["rows"]:
+                values = list(queryset.values(*fast.columns)[:rows])
+                if not values:
+                    self.stdout.write(f"{endpoint}: no rows")
+                    break
+                data = fast.many(islice(cycle(values), rows))
+                self.report(endpoint, rows, data, repeat)
+
+    def report(self, endpoint, rows, data, repeat):
+        content = ORJSONRenderer().render(data)
+        if content != JSONRenderer().render(data):
+            self.stderr.write(f"{endpoint}: renderer output differs")
+
+        timings = {
+            "JSONRenderer": (lambda: JSONRenderer().render(data), content),
+            "ORJSONRenderer": (lambda: ORJSONRenderer().render(data), content),
+        }
+        for coding, (compress, _, _) in ENCODINGS.items():
+            timings[coding] = (
+                lambda compress=compress: compress(content),
+                compress(content),
+            )
+
+        for label, (run, output) in timings.items():
+            best = min(self.measure(run) for _ in range(repeat))
+            self.stdout.write(
+                f"{endpoint:<12} {rows:>8,} rows {label:<16} "
+                f"{best * 1000:10.1f} ms {len(output):>14,} bytes"
+            )
+
+    @staticmethod
+    def measure(run):
+        started = time.perf_counter()
+        run()
+        return time.perf_counter() - started
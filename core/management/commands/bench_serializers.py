@@ -0,0 +1,76 @@
+import time
+
+from django.core.management.base import BaseCommand
+from rest_framework.renderers import JSONRenderer
+
+from books.models import Book
+from books.serializers import BookListSerializer
+from borrowing.models import Borrowing
+from borrowing.serializers import BorrowingSerializer
+from core.values import values_serializer
+from payment.models import Payment
+from payment.serializers import PaymentSerializer
+
+
+def list_querysets():
+    """The querysets the list endpoints serialize, in their page order."""
+    return [
+        (BookListSerializer, Book.objects.order_by("id")),
+        (
+            BorrowingSerializer,
+            Borrowing.objects.select_related("book", "user", "payment")
+            .only(*BorrowingSerializer.queryset_fields())
+            .order_by("-borrow_date", "-id"),
+        ),
+        (PaymentSerializer, Payment.objects.order_by("id")),
+    ]
+
+
+class Command(BaseCommand):
+    help = (
+        "Serialize the rows of the list endpoints with the ModelSerializers "
+        "and with their values() twins, and report rows per second for "
+        "serialization alone and for fetching plus serialization."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=5000)
+        parser.add_argument("--repeat", type=int, default=5)
+
+    def handle(self, *args, **options):
+        rows, repeat = options["rows"], options["repeat"]
+        renderer = JSONRenderer()
+        for serializer_class, queryset in list_querysets():
+            fast = values_serializer(serializer_class)
+            instances = list(queryset[:rows])
+            values = list(queryset.values(*fast.columns)[:rows])
+            if not instances:
+                self.stdout.write(f"{serializer_class.__name__}: no rows")
+                continue
+            if renderer.render(fast.many(values)) != renderer.render(
+                serializer_class(instances, many=True).data
+            ):
+                self.stderr.write(f"{serializer_class.__name__}: output differs")
+
+            timings = {
+                "model serialize": lambda: serializer_class(instances, many=True).data,
+                "values serialize": lambda: fast.many(values),
+                "model fetch+serialize": lambda: serializer_class(
+                    list(queryset[:rows]), many=True
+                ).data,
+                "values fetch+serialize": lambda: fast.many(
+                    queryset.values(*fast.columns)[:rows]
+                ),
+            }
+            for label, run in timings.items():
+                best = min(self.measure(run) for _ in range(repeat))
+                self.stdout.write(
+                    f"{serializer_class.__name__:<20} {label:<24} "
+                    f"{len(instances) / best:12,.0f} rows/s"
+                )
+
+    @staticmethod
+    def measure(run):
+        started = time.perf_counter()
+        run()
+        return time.perf_counter() - started
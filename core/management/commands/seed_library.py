@@ -0,0 +1,370 @@
+import io
+import random
+import time
+from datetime import date, datetime, time as day_time, timedelta, timezone
+from decimal import Decimal
+from itertools import accumulate, islice
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from books.cache import bump_catalog_version
+from books.models import Book
+from borrowing.scheduler import schedule_active_borrowings
+
+WORDS = (
+    "shadow river empire garden winter silver kingdom voyage secret forest "
+    "machine ocean crown memory harbor storm dream castle desert island ember "
+    "frontier lantern mirror"
+).split()
+NAMES = (
+    "Anna Oleh Maria Taras Iryna Bohdan Olena Andrii Sofia Dmytro Kateryna "
+    "Mykola Yulia Serhii Nadia Ivan"
+).split()
+SURNAMES = (
+    "Kovalenko Shevchenko Bondarenko Melnyk Tkachenko Kravchenko Oliinyk "
+    "Lysenko Moroz Rudenko Savchenko Marchenko Petrenko Hrytsenko"
+).split()
+
+
+class CopySource(io.TextIOBase):
+    """Readable file over a generator of COPY lines, so rows are never all in memory."""
+
+    def __init__(self, lines):
+        self.lines = lines
+        self.buffer = ""
+
+    def readable(self):
+        return True
+
+    def read(self, size=-1):
+        while size < 0 or len(self.buffer) < size:
+            chunk = "".join(islice(self.lines, 1000))
+            if not chunk:
+                break
+            self.buffer += chunk
+        if size < 0:
+            size = len(self.buffer)
+        data, self.buffer = self.buffer[:size], self.buffer[size:]
+        return data
+
+
+def copy_rows(cursor, table, columns, rows):
+    """COPY tuples into table; None becomes NULL."""
+    lines = (
+        "\t".join(r"\N" if value is None else str(value) for value in row) + "\n"
+        for row in rows
+    )
+    cursor.copy_expert(
+        f"COPY {table} ({', '.join(columns)}) FROM STDIN", CopySource(lines), 65536
+    )
+
+
+def next_ids(cursor, table, count):
+    """
+    Reserve `count` ids from the table's sequence, so rows can be COPYed
+    with explicit ids and referenced before they exist.
+    """
+    cursor.execute(
+        "SELECT setval(pg_get_serial_sequence(%s, 'id'), "
+        "nextval(pg_get_serial_sequence(%s, 'id')) + %s - 1)",
+        [table, table, count],
+    )
+    last = cursor.fetchone()[0]
+    return range(last - count + 1, last + 1)
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate users, books, borrowings and payments for load testing. "
+        "Book popularity follows a Zipf distribution; the same --seed gives "
+        "the same data relative to today."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=10_000)
+        parser.add_argument("--books", type=int, default=5_000)
+        parser.add_argument("--borrowings", type=int, default=100_000)
+        parser.add_argument("--seed", type=int, default=42)
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=730,
+            help="Spread borrow dates over this many days.",
+        )
+        parser.add_argument(
+            "--zipf", type=float, default=1.1, help="Exponent of book popularity."
+        )
+        parser.add_argument(
+            "--overdue-ratio",
+            type=float,
+            default=0.05,
+            help="Share of past-due borrowings that were never returned.",
+        )
+        parser.add_argument(
+            "--paid-ratio",
+            type=float,
+            default=0.8,
+            help="Share of active borrowings whose payment is already PAID.",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=100_000,
+            help="Borrowings per COPY and transaction; bounds memory use.",
+        )
+        parser.add_argument(
+            "--flush",
+            action="store_true",
+            help="Delete the data of an earlier run with the same --seed first.",
+        )
+
+    def handle(self, *args, **options):
+        if options["users"] < 1 or options["books"] < 1:
+            raise CommandError("At least one user and one book are needed.")
+        self.rng = random.Random(options["seed"])
+        self.today = date.today()
+        self.now = datetime.now(timezone.utc)
+        started = time.perf_counter()
+
+        seeded_users, seeded_books = self.seeded(options["seed"])
+        if options["flush"]:
+            # Borrowings, payments and due-date events go with their users and books
+            with transaction.atomic():
+                seeded_users.delete()
+                seeded_books.delete()
+        elif seeded_users.exists() or seeded_books.exists():
+            raise CommandError(
+                f"Data of --seed {options['seed']} already exists; "
+                "pass --flush to replace it."
+            )
+
+        with connection.cursor() as cursor:
+            with transaction.atomic():
+                user_ids = self.seed_users(cursor, options)
+                books = self.seed_books(cursor, options)
+            self.log("users and books", options["users"] + options["books"], started)
+
+            # Popular books first in a shuffled order, weighted 1/rank^s
+            ranked = list(books)
+            self.rng.shuffle(ranked)
+            weights = accumulate(
+                1 / rank ** options["zipf"] for rank in range(1, len(ranked) + 1)
+            )
+            popularity = (ranked, list(weights))
+
+            remaining = options["borrowings"]
+            while remaining:
+                count = min(remaining, options["chunk_size"])
+                with transaction.atomic():
+                    self.seed_borrowings(
+                        cursor, count, user_ids, books, popularity, options
+                    )
+                remaining -= count
+                self.log("borrowings", options["borrowings"] - remaining, started)
+
+            with transaction.atomic():
+                self.log("books on loan", self.lend_books(cursor, books), started)
+            self.log("due-date events", schedule_active_borrowings(), started)
+
+            for table in (
+                "user_user",
+                "books_book",
+                "borrowing_borrowing",
+                "borrowing_scheduledevent",
+                "payment_payment",
+            ):
+                cursor.execute(f"ANALYZE {table}")
+        bump_catalog_version()
+        self.stdout.write(
+            self.style.SUCCESS(f"Seeded in {time.perf_counter() - started:.1f}s")
+        )
+
+    @staticmethod
+    def seeded(seed):
+        """Users and books of an earlier run with the same seed."""
+        return (
+            get_user_model().objects.filter(
+                email__startswith=f"seed{seed}-", email__endswith="@library.test"
+            ),
+            Book.objects.filter(title__regex=rf" #{seed}-[0-9]+$"),
+        )
+
+    def log(self, label, count, started):
+        elapsed = time.perf_counter() - started
+        self.stdout.write(f"{label}: {count} rows, {elapsed:.1f}s")
+
+    def seed_users(self, cursor, options):
+        ids = next_ids(cursor, "user_user", options["users"])
+        password = make_password("password")
+        seed = options["seed"]
+        copy_rows(
+            cursor,
+            "user_user",
+            (
+                "id",
+                "password",
+                "is_superuser",
+                "first_name",
+                "last_name",
+                "is_staff",
+                "is_active",
+                "date_joined",
+                "email",
+                "updated_at",
+                "token_version",
+            ),
+            (
+                (
+                    user_id,
+                    password,
+                    "f",
+                    self.rng.choice(NAMES),
+                    self.rng.choice(SURNAMES),
+                    "f",
+                    "t",
+                    self.now,
+                    f"seed{seed}-{number}@library.test",
+                    self.now,
+                    0,
+                )
+                for number, user_id in enumerate(ids)
+            ),
+        )
+        return ids
+
+    def seed_books(self, cursor, options):
+        ids = next_ids(cursor, "books_book", options["books"])
+        seed = options["seed"]
+        books = {book_id: Decimal(self.rng.randrange(50, 500)) / 100 for book_id in ids}
+        copy_rows(
+            cursor,
+            "books_book",
+            (
+                "id",
+                "title",
+                "author",
+                "cover",
+                "inventory",
+                "daily_price",
+                "updated_at",
+            ),
+            (
+                (
+                    book_id,
+                    f"The {self.rng.choice(WORDS).title()} of the "
+                    f"{self.rng.choice(WORDS).title()} #{seed}-{number}",
+                    f"{self.rng.choice(NAMES)} {self.rng.choice(SURNAMES)}",
+                    self.rng.choice(("HARD", "SOFT")),
+                    self.rng.randint(1, 20),
+                    price,
+                    self.now,
+                )
+                for number, (book_id, price) in enumerate(books.items())
+            ),
+        )
+        return books
+
+    def lend_books(self, cursor, books):
+        """
+        Take the copies of active borrowings off the shelf, as borrowing does.
+        Books lent out more often than they have copies end up with none left.
+        """
+        cursor.execute(
+            """
+            UPDATE books_book AS book
+            SET inventory = GREATEST(book.inventory - lent.count, 0)
+            FROM (
+                SELECT book_id, count(*) AS count
+                FROM borrowing_borrowing
+                WHERE actual_return_date IS NULL AND book_id BETWEEN %s AND %s
+                GROUP BY book_id
+            ) AS lent
+            WHERE book.id = lent.book_id
+            """,
+            [min(books), max(books)],
+        )
+        return cursor.rowcount
+
+    def seed_borrowings(self, cursor, count, user_ids, prices, popularity, options):
+        rng, today = self.rng, self.today
+        borrowing_ids = next_ids(cursor, "borrowing_borrowing", count)
+        payment_ids = next_ids(cursor, "payment_payment", count)
+        ranked, weights = popularity
+        book_ids = rng.choices(ranked, cum_weights=weights, k=count)
+        borrowings, payments = [], []
+        for borrowing_id, payment_id, book_id in zip(
+            borrowing_ids, payment_ids, book_ids
+        ):
+            borrow_date = today - timedelta(days=rng.randrange(options["days"]))
+            duration = rng.randint(7, 30)
+            expected = borrow_date + timedelta(days=duration)
+            if expected < today:
+                returned = rng.random() >= options["overdue_ratio"]
+                latest = min(duration + 3, (today - borrow_date).days)
+            else:
+                returned = rng.random() < 0.3
+                latest = (today - borrow_date).days
+            actual = (
+                borrow_date + timedelta(days=rng.randint(0, latest))
+                if returned
+                else None
+            )
+            paid = returned or rng.random() < options["paid_ratio"]
+
+            borrowings.append(
+                (
+                    borrowing_id,
+                    borrow_date,
+                    expected,
+                    actual,
+                    book_id,
+                    rng.choice(user_ids),
+                    self.now,
+                )
+            )
+            payments.append(
+                (
+                    payment_id,
+                    "PAID" if paid else "PENDING",
+                    "PAYMENT",
+                    borrowing_id,
+                    "",
+                    f"cs_seed_{payment_id}",
+                    duration * prices[book_id],
+                    datetime.combine(borrow_date, day_time(12), timezone.utc),
+                    self.now,
+                )
+            )
+        copy_rows(
+            cursor,
+            "borrowing_borrowing",
+            (
+                "id",
+                "borrow_date",
+                "expected_return_date",
+                "actual_return_date",
+                "book_id",
+                "user_id",
+                "updated_at",
+            ),
+            borrowings,
+        )
+        copy_rows(
+            cursor,
+            "payment_payment",
+            (
+                "id",
+                "status",
+                "type",
+                "borrowing_id",
+                "session_url",
+                "session_id",
+                "money_to_pay",
+                "created_at",
+                "updated_at",
+            ),
+            payments,
+        )
@@ -0,0 +1,245 @@
+import hmac
+import logging
+import os
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from urllib.parse import urlsplit
+
+import requests
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.http import HttpResponse
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+from rest_framework import serializers
+
+logger = logging.getLogger(__name__)
+
+LABELS = ("route", "method")
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 250, float("inf"))
+MAX_CAPTURED_QUERIES = 50
+
+REQUEST_SECONDS = Histogram(
+    "library_request_duration_seconds",
+    "Time spent handling a request.",
+    LABELS + ("status",),
+)
+SQL_QUERIES = Histogram(
+    "library_request_sql_queries",
+    "SQL statements executed per request.",
+    LABELS,
+    buckets=QUERY_BUCKETS,
+)
+SQL_SECONDS = Histogram(
+    "library_request_sql_seconds", "Time spent in SQL per request.", LABELS
+)
+SERIALIZER_SECONDS = Histogram(
+    "library_request_serializer_seconds",
+    "Time spent serializing response data per request.",
+    LABELS,
+)
+OUTBOUND_SECONDS = Histogram(
+    "library_request_outbound_http_seconds",
+    "Time spent in outbound HTTP calls per request.",
+    LABELS,
+)
+OUTBOUND_CALL_SECONDS = Histogram(
+    "library_outbound_http_call_seconds",
+    "Duration of each outbound HTTP call, from requests and workers alike.",
+    ("host",),
+)
+
+
+@dataclass
+class RequestStats:
+    sql_count: int = 0
+    sql_seconds: float = 0.0
+    serializer_seconds: float = 0.0
+    outbound_seconds: float = 0.0
+    queries: list = field(default_factory=list)
+
+
+_current = ContextVar("request_stats", default=None)
+
+
+def _record_query(execute, sql, params, many, context):
+    stats = _current.get()
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        if stats is not None:
+            elapsed = time.perf_counter() - started
+            stats.sql_count += 1
+            stats.sql_seconds += elapsed
+            if len(stats.queries) < MAX_CAPTURED_QUERIES:
+                stats.queries.append((elapsed, sql))
+
+
+@contextmanager
+def serializer_timer():
+    """Count the block as serializer time, for output built without a DRF serializer."""
+    stats = _current.get()
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        if stats is not None:
+            stats.serializer_seconds += time.perf_counter() - started
+
+
+def _timed_serializer_data(data_property):
+    def data(self):
+        with serializer_timer():
+            return data_property.fget(self)
+
+    data.timed = True
+    return property(data)
+
+
+def _timed_send(send):
+    def timed_send(self, request, **kwargs):
+        started = time.perf_counter()
+        try:
+            return send(self, request, **kwargs)
+        finally:
+            elapsed = time.perf_counter() - started
+            OUTBOUND_CALL_SECONDS.labels(urlsplit(request.url).hostname or "").observe(
+                elapsed
+            )
+            stats = _current.get()
+            if stats is not None:
+                stats.outbound_seconds += elapsed
+
+    timed_send.__wrapped__ = send
+    return timed_send
+
+
+def _wrap_connection(sender, connection, **kwargs):
+    if _record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_record_query)
+
+
+def install_hooks():
+    """
+    Time SQL, serializer output and outbound HTTP. Every connection counts
+    its queries into the current request's stats, which follow the request
+    into sync_to_async threads. Top-level `.data` is the one place a DRF
+    response gets serialized; Stripe and Telegram both go through
+    requests.Session.send.
+    """
+    connection_created.connect(_wrap_connection, dispatch_uid="core.metrics")
+    if not hasattr(requests.Session.send, "__wrapped__"):
+        requests.Session.send = _timed_send(requests.Session.send)
+    if not getattr(serializers.BaseSerializer.data.fget, "timed", False):
+        serializers.BaseSerializer.data = _timed_serializer_data(
+            serializers.BaseSerializer.data
+        )
+
+
+class MetricsMiddleware:
+    """
+    Record duration, SQL count and time, serializer time and outbound HTTP
+    time per resolved route, and log slow requests with their SQL.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.slow_threshold = settings.SLOW_REQUEST_SECONDS
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        stats = RequestStats()
+        token = _current.set(stats)
+        started = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        self.observe(request, response, time.perf_counter() - started, stats)
+        return response
+
+    async def __acall__(self, request):
+        stats = RequestStats()
+        token = _current.set(stats)
+        started = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        self.observe(request, response, time.perf_counter() - started, stats)
+        return response
+
+    def observe(self, request, response, elapsed, stats):
+        match = request.resolver_match
+        route = match.view_name if match else "unmatched"
+        if route == "metrics":
+            return
+        labels = (route, request.method)
+        REQUEST_SECONDS.labels(*labels, response.status_code).observe(elapsed)
+        SQL_QUERIES.labels(*labels).observe(stats.sql_count)
+        SQL_SECONDS.labels(*labels).observe(stats.sql_seconds)
+        SERIALIZER_SECONDS.labels(*labels).observe(stats.serializer_seconds)
+        OUTBOUND_SECONDS.labels(*labels).observe(stats.outbound_seconds)
+
+        if elapsed >= self.slow_threshold:
+            self.log_slow_request(request, route, elapsed, stats)
+
+    @staticmethod
+    def log_slow_request(request, route, elapsed, stats):
+        queries = "\n".join(
+            f"  {seconds * 1000:.1f}ms {sql}" for seconds, sql in stats.queries
+        )
+        logger.warning(
+            "Slow request %s %s (%s): %.3fs, %s queries in %.3fs, "
+            "serializer %.3fs, outbound HTTP %.3fs\n%s",
+            request.method,
+            request.get_full_path(),
+            route,
+            elapsed,
+            stats.sql_count,
+            stats.sql_seconds,
+            stats.serializer_seconds,
+            stats.outbound_seconds,
+            queries,
+        )
+
+
+def metrics_authorized(request) -> bool:
+    """The scraper sends METRICS_TOKEN as a bearer token; unset, nobody may read."""
+    token = settings.METRICS_TOKEN
+    scheme, _, credentials = request.headers.get("Authorization", "").partition(" ")
+    return (
+        bool(token)
+        and scheme.lower() == "bearer"
+        and hmac.compare_digest(credentials.encode(), token.encode())
+    )
+
+
+def metrics_view(request):
+    """Prometheus text exposition; aggregates worker processes in multiprocess mode."""
+    if not metrics_authorized(request):
+        response = HttpResponse("Unauthorized.", status=401, content_type="text/plain")
+        response.headers["WWW-Authenticate"] = 'Bearer realm="metrics"'
+        return response
+    registry = REGISTRY
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    return HttpResponse(generate_latest(registry), content_type=CONTENT_TYPE_LATEST)
@@ -0,0 +1,149 @@
+import json
+from base64 import b64decode, b64encode
+from urllib import parse
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+from django.utils.encoding import force_str
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, CursorPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Cursor pagination over a unique, indexed ordering such as ("-borrow_date", "-id").
+    The cursor carries the ordering values of the row at the page edge, so
+    every page is a single index range scan however deep the client scrolls.
+    """
+
+    ordering = ("-id",)
+    page_size = 50
+    page_size_query_param = "page_size"
+    max_page_size = 200
+    cursor_query_param = "cursor"
+    cursor_query_description = "The pagination cursor value."
+    page_size_query_description = "Number of results to return per page."
+    invalid_cursor_message = "Invalid cursor"
+
+    def paginate_queryset(self, queryset, request, view=None):
+        return self.build_page(list(self.get_page_queryset(queryset, request)))
+
+    def get_page_queryset(self, queryset, request):
+        """Return the sliced queryset for the requested page, still unevaluated."""
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+        self.reverse, position = self.decode_cursor(request, queryset.model)
+
+        ordering = self.ordering
+        if self.reverse:
+            ordering = tuple(self._invert(field) for field in ordering)
+        queryset = queryset.order_by(*ordering)
+        if position is not None:
+            queryset = queryset.filter(self._seek(ordering, position))
+        self.has_cursor = position is not None
+        return queryset[: self.page_size + 1]
+
+    def build_page(self, rows):
+        """Trim the look-ahead row and work out which links exist."""
+        has_more = len(rows) > self.page_size
+        rows = rows[: self.page_size]
+        if self.reverse:
+            rows.reverse()
+            self.has_next, self.has_previous = True, has_more
+        else:
+            self.has_next, self.has_previous = has_more, self.has_cursor
+        self.page = rows
+        return rows
+
+    def get_paginated_response(self, data):
+        return Response(
+            {
+                "next": self.get_next_link(),
+                "previous": self.get_previous_link(),
+                "results": data,
+            }
+        )
+
+    def get_paginated_response_schema(self, schema):
+        return CursorPagination.get_paginated_response_schema(self, schema)
+
+    def get_schema_operation_parameters(self, view):
+        return CursorPagination.get_schema_operation_parameters(self, view)
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        if page_size <= 0:
+            return self.page_size
+        return min(page_size, self.max_page_size)
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if not self.page:
+            return remove_query_param(self.base_url, self.cursor_query_param)
+        return self.encode_cursor(self.page[0], reverse=True)
+
+    def encode_cursor(self, row, reverse):
+        position = [self._value(row, field.lstrip("-")) for field in self.ordering]
+        payload = json.dumps({"r": reverse, "p": position}, cls=DjangoJSONEncoder)
+        cursor = b64encode(payload.encode("utf-8")).decode("ascii")
+        return replace_query_param(self.base_url, self.cursor_query_param, cursor)
+
+    def decode_cursor(self, request, model):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return False, None
+        try:
+            payload = json.loads(b64decode(parse.unquote(encoded).encode("ascii")))
+            values = payload["p"]
+            if len(values) != len(self.ordering):
+                raise ValueError
+            position = [
+                model._meta.get_field(field.lstrip("-")).to_python(value)
+                for field, value in zip(self.ordering, values)
+            ]
+            return bool(payload["r"]), position
+        except Exception:
+            raise NotFound(self.invalid_cursor_message)
+
+    def to_html(self):
+        return ""
+
+    @staticmethod
+    def _invert(field):
+        return field[1:] if field.startswith("-") else f"-{field}"
+
+    @staticmethod
+    def _value(row, name):
+        if isinstance(row, dict):
+            return row[name]
+        return getattr(row, force_str(row._meta.get_field(name).attname))
+
+    @staticmethod
+    def _seek(ordering, position):
+        """
+        Build "rows after position" in a form the planner can use as an index
+        range: f1 <= p1 AND (f1 < p1 OR (f2 <= p2 AND (f2 < p2 OR ...))).
+        """
+        condition = None
+        for field, value in reversed(list(zip(ordering, position))):
+            name = field.lstrip("-")
+            strict = "lt" if field.startswith("-") else "gt"
+            loose = "lte" if field.startswith("-") else "gte"
+            after = Q(**{f"{name}__{strict}": value})
+            if condition is None:
+                condition = after
+            else:
+                condition = Q(**{f"{name}__{loose}": value}) & (after | condition)
+        return condition
@@ -0,0 +1,43 @@
+import orjson
+from rest_framework.renderers import JSONRenderer
+
+# Datetimes, dates and times go to the encoder, which writes datetimes in
+# DRF's format (milliseconds, "Z" for UTC) rather than orjson's
+ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+
+# JSONRenderer escapes these for pages that embed the JSON in a <script>
+LINE_SEPARATORS = (
+    ("\u2028".encode(), b"\\u2028"),
+    ("\u2029".encode(), b"\\u2029"),
+)
+
+
+class ORJSONRenderer(JSONRenderer):
+    """
+    JSONRenderer encoding with orjson. Strings, numbers, dicts, lists and
+    UUIDs are encoded by orjson, anything else (Decimal, dates, lazy strings,
+    querysets) by the encoder_class, so the output is that of JSONRenderer;
+    only floats in exponent form are spelled differently (1e16, not 1e+16).
+    Indented or ASCII-only output, and data orjson cannot encode, such as
+    integers over 64 bits, are left to JSONRenderer.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        if (
+            self.ensure_ascii
+            or not self.compact
+            or self.get_indent(accepted_media_type, renderer_context or {})
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            content = orjson.dumps(
+                data, default=self.encoder_class().default, option=ORJSON_OPTIONS
+            )
+        except orjson.JSONEncodeError:
+            return super().render(data, accepted_media_type, renderer_context)
+        for separator, escaped in LINE_SEPARATORS:
+            if separator in content:
+                content = content.replace(separator, escaped)
+        return content
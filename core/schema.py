@@ -0,0 +1,96 @@
+import hashlib
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+
+from django.conf import settings
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response
+from drf_spectacular.renderers import OpenApiJsonRenderer, OpenApiYamlRenderer
+from drf_spectacular.settings import spectacular_settings
+from drf_spectacular.utils import extend_schema
+from drf_spectacular.views import SCHEMA_KWARGS, SpectacularAPIView
+
+SCHEMA_RENDERERS = {"json": OpenApiJsonRenderer, "yaml": OpenApiYamlRenderer}
+SCHEMA_FILE = "schema.{}"
+
+
+@dataclass(frozen=True)
+class RenderedSchema:
+    content: bytes
+    etag: str
+
+
+_schemas = None
+_lock = threading.Lock()
+
+
+def render_schema() -> dict:
+    """Introspect every view once and serialize the result in each format."""
+    generator = spectacular_settings.DEFAULT_GENERATOR_CLASS()
+    schema = generator.get_schema(request=None, public=True)
+    return {
+        name: renderer().render(schema, renderer_context={})
+        for name, renderer in SCHEMA_RENDERERS.items()
+    }
+
+
+def read_baked_schema(directory) -> dict | None:
+    paths = {
+        name: Path(directory) / SCHEMA_FILE.format(name) for name in SCHEMA_RENDERERS
+    }
+    if not all(path.is_file() for path in paths.values()):
+        return None
+    return {name: path.read_bytes() for name, path in paths.items()}
+
+
+def get_schemas() -> dict:
+    """
+    The schema in every format, built on first use and kept for the life
+    of the process; a schema baked into OPENAPI_SCHEMA_DIR is read instead.
+    """
+    global _schemas
+    if _schemas is None:
+        with _lock:
+            if _schemas is None:
+                directory = settings.OPENAPI_SCHEMA_DIR
+                contents = (
+                    directory and read_baked_schema(directory)
+                ) or render_schema()
+                _schemas = {
+                    name: RenderedSchema(
+                        content, f'"{hashlib.sha256(content).hexdigest()[:32]}"'
+                    )
+                    for name, content in contents.items()
+                }
+    return _schemas
+
+
+def clear_schema_cache() -> None:
+    global _schemas
+    _schemas = None
+
+
+class CachedSchemaView(SpectacularAPIView):
+    """
+    SpectacularAPIView answering from the pre-serialized schema of
+    get_schemas(), with an ETag, so page loads of the Swagger and Redoc UIs
+    no longer introspect every view.
+    """
+
+    @extend_schema(**SCHEMA_KWARGS)
+    def get(self, request, *args, **kwargs):
+        renderer = request.accepted_renderer
+        schema = get_schemas()[renderer.format]
+
+        response = get_conditional_response(request._request, etag=schema.etag)
+        if response is None:
+            content_type = renderer.media_type
+            if renderer.charset:
+                content_type = f"{content_type}; charset={renderer.charset}"
+            response = HttpResponse(schema.content, content_type=content_type)
+            response.headers["Content-Disposition"] = (
+                f'inline; filename="{self._get_filename(request, None)}"'
+            )
+        response.headers["ETag"] = schema.etag
+        return response
@@ -0,0 +1,103 @@
+import time
+
+from celery import current_app, shared_task
+from celery.signals import (
+    before_task_publish,
+    task_failure,
+    task_postrun,
+    task_prerun,
+    task_retry,
+)
+from prometheus_client import Counter, Gauge, Histogram
+
+SENT_AT_HEADER = "library_sent_at"
+NOT_FOUND = "404"
+LAG_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2, 3, 5, 10, 30, 60, 300, float("inf"))
+
+TASKS_PUBLISHED = Counter(
+    "library_task_published_total", "Tasks sent to the broker.", ("task",)
+)
+TASK_QUEUE_LAG = Histogram(
+    "library_task_queue_lag_seconds",
+    "Time from publishing a task to a worker starting it.",
+    ("task",),
+    buckets=LAG_BUCKETS,
+)
+TASK_RUNTIME = Histogram(
+    "library_task_runtime_seconds",
+    "Task execution time by final state.",
+    ("task", "state"),
+    buckets=LAG_BUCKETS,
+)
+TASK_RETRIES = Counter("library_task_retries_total", "Task retries.", ("task",))
+TASK_FAILURES = Counter("library_task_failures_total", "Failed tasks.", ("task",))
+QUEUE_DEPTH = Gauge(
+    "library_celery_queue_depth",
+    "Messages waiting in a broker queue, sampled by a beat task.",
+    ("queue",),
+    multiprocess_mode="livemax",
+)
+
+# perf_counter at task start, keyed by task id; prerun and postrun run in the same process
+_started = {}
+
+
+@before_task_publish.connect
+def stamp_publish_time(sender=None, headers=None, **kwargs):
+    if headers is not None:
+        headers[SENT_AT_HEADER] = time.time()
+    TASKS_PUBLISHED.labels(sender).inc()
+
+
+@task_prerun.connect
+def record_queue_lag(task_id=None, task=None, **kwargs):
+    _started[task_id] = time.perf_counter()
+    # Workers expose message headers as request attributes, eager runs under .headers
+    sent_at = getattr(task.request, SENT_AT_HEADER, None) or (
+        task.request.headers or {}
+    ).get(SENT_AT_HEADER)
+    if sent_at is not None:
+        TASK_QUEUE_LAG.labels(task.name).observe(max(time.time() - sent_at, 0))
+
+
+@task_postrun.connect
+def record_runtime(task_id=None, task=None, state=None, **kwargs):
+    started = _started.pop(task_id, None)
+    if started is not None:
+        TASK_RUNTIME.labels(task.name, state or "UNKNOWN").observe(
+            time.perf_counter() - started
+        )
+
+
+@task_retry.connect
+def count_retry(sender=None, **kwargs):
+    TASK_RETRIES.labels(sender.name).inc()
+
+
+@task_failure.connect
+def count_failure(sender=None, **kwargs):
+    TASK_FAILURES.labels(sender.name).inc()
+
+
+@shared_task
+def sample_queue_depth():
+    """Publish the number of messages waiting in each configured queue."""
+    depths = {}
+    with current_app.connection_for_read() as connection:
+        for name in current_app.amqp.queues:
+            depths[name] = queue_depth(connection, name)
+            QUEUE_DEPTH.labels(name).set(depths[name])
+    return depths
+
+
+def queue_depth(connection, name):
+    # A channel per queue: AMQP closes the channel a failed declare ran on
+    with connection.channel() as channel:
+        try:
+            return channel.queue_declare(queue=name, passive=True).message_count
+        except connection.channel_errors as exc:
+            # Redis keeps no key for an empty list, so an idle queue is
+            # NOT_FOUND; virtual transports give the code as a string
+            if str(getattr(exc, "reply_code", "")) == NOT_FOUND:
+                return 0
+            raise
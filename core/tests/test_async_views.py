@@ -0,0 +1,128 @@
+from datetime import date, timedelta
+from decimal import Decimal
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth import get_user_model
+from django.core.cache import cache, caches
+from django.test import TestCase
+from rest_framework_simplejwt.tokens import AccessToken
+
+from books.models import Book
+from books.search import trigram_available
+from borrowing.models import Borrowing
+from payment.models import Payment
+
+User = get_user_model()
+
+
+class AsyncReadViewTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        caches["local"].clear()
+        self.user = User.objects.create_user(email="user@example.com", password="pw")
+        self.other = User.objects.create_user(email="other@example.com", password="pw")
+        self.books = [
+            Book.objects.create(
+                title=f"Book {number}",
+                author="Author",
+                cover=Book.CoverType.HARD,
+                inventory=3,
+                daily_price=Decimal("1.00"),
+            )
+            for number in range(3)
+        ]
+        self.borrowing = Borrowing.objects.create(
+            borrow_date=date.today(),
+            expected_return_date=date.today() + timedelta(days=3),
+            book=self.books[0],
+            user=self.user,
+        )
+        self.foreign_borrowing = Borrowing.objects.create(
+            borrow_date=date.today(),
+            expected_return_date=date.today() + timedelta(days=3),
+            book=self.books[1],
+            user=self.other,
+        )
+        Payment.objects.create(
+            borrowing=self.borrowing,
+            money_to_pay=Decimal("3.00"),
+            status=Payment.PaymentStatus.PENDING,
+            type=Payment.PaymentType.PAYMENT,
+        )
+        self.headers = {"Authorization": f"Bearer {AccessToken.for_user(self.user)}"}
+
+    async def assert_same_as_sync(self, path, headers=None):
+        headers = headers or {}
+        expected = await self.async_to_sync_get(path, headers)
+        response = await self.async_client.get(f"/async{path}", headers=headers)
+        self.assertEqual(response.status_code, expected.status_code)
+        # Pagination links point back at the async routes
+        self.assertEqual(
+            response.content.decode().replace("/async/", "/"),
+            expected.content.decode(),
+        )
+        return response
+
+    async def async_to_sync_get(self, path, headers):
+        return await sync_to_async(self.client.get)(path, headers=headers)
+
+    async def test_book_list_and_detail_match_sync_views(self):
+        await self.assert_same_as_sync("/book/")
+        await self.assert_same_as_sync("/book/?page_size=2")
+        await self.assert_same_as_sync(f"/book/{self.books[0].pk}/")
+        await self.assert_same_as_sync("/book/?search=book")
+
+    async def test_search_before_any_sync_request(self):
+        # The first search of a process looks up pg_trgm in the database
+        trigram_available.cache_clear()
+        self.addCleanup(trigram_available.cache_clear)
+        response = await self.async_client.get("/async/book/?search=book")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()["results"]), 3)
+
+    async def test_missing_book_is_404(self):
+        response = await self.async_client.get("/async/book/999999/")
+        self.assertEqual(response.status_code, 404)
+
+    async def test_borrowings_are_scoped_to_the_user(self):
+        response = await self.assert_same_as_sync("/borrowing/", self.headers)
+        ids = [row["id"] for row in response.json()["results"]]
+        self.assertEqual(ids, [self.borrowing.pk])
+
+        await self.assert_same_as_sync(f"/borrowing/{self.borrowing.pk}/", self.headers)
+        response = await self.async_client.get(
+            f"/async/borrowing/{self.foreign_borrowing.pk}/", headers=self.headers
+        )
+        self.assertEqual(response.status_code, 404)
+
+    async def test_payment_list_matches_sync_view(self):
+        response = await self.assert_same_as_sync("/payment/", self.headers)
+        self.assertEqual(len(response.json()), 1)
+
+    async def test_anonymous_and_bad_token_are_rejected(self):
+        response = await self.async_client.get("/async/borrowing/")
+        self.assertEqual(response.status_code, 401)
+        response = await self.async_client.get(
+            "/async/payment/", headers={"Authorization": "Bearer nonsense"}
+        )
+        self.assertEqual(response.status_code, 401)
+
+    async def test_conditional_get_answers_304(self):
+        response = await self.async_client.get(
+            "/async/borrowing/", headers=self.headers
+        )
+        response = await self.async_client.get(
+            "/async/borrowing/",
+            headers={**self.headers, "If-None-Match": response.headers["ETag"]},
+        )
+        self.assertEqual(response.status_code, 304)
+
+    async def test_revoked_token_is_rejected_after_caching(self):
+        response = await self.async_client.get("/async/payment/", headers=self.headers)
+        self.assertEqual(response.status_code, 200)
+
+        self.user.is_staff = True
+        await self.user.asave(update_fields=["is_staff"])
+
+        response = await self.async_client.get("/async/payment/", headers=self.headers)
+        self.assertEqual(response.status_code, 401)
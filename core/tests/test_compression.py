@@ -0,0 +1,132 @@
+import gzip
+from unittest.mock import patch
+
+import brotli
+from django.http import HttpResponse, StreamingHttpResponse
+from django.test import RequestFactory, SimpleTestCase, override_settings
+
+from core.compression import (
+    MAX_RANDOM_BYTES,
+    CompressionMiddleware,
+    brotli_compress,
+    negotiate_encoding,
+)
+from core.schema import clear_schema_cache
+
+CONTENT = b'{"title": "Kobzar", "author": "Taras Shevchenko"}' * 100
+
+
+async def achunks():
+    for _ in range(3):
+        yield CONTENT
+
+
+@override_settings(COMPRESSION_MIN_SIZE=1024)
+class CompressionMiddlewareTests(SimpleTestCase):
+    def compress(self, response, accept_encoding="gzip, deflate, br"):
+        request = RequestFactory().get(
+            "/", headers={"Accept-Encoding": accept_encoding}
+        )
+        return CompressionMiddleware(lambda request: response)(request)
+
+    def test_negotiates_the_preferred_encoding(self):
+        cases = {
+            "gzip, deflate, br": "br",
+            "gzip": "gzip",
+            "GZIP;q=0.8": "gzip",
+            "br;q=0, gzip": "gzip",
+            "br;q=0.5, gzip;q=1.0": "gzip",
+            "*": "br",
+            "*;q=0, gzip": "gzip",
+            "identity": None,
+            "br;q=x": None,
+            "": None,
+        }
+        for header, coding in cases.items():
+            with self.subTest(header=header):
+                self.assertEqual(negotiate_encoding(header), coding)
+
+    def test_compresses_with_brotli(self):
+        response = self.compress(HttpResponse(CONTENT, headers={"ETag": '"v1"'}))
+        self.assertEqual(response["Content-Encoding"], "br")
+        self.assertEqual(brotli.decompress(response.content), CONTENT)
+        self.assertEqual(response["Content-Length"], str(len(response.content)))
+        self.assertEqual(response["Vary"], "Accept-Encoding")
+        self.assertEqual(response["ETag"], 'W/"v1"')
+
+    def test_compresses_with_gzip(self):
+        response = self.compress(HttpResponse(CONTENT), "gzip")
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertEqual(gzip.decompress(response.content), CONTENT)
+
+    def test_compressed_length_varies(self):
+        # BREACH: the length must not tell how well a secret compressed
+        for coding in ("br", "gzip"):
+            with self.subTest(coding=coding):
+                lengths = {
+                    len(self.compress(HttpResponse(CONTENT), coding).content)
+                    for _ in range(20)
+                }
+                self.assertGreater(len(lengths), 1)
+
+    def test_brotli_padding_of_every_size_decodes(self):
+        for size in range(MAX_RANDOM_BYTES):
+            with patch("core.compression.secrets.randbelow", return_value=size):
+                self.assertEqual(brotli.decompress(brotli_compress(CONTENT)), CONTENT)
+
+    def test_small_responses_are_left_alone(self):
+        response = self.compress(HttpResponse(CONTENT[:1023]))
+        self.assertFalse(response.has_header("Content-Encoding"))
+        self.assertEqual(response.content, CONTENT[:1023])
+
+        with override_settings(COMPRESSION_MIN_SIZE=100):
+            response = self.compress(HttpResponse(CONTENT[:1023]))
+        self.assertEqual(response["Content-Encoding"], "br")
+
+    def test_uncompressed_when_not_accepted(self):
+        response = self.compress(HttpResponse(CONTENT), "identity")
+        self.assertFalse(response.has_header("Content-Encoding"))
+        self.assertEqual(response["Vary"], "Accept-Encoding")
+        self.assertEqual(response.content, CONTENT)
+
+    def test_encoded_responses_are_left_alone(self):
+        response = self.compress(
+            HttpResponse(CONTENT, headers={"Content-Encoding": "zstd"})
+        )
+        self.assertEqual(response["Content-Encoding"], "zstd")
+        self.assertEqual(response.content, CONTENT)
+
+    def test_streaming_responses_are_compressed_per_chunk(self):
+        response = self.compress(StreamingHttpResponse([CONTENT] * 3))
+        self.assertEqual(response["Content-Encoding"], "br")
+        self.assertEqual(
+            brotli.decompress(b"".join(response.streaming_content)), CONTENT * 3
+        )
+
+        response = self.compress(StreamingHttpResponse([CONTENT] * 3), "gzip")
+        self.assertEqual(
+            gzip.decompress(b"".join(response.streaming_content)), CONTENT * 3
+        )
+
+    async def test_async_streaming_responses_are_compressed(self):
+        for coding, decompress in (
+            ("br", brotli.decompress),
+            ("gzip", gzip.decompress),
+        ):
+            response = self.compress(StreamingHttpResponse(achunks()), coding)
+            self.assertEqual(response["Content-Encoding"], coding)
+            content = b"".join([chunk async for chunk in response.streaming_content])
+            self.assertEqual(decompress(content), CONTENT * 3)
+
+    def test_weak_etag_still_answers_304(self):
+        clear_schema_cache()
+        self.addCleanup(clear_schema_cache)
+        response = self.client.get("/api/schema/", headers={"Accept-Encoding": "br"})
+        self.assertEqual(response["Content-Encoding"], "br")
+        self.assertTrue(response["ETag"].startswith('W/"'))
+
+        response = self.client.get(
+            "/api/schema/",
+            headers={"Accept-Encoding": "br", "If-None-Match": response["ETag"]},
+        )
+        self.assertEqual(response.status_code, 304)
@@ -0,0 +1,165 @@
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.urls import reverse
+from django.utils.http import http_date
+from rest_framework import status
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import AccessToken
+
+from books.models import Book
+from borrowing.models import Borrowing
+from borrowing.serializers import BorrowingSerializer
+from payment.models import Payment
+
+
+User = get_user_model()
+
+
+class ConditionalGetTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            email="user@example.com", password="password"
+        )
+        self.book = Book.objects.create(
+            title="Dune",
+            author="Frank Herbert",
+            cover=Book.CoverType.HARD,
+            inventory=3,
+            daily_price=Decimal("1.50"),
+        )
+        self.borrowing = Borrowing.objects.create(
+            borrow_date=date.today(),
+            expected_return_date=date.today() + timedelta(days=3),
+            book=self.book,
+            user=self.user,
+        )
+        self.payment = Payment.objects.create(
+            borrowing=self.borrowing, money_to_pay=Decimal("4.50")
+        )
+        self.authenticate(self.user)
+
+    def authenticate(self, user):
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(user)}"
+        )
+
+    def test_responses_carry_validators(self):
+        for url in (f"/book/{self.book.id}/", "/borrowing/", "/payment/"):
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK, url)
+            self.assertTrue(response.headers["ETag"].startswith('"'), url)
+            self.assertIn("Authorization", response.headers["Vary"])
+        self.assertIn("Last-Modified", self.client.get(f"/book/{self.book.id}/"))
+
+    def test_lists_carry_no_last_modified(self):
+        # A row leaving the list would not move the newest timestamp
+        for url in ("/book/", "/borrowing/", "/payment/"):
+            self.assertNotIn("Last-Modified", self.client.get(url), url)
+
+    def test_row_leaving_the_list_invalidates_it(self):
+        Borrowing.objects.create(
+            borrow_date=date.today(),
+            expected_return_date=date.today() + timedelta(days=3),
+            book=self.book,
+            user=self.user,
+        )
+        url = "/borrowing/?is_active=true"
+        first = self.client.get(url)
+        self.assertEqual(len(first.data["results"]), 2)
+        Borrowing.objects.filter(pk=self.borrowing.pk).update(
+            actual_return_date=date.today()
+        )
+
+        response = self.client.get(
+            url,
+            HTTP_IF_NONE_MATCH=first.headers["ETag"],
+            HTTP_IF_MODIFIED_SINCE=http_date(time.time() + 60),
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data["results"]), 1)
+
+        response = self.client.get(
+            url, HTTP_IF_MODIFIED_SINCE=http_date(time.time() + 60)
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_matching_etag_returns_not_modified(self):
+        for url in (f"/book/{self.book.id}/", "/borrowing/", "/payment/"):
+            etag = self.client.get(url).headers["ETag"]
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED, url)
+            self.assertEqual(response.headers["ETag"], etag)
+            self.assertEqual(response.content, b"")
+
+    def test_not_modified_skips_serialization(self):
+        etag = self.client.get("/borrowing/").headers["ETag"]
+        with patch.object(BorrowingSerializer, "to_representation") as serialize:
+            response = self.client.get("/borrowing/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        serialize.assert_not_called()
+
+    def test_if_modified_since_returns_not_modified(self):
+        response = self.client.get(f"/borrowing/{self.borrowing.id}/")
+        response = self.client.get(
+            f"/borrowing/{self.borrowing.id}/",
+            HTTP_IF_MODIFIED_SINCE=response.headers["Last-Modified"],
+        )
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_book_change_invalidates_book_etag(self):
+        url = f"/book/{self.book.id}/"
+        etag = self.client.get(url).headers["ETag"]
+        self.book.inventory = 10
+        self.book.save()
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response.headers["ETag"], etag)
+        self.assertEqual(response.data["inventory"], 10)
+
+    def test_nested_book_change_invalidates_borrowing_etag(self):
+        etag = self.client.get("/borrowing/").headers["ETag"]
+        Book.objects.reserve(self.book.id)
+
+        response = self.client.get("/borrowing/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_return_invalidates_borrowing_etag(self):
+        url = f"/borrowing/{self.borrowing.id}/"
+        etag = self.client.get(url).headers["ETag"]
+        staff = User.objects.create_superuser(
+            email="admin@example.com", password="password"
+        )
+        self.authenticate(staff)
+        self.client.post(
+            reverse("borrowing:borrowing-return-borrowing", args=[self.borrowing.id]),
+            {"actual_return_date": date.today()},
+        )
+        self.authenticate(self.user)
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIsNotNone(response.data["actual_return_date"])
+
+    def test_payment_status_change_invalidates_payment_etag(self):
+        etag = self.client.get("/payment/").headers["ETag"]
+        self.payment.status = Payment.PaymentStatus.PAID
+        self.payment.save()
+
+        response = self.client.get("/payment/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_etag_differs_per_user(self):
+        etag = self.client.get("/borrowing/").headers["ETag"]
+        other = User.objects.create_user(email="other@example.com", password="pw")
+        self.authenticate(other)
+
+        response = self.client.get("/borrowing/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response.headers["ETag"], etag)
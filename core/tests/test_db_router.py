@@ -0,0 +1,92 @@
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.db import transaction
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, TransactionTestCase
+
+from books.models import Book
+from core.db_router import (
+    PrimaryReplicaRouter,
+    ReplicaRoutingMiddleware,
+    use_primary,
+    use_replicas,
+)
+
+router = PrimaryReplicaRouter()
+
+
+@patch("core.db_router.replica_aliases", return_value=["replica1"])
+class PrimaryReplicaRouterTests(SimpleTestCase):
+    def test_reads_use_the_primary_by_default(self, replica_aliases):
+        self.assertEqual(router.db_for_read(Book), "default")
+
+    def test_reads_use_a_replica_when_allowed(self, replica_aliases):
+        with use_replicas():
+            self.assertEqual(router.db_for_read(Book), "replica1")
+            with use_primary():
+                self.assertEqual(router.db_for_read(Book), "default")
+
+    def test_writes_and_migrations_use_the_primary(self, replica_aliases):
+        with use_replicas():
+            self.assertEqual(router.db_for_write(Book), "default")
+        self.assertTrue(router.allow_migrate("default", "books"))
+        self.assertFalse(router.allow_migrate("replica1", "books"))
+
+    def test_no_replicas_configured(self, replica_aliases):
+        replica_aliases.return_value = []
+        with use_replicas():
+            self.assertEqual(router.db_for_read(Book), "default")
+
+
+@patch("core.db_router.replica_aliases", return_value=["replica1"])
+class PrimaryReplicaRouterTransactionTests(TransactionTestCase):
+    def test_reads_inside_a_transaction_use_the_primary(self, replica_aliases):
+        with use_replicas():
+            self.assertEqual(router.db_for_read(Book), "replica1")
+            with transaction.atomic():
+                self.assertEqual(router.db_for_read(Book), "default")
+
+
+@patch("core.db_router.replica_aliases", return_value=["replica1"])
+class ReplicaRoutingMiddlewareTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.factory = RequestFactory()
+        self.reads = []
+
+    def get_response(self, request):
+        self.reads.append(router.db_for_read(Book))
+        return HttpResponse()
+
+    def request(self, method, token=None):
+        headers = {"Authorization": f"Bearer {token}"} if token else {}
+        middleware = ReplicaRoutingMiddleware(self.get_response)
+        middleware(getattr(self.factory, method)("/borrowing/", headers=headers))
+        return self.reads[-1]
+
+    def test_safe_requests_read_from_replicas(self, replica_aliases):
+        self.assertEqual(self.request("get", "alice"), "replica1")
+        self.assertEqual(self.request("get"), "replica1")
+
+    def test_unsafe_requests_read_from_the_primary(self, replica_aliases):
+        self.assertEqual(self.request("post", "alice"), "default")
+
+    def test_reads_after_a_write_stay_on_the_primary(self, replica_aliases):
+        self.request("post", "alice")
+
+        self.assertEqual(self.request("get", "alice"), "default")
+        # Other clients are not affected by alice's pin
+        self.assertEqual(self.request("get", "bob"), "replica1")
+
+        cache.clear()
+        self.assertEqual(self.request("get", "alice"), "replica1")
+
+    def test_routing_is_reset_after_the_request(self, replica_aliases):
+        self.request("get", "alice")
+        self.assertEqual(router.db_for_read(Book), "default")
+
+    def test_unreadable_pin_store_falls_back_to_the_primary(self, replica_aliases):
+        with patch("core.db_router.cache.get", side_effect=ConnectionError):
+            with self.assertLogs("core.db_router", "WARNING"):
+                self.assertEqual(self.request("get", "alice"), "default")
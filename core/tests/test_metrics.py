@@ -0,0 +1,117 @@
+from decimal import Decimal
+from unittest.mock import patch
+
+import requests
+from django.test import override_settings
+from prometheus_client import REGISTRY
+from rest_framework.test import APITestCase
+
+from books.models import Book
+
+
+def sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0
+
+
+class MetricsMiddlewareTests(APITestCase):
+    def setUp(self):
+        Book.objects.create(
+            title="Dune",
+            author="Frank Herbert",
+            cover=Book.CoverType.HARD,
+            inventory=3,
+            daily_price=Decimal("1.50"),
+        )
+        self.labels = {"route": "books:books-list", "method": "GET"}
+
+    def test_records_per_route_histograms(self):
+        requests_before = sample(
+            "library_request_duration_seconds_count", status="200", **self.labels
+        )
+        queries_before = sample("library_request_sql_queries_sum", **self.labels)
+        serializer_before = sample(
+            "library_request_serializer_seconds_sum", **self.labels
+        )
+
+        self.client.get("/book/", {"page_size": 7})
+
+        self.assertEqual(
+            sample(
+                "library_request_duration_seconds_count", status="200", **self.labels
+            ),
+            requests_before + 1,
+        )
+        self.assertGreaterEqual(
+            sample("library_request_sql_queries_sum", **self.labels),
+            queries_before + 1,
+        )
+        self.assertGreater(
+            sample("library_request_serializer_seconds_sum", **self.labels),
+            serializer_before,
+        )
+
+    async def test_async_routes_record_sql_from_the_event_loop(self):
+        labels = {"route": "async:books-list", "method": "GET"}
+        queries_before = sample("library_request_sql_queries_sum", **labels)
+
+        response = await self.async_client.get("/async/book/", {"page_size": 5})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertGreaterEqual(
+            sample("library_request_sql_queries_sum", **labels), queries_before + 1
+        )
+
+    @override_settings(METRICS_TOKEN="scrape-secret")
+    def test_metrics_endpoint_exposes_prometheus_text(self):
+        self.client.get("/book/")
+        response = self.client.get(
+            "/metrics", headers={"Authorization": "Bearer scrape-secret"}
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response["Content-Type"].startswith("text/plain"))
+        body = response.content.decode()
+        self.assertIn(
+            'library_request_sql_queries_count{method="GET",route="books:books-list"}',
+            body,
+        )
+        self.assertNotIn('route="metrics"', body)
+
+    @override_settings(METRICS_TOKEN="scrape-secret")
+    def test_metrics_endpoint_refuses_other_clients(self):
+        for headers in (
+            {},
+            {"Authorization": "Bearer wrong"},
+            {"Authorization": "Basic scrape-secret"},
+        ):
+            with self.subTest(headers=headers):
+                response = self.client.get("/metrics", headers=headers)
+                self.assertEqual(response.status_code, 401)
+                self.assertNotIn(b"library_request", response.content)
+
+        with override_settings(METRICS_TOKEN=None):
+            response = self.client.get(
+                "/metrics", headers={"Authorization": "Bearer scrape-secret"}
+            )
+        self.assertEqual(response.status_code, 401)
+
+    @override_settings(SLOW_REQUEST_SECONDS=0)
+    def test_slow_requests_are_logged_with_sql(self):
+        with self.assertLogs("core.metrics", "WARNING") as logs:
+            self.client.get("/book/", {"page_size": 3})
+
+        self.assertIn("(books:books-list)", logs.output[0])
+        self.assertIn('FROM "books_book"', logs.output[0])
+
+    def test_outbound_http_is_timed_per_host(self):
+        before = sample(
+            "library_outbound_http_call_seconds_count", host="telegram.test"
+        )
+        with patch("requests.adapters.HTTPAdapter.send") as send:
+            send.return_value = requests.Response()
+            requests.Session().post("https://telegram.test/send", data={})
+
+        self.assertEqual(
+            sample("library_outbound_http_call_seconds_count", host="telegram.test"),
+            before + 1,
+        )
@@ -0,0 +1,110 @@
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import AccessToken
+
+from books.models import Book
+from borrowing.models import Borrowing
+
+User = get_user_model()
+
+
+class KeysetPaginationTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email="user@example.com", password="password"
+        )
+        self.admin_user = User.objects.create_superuser(
+            email="admin@example.com", password="password"
+        )
+        self.books = [
+            Book.objects.create(
+                title=f"Book {number}",
+                author="Author",
+                cover=Book.CoverType.SOFT,
+                inventory=5,
+                daily_price=Decimal("1.00"),
+            )
+            for number in range(5)
+        ]
+        # Several borrowings share a borrow_date, so id has to break ties
+        self.borrowings = [
+            Borrowing.objects.create(
+                borrow_date=date.today() - timedelta(days=number // 2),
+                expected_return_date=date.today() + timedelta(days=7),
+                actual_return_date=date.today() if number % 3 == 0 else None,
+                book=self.books[0],
+                user=self.user if number % 2 else self.admin_user,
+            )
+            for number in range(7)
+        ]
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(self.admin_user)}"
+        )
+
+    def collect(self, url, params=None):
+        ids, pages = [], 0
+        response = self.client.get(url, params)
+        while True:
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            ids += [item["id"] for item in response.data["results"]]
+            pages += 1
+            if response.data["next"] is None:
+                return ids, pages
+            response = self.client.get(response.data["next"])
+
+    def test_books_are_paged_by_id(self):
+        ids, pages = self.collect("/book/", {"page_size": 2})
+        self.assertEqual(ids, [book.id for book in self.books])
+        self.assertEqual(pages, 3)
+
+    def test_borrowings_are_paged_newest_first(self):
+        url = reverse("borrowing:borrowing-list")
+        ids, pages = self.collect(url, {"page_size": 2})
+        expected = sorted(
+            self.borrowings, key=lambda b: (b.borrow_date, b.id), reverse=True
+        )
+        self.assertEqual(ids, [borrowing.id for borrowing in expected])
+        self.assertEqual(pages, 4)
+
+    def test_previous_link_returns_the_same_page(self):
+        url = reverse("borrowing:borrowing-list")
+        first = self.client.get(url, {"page_size": 3})
+        self.assertIsNone(first.data["previous"])
+        second = self.client.get(first.data["next"])
+        back = self.client.get(second.data["previous"])
+        self.assertEqual(back.data["results"], first.data["results"])
+        self.assertIsNone(back.data["previous"])
+
+    def test_filters_still_apply(self):
+        url = reverse("borrowing:borrowing-list")
+        ids, _ = self.collect(
+            url, {"page_size": 2, "user_id": self.user.id, "is_active": "true"}
+        )
+        expected = [
+            borrowing.id
+            for borrowing in sorted(
+                self.borrowings, key=lambda b: (b.borrow_date, b.id), reverse=True
+            )
+            if borrowing.user == self.user and borrowing.actual_return_date is None
+        ]
+        self.assertEqual(ids, expected)
+
+    def test_non_staff_only_pages_through_own_borrowings(self):
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(self.user)}"
+        )
+        ids, _ = self.collect(reverse("borrowing:borrowing-list"), {"page_size": 2})
+        self.assertEqual(len(ids), 3)
+
+    def test_page_size_is_capped(self):
+        response = self.client.get("/book/", {"page_size": 10_000})
+        self.assertEqual(len(response.data["results"]), 5)
+
+    def test_invalid_cursor(self):
+        response = self.client.get("/book/", {"cursor": "not-a-cursor"})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
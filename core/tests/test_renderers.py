@@ -0,0 +1,47 @@
+import uuid
+from datetime import date, datetime, time, timezone
+from decimal import Decimal
+
+from django.test import TestCase
+from django.utils.translation import gettext_lazy
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.serializer_helpers import ReturnDict, ReturnList
+
+from core.renderers import ORJSONRenderer
+
+
+class ORJSONRendererTests(TestCase):
+    data = {
+        "price": Decimal("12.50"),
+        "borrow_date": date(2024, 1, 2),
+        "created_at": datetime(2024, 1, 2, 3, 4, 5, 678901, tzinfo=timezone.utc),
+        "naive": datetime(2024, 1, 2, 3, 4, 5),
+        "opens": time(9, 30),
+        "id": uuid.UUID("12345678-1234-5678-1234-567812345678"),
+        "label": gettext_lazy("Books"),
+        1: ["Кобзар", 'a "quote"', "line\u2028break\u2029", None, True, 0.5],
+        "nested": {"empty": [], "tuple": (1, 2)},
+    }
+
+    def assertRendersLikeJSONRenderer(self, data, media_type=None):
+        self.assertEqual(
+            ORJSONRenderer().render(data, media_type),
+            JSONRenderer().render(data, media_type),
+        )
+
+    def test_output_matches_json_renderer(self):
+        self.assertRendersLikeJSONRenderer(self.data)
+        self.assertRendersLikeJSONRenderer(ReturnDict(self.data, serializer=None))
+        self.assertRendersLikeJSONRenderer(ReturnList([self.data], serializer=None))
+        self.assertEqual(ORJSONRenderer().render(None), b"")
+
+    def test_indented_output_is_left_to_json_renderer(self):
+        self.assertRendersLikeJSONRenderer(self.data, "application/json; indent=4")
+
+    def test_integers_beyond_64_bits_are_left_to_json_renderer(self):
+        self.assertRendersLikeJSONRenderer({"big": 2**70})
+
+    def test_api_renders_with_orjson(self):
+        response = self.client.get("/book/")
+        self.assertEqual(response.status_code, 200)
+        self.assertIsInstance(response.accepted_renderer, ORJSONRenderer)
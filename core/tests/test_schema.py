@@ -0,0 +1,53 @@
+import json
+import tempfile
+from io import StringIO
+from pathlib import Path
+from unittest.mock import patch
+
+import yaml
+from django.core.management import call_command
+from django.test import SimpleTestCase, override_settings
+
+from core import schema
+from core.schema import clear_schema_cache
+
+
+class CachedSchemaViewTests(SimpleTestCase):
+    def setUp(self):
+        clear_schema_cache()
+        self.addCleanup(clear_schema_cache)
+
+    def test_schema_is_generated_once(self):
+        with patch("core.schema.render_schema", wraps=schema.render_schema) as render:
+            first = self.client.get("/api/schema/")
+            second = self.client.get("/api/schema/?format=json")
+        self.assertEqual(render.call_count, 1)
+
+        self.assertEqual(
+            first["Content-Type"], "application/vnd.oai.openapi; charset=utf-8"
+        )
+        self.assertEqual(second["Content-Type"], "application/vnd.oai.openapi+json")
+        self.assertEqual(yaml.safe_load(first.content), json.loads(second.content))
+        self.assertNotEqual(first["ETag"], second["ETag"])
+
+    def test_documents_the_api_without_the_async_copies(self):
+        paths = json.loads(self.client.get("/api/schema/?format=json").content)["paths"]
+        self.assertIn("/book/", paths)
+        self.assertFalse([path for path in paths if path.startswith("/async/")])
+
+    def test_matching_etag_answers_304(self):
+        etag = self.client.get("/api/schema/")["ETag"]
+        response = self.client.get("/api/schema/", headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response["ETag"], etag)
+
+    def test_baked_schema_is_served_from_disk(self):
+        with tempfile.TemporaryDirectory() as directory:
+            call_command("bake_schema", output=directory, stdout=StringIO())
+            Path(directory, "schema.yaml").write_text("openapi: baked\n")
+
+            with override_settings(OPENAPI_SCHEMA_DIR=directory):
+                with patch("core.schema.render_schema") as render:
+                    response = self.client.get("/api/schema/")
+            render.assert_not_called()
+            self.assertEqual(response.content, b"openapi: baked\n")
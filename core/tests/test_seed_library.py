@@ -0,0 +1,131 @@
+from datetime import date
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import CommandError, call_command
+from django.db import transaction
+from django.db.models import Count, Q
+from django.test import TestCase
+
+from books.models import Book
+from borrowing.models import Borrowing, ScheduledEvent
+from payment.models import Payment
+
+User = get_user_model()
+
+
+class Rollback(Exception):
+    pass
+
+
+class SeedLibraryTests(TestCase):
+    def seed(self, **options):
+        options = {
+            "users": 20,
+            "books": 30,
+            "borrowings": 500,
+            "chunk_size": 200,
+            **options,
+        }
+        call_command("seed_library", stdout=StringIO(), **options)
+
+    def snapshot(self):
+        return (
+            list(User.objects.order_by("id").values_list("email", "first_name")),
+            list(Book.objects.order_by("id").values_list("title", "daily_price")),
+            list(
+                Borrowing.objects.order_by("id").values_list(
+                    "borrow_date",
+                    "expected_return_date",
+                    "actual_return_date",
+                    "book__title",
+                    "user__email",
+                )
+            ),
+            list(Payment.objects.order_by("id").values_list("status", "money_to_pay")),
+        )
+
+    def test_seeds_requested_volume(self):
+        self.seed()
+
+        self.assertEqual(User.objects.count(), 20)
+        self.assertEqual(Book.objects.count(), 30)
+        self.assertEqual(Borrowing.objects.count(), 500)
+        self.assertEqual(Payment.objects.count(), 500)
+        self.assertTrue(User.objects.first().check_password("password"))
+
+    def test_same_seed_gives_same_data(self):
+        try:
+            with transaction.atomic():
+                self.seed(seed=3)
+                first = self.snapshot()
+                raise Rollback
+        except Rollback:
+            pass
+        self.seed(seed=3)
+
+        self.assertEqual(self.snapshot(), first)
+
+    def test_book_popularity_is_skewed(self):
+        self.seed(borrowings=2000)
+
+        counts = sorted(
+            (book.borrowings.count() for book in Book.objects.all()), reverse=True
+        )
+        self.assertGreater(counts[0], 10 * counts[len(counts) // 2])
+
+    def test_distributions(self):
+        self.seed(borrowings=2000, overdue_ratio=0.5, paid_ratio=0)
+
+        unpaid = Payment.objects.filter(status=Payment.PaymentStatus.PENDING)
+        self.assertFalse(unpaid.filter(borrowing__actual_return_date__isnull=False))
+        self.assertEqual(
+            unpaid.count(),
+            Borrowing.objects.filter(actual_return_date__isnull=True).count(),
+        )
+        self.assertTrue(
+            Borrowing.objects.filter(
+                actual_return_date__isnull=True, expected_return_date__lt=date.today()
+            ).exists()
+        )
+        # Every active borrowing is on the due-date scheduler
+        self.assertEqual(
+            ScheduledEvent.objects.filter(
+                type=ScheduledEvent.EventType.OVERDUE
+            ).count(),
+            Borrowing.objects.filter(actual_return_date__isnull=True).count(),
+        )
+
+    def test_rerun_needs_flush(self):
+        self.seed(seed=5)
+        first = self.snapshot()
+
+        with self.assertRaisesMessage(CommandError, "--flush"):
+            self.seed(seed=5)
+        self.seed(seed=5, flush=True)
+
+        self.assertEqual(User.objects.count(), 20)
+        self.assertEqual(self.snapshot(), first)
+
+    def test_flush_keeps_other_seeds(self):
+        self.seed(seed=5)
+        self.seed(seed=6, flush=True)
+
+        self.assertEqual(User.objects.count(), 40)
+        self.assertEqual(Book.objects.count(), 60)
+
+    def test_active_borrowings_leave_the_shelf(self):
+        try:
+            with transaction.atomic():
+                self.seed(seed=7, borrowings=0)
+                copies = dict(Book.objects.values_list("title", "inventory"))
+                raise Rollback
+        except Rollback:
+            pass
+        self.seed(seed=7)
+
+        for book in Book.objects.annotate(
+            lent=Count("borrowings", filter=Q(borrowings__actual_return_date=None))
+        ):
+            self.assertEqual(book.inventory, max(copies[book.title] - book.lent, 0))
+        self.assertTrue(Book.objects.filter(inventory=0).exists())
@@ -0,0 +1,109 @@
+import time
+from unittest.mock import patch
+
+from celery import shared_task
+from celery.signals import before_task_publish
+from django.test import TestCase
+from kombu import Connection
+from prometheus_client import REGISTRY
+
+from core.task_metrics import QUEUE_DEPTH, SENT_AT_HEADER, sample_queue_depth
+
+
+@shared_task(name="core.tests.succeed")
+def succeed():
+    return "ok"
+
+
+@shared_task(name="core.tests.explode")
+def explode():
+    raise ValueError("boom")
+
+
+@shared_task(bind=True, name="core.tests.flaky", max_retries=1)
+def flaky(self):
+    raise self.retry(countdown=0)
+
+
+def sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0
+
+
+class TaskMetricsTests(TestCase):
+    def test_publish_stamps_send_time(self):
+        headers = {}
+        before = sample("library_task_published_total", task="core.tests.succeed")
+        before_task_publish.send(sender="core.tests.succeed", headers=headers)
+
+        self.assertAlmostEqual(headers[SENT_AT_HEADER], time.time(), delta=5)
+        self.assertEqual(
+            sample("library_task_published_total", task="core.tests.succeed"),
+            before + 1,
+        )
+
+    def test_records_runtime_and_queue_lag(self):
+        runtime = sample(
+            "library_task_runtime_seconds_count",
+            task="core.tests.succeed",
+            state="SUCCESS",
+        )
+        lag = sample("library_task_queue_lag_seconds_sum", task="core.tests.succeed")
+
+        succeed.apply(headers={SENT_AT_HEADER: time.time() - 2})
+
+        self.assertEqual(
+            sample(
+                "library_task_runtime_seconds_count",
+                task="core.tests.succeed",
+                state="SUCCESS",
+            ),
+            runtime + 1,
+        )
+        self.assertGreaterEqual(
+            sample("library_task_queue_lag_seconds_sum", task="core.tests.succeed"),
+            lag + 2,
+        )
+
+    def test_counts_failures_and_retries(self):
+        failures = sample("library_task_failures_total", task="core.tests.explode")
+        retries = sample("library_task_retries_total", task="core.tests.flaky")
+
+        explode.apply()
+        flaky.apply()
+
+        self.assertEqual(
+            sample("library_task_failures_total", task="core.tests.explode"),
+            failures + 1,
+        )
+        self.assertGreaterEqual(
+            sample("library_task_retries_total", task="core.tests.flaky"),
+            retries + 1,
+        )
+
+    def sample_with(self, connection):
+        with patch(
+            "core.task_metrics.current_app.connection_for_read",
+            return_value=connection,
+        ):
+            return sample_queue_depth()
+
+    def test_samples_queue_depth(self):
+        connection = Connection("memory://")
+        # The memory transport keeps its queues for the whole process
+        self.addCleanup(
+            lambda: Connection("memory://").channel().queue_delete("celery")
+        )
+        with connection.channel() as channel:
+            channel.queue_declare(queue="celery")
+            with connection.Producer(channel) as producer:
+                for _ in range(3):
+                    producer.publish({}, routing_key="celery")
+
+        self.assertEqual(self.sample_with(connection), {"celery": 3})
+        self.assertEqual(sample("library_celery_queue_depth", queue="celery"), 3)
+
+    def test_empty_queue_has_depth_zero(self):
+        # Like an idle queue on Redis, a queue without a key is NOT_FOUND
+        QUEUE_DEPTH.labels("celery").set(5)
+        self.assertEqual(self.sample_with(Connection("memory://")), {"celery": 0})
+        self.assertEqual(sample("library_celery_queue_depth", queue="celery"), 0)
@@ -0,0 +1,124 @@
+from contextlib import contextmanager
+from datetime import date, timedelta
+from decimal import Decimal
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache, caches
+from rest_framework.generics import GenericAPIView
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import AccessToken
+
+from books.models import Book
+from books.serializers import BookListSerializer
+from borrowing.models import Borrowing
+from borrowing.serializers import BorrowingSerializer
+from core.conditional import ConditionalGetMixin
+from core.values import ValuesListMixin, values_serializer
+from payment.models import Payment
+from payment.serializers import PaymentSerializer
+
+User = get_user_model()
+
+
+@contextmanager
+def model_instances():
+    """Serve lists the way they were served before ValuesListMixin."""
+    with patch.multiple(
+        ValuesListMixin,
+        filter_queryset=GenericAPIView.filter_queryset,
+        serialize_rows=ConditionalGetMixin.serialize_rows,
+    ):
+        yield
+
+
+class ValuesSerializerTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        caches["local"].clear()
+        self.user = User.objects.create_user(email="user@example.com", password="pw")
+        self.staff = User.objects.create_user(
+            email="staff@example.com", password="pw", is_staff=True
+        )
+        books = [
+            Book.objects.create(
+                title=f"Книга {number}",
+                author="Автор",
+                cover=Book.CoverType.SOFT if number % 2 else Book.CoverType.HARD,
+                inventory=3,
+                daily_price=Decimal("1.50") * (number + 1),
+            )
+            for number in range(4)
+        ]
+        for number, book in enumerate(books):
+            borrowing = Borrowing.objects.create(
+                user=self.user,
+                book=book,
+                borrow_date=date.today() - timedelta(days=number),
+                expected_return_date=date.today() + timedelta(days=number),
+                actual_return_date=date.today() if number % 2 else None,
+            )
+            if number % 2:
+                continue
+            borrowing.payment = Payment.objects.create(
+                borrowing=borrowing,
+                money_to_pay=Decimal("7.5"),
+                status=Payment.PaymentStatus.PENDING,
+                type=Payment.PaymentType.PAYMENT,
+                session_id=None if number else "cs_test",
+            )
+            borrowing.save()
+
+    def assert_same_output(self, serializer_class, queryset):
+        serializer = values_serializer(serializer_class)
+        expected = serializer_class(queryset, many=True).data
+        rows = queryset.values(*serializer.columns)
+        self.assertEqual(
+            JSONRenderer().render(serializer.many(rows)),
+            JSONRenderer().render(expected),
+        )
+
+    def test_matches_the_model_serializers(self):
+        self.assert_same_output(BookListSerializer, Book.objects.order_by("id"))
+        self.assert_same_output(BorrowingSerializer, Borrowing.objects.order_by("id"))
+        self.assert_same_output(PaymentSerializer, Payment.objects.order_by("id"))
+
+    def test_list_endpoints_are_byte_identical(self):
+        paths = [
+            (None, "/book/?page_size=3"),
+            (None, "/book/?search=автор"),
+            (self.user, "/borrowing/?page_size=3"),
+            (self.staff, "/borrowing/?is_active=true"),
+            (self.user, "/payment/"),
+        ]
+        for user, path in paths:
+            with self.subTest(path=path):
+                if user is not None:
+                    token = AccessToken.for_user(user)
+                    self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+                cache.clear()
+                fast = self.client.get(path)
+                cache.clear()
+                with model_instances():
+                    slow = self.client.get(path)
+                self.assertEqual(fast.status_code, 200)
+                self.assertEqual(fast.content, slow.content)
+                self.assertEqual(fast["ETag"], slow["ETag"])
+
+    def test_next_page_follows_the_same_cursor(self):
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(self.user)}"
+        )
+        next_url = self.client.get("/borrowing/?page_size=3").data["next"]
+        with model_instances():
+            expected = self.client.get(next_url).content
+        self.assertEqual(self.client.get(next_url).content, expected)
+
+    def test_list_skips_model_instances(self):
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(self.user)}"
+        )
+        with patch.object(Borrowing, "from_db") as from_db:
+            self.client.get("/borrowing/")
+        from_db.assert_not_called()
@@ -0,0 +1,112 @@
+from datetime import date
+from functools import cache
+
+from django.core.exceptions import ImproperlyConfigured
+from rest_framework import ISO_8601, serializers
+from rest_framework.settings import api_settings
+
+from core.metrics import serializer_timer
+
+# Fields whose to_representation returns database values unchanged
+PASSTHROUGH_FIELDS = (
+    serializers.BooleanField,
+    serializers.CharField,
+    serializers.IntegerField,
+    serializers.PrimaryKeyRelatedField,
+)
+
+
+def _converter(field):
+    """The cheapest callable equal to field.to_representation for non-null values."""
+    if (
+        isinstance(field, PASSTHROUGH_FIELDS)
+        and getattr(field, "pk_field", None) is None
+    ):
+        return None
+    if isinstance(field, serializers.ChoiceField):
+        choices = field.choice_strings_to_values
+        return lambda value: choices.get(str(value), value)
+    if isinstance(field, serializers.DateField):
+        output_format = getattr(field, "format", api_settings.DATE_FORMAT)
+        if isinstance(output_format, str) and output_format.lower() == ISO_8601:
+            return date.isoformat
+    return field.to_representation
+
+
+class ValuesSerializer:
+    """
+    Read-only twin of a ModelSerializer that works on `.values()` rows.
+    The field mappers are compiled once from the serializer's own fields,
+    so the output is the same as serializer(instances, many=True).data
+    without building model instances or running every field per row.
+    """
+
+    def __init__(self, serializer_class, prefix=""):
+        self.columns = []
+        self.mappers = []
+        for name, field in serializer_class().fields.items():
+            if field.write_only:
+                continue
+            if field.source == "*" or isinstance(
+                field, (serializers.SerializerMethodField, serializers.ListSerializer)
+            ):
+                raise ImproperlyConfigured(
+                    f"{serializer_class.__name__}.{name} cannot be read from values()."
+                )
+            column = prefix + field.source.replace(".", "__")
+            if isinstance(field, serializers.BaseSerializer):
+                # The relation's key tells a missing object apart, as in DRF
+                nested = ValuesSerializer(type(field), prefix=f"{column}__")
+                self.columns += [column, *nested.columns]
+                self.mappers.append((name, column, None, nested))
+            else:
+                self.columns.append(column)
+                self.mappers.append((name, column, _converter(field), None))
+
+    def to_representation(self, row):
+        data = {}
+        for name, column, convert, nested in self.mappers:
+            value = row[column]
+            if value is not None:
+                if nested is not None:
+                    value = nested.to_representation(row)
+                elif convert is not None:
+                    value = convert(value)
+            data[name] = value
+        return data
+
+    def many(self, rows):
+        with serializer_timer():
+            return [self.to_representation(row) for row in rows]
+
+
+@cache
+def values_serializer(serializer_class):
+    return ValuesSerializer(serializer_class)
+
+
+class ValuesListMixin:
+    """
+    Run the list action on `.values()` rows with a ValuesSerializer built
+    from the list serializer. Goes before ConditionalGetMixin, whose
+    validators and keyset pagination read the same rows.
+    """
+
+    def list_values_fields(self):
+        fields = ["pk", *values_serializer(self.get_serializer_class()).columns]
+        fields += self.validator_fields
+        fields += [
+            field.lstrip("-") for field in getattr(self.paginator, "ordering", ())
+        ]
+        return list(dict.fromkeys(fields))
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        if self.action == "list":
+            queryset = queryset.values(*self.list_values_fields())
+        return queryset
+
+    def serialize_rows(self, rows):
+        if self.action == "list":
+            return values_serializer(self.get_serializer_class()).many(rows)
+        return super().serialize_rows(rows)
@@ -0,0 +1,136 @@
+import time
+from dataclasses import dataclass
+from datetime import date
+from decimal import Decimal
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+FINE_BATCH_SIZE = 50_000
+
+# One statement computes the fines of a slice of late borrowings and upserts
+# them. A fine is (days late) * daily_price * multiplier; PAID fines and fines
+# that already hold the right amount are left alone, so re-runs write nothing.
+UPSERT_FINES = """
+WITH late AS (
+    SELECT
+        b.id,
+        b.borrow_date,
+        round(
+            (COALESCE(b.actual_return_date, %(today)s) - b.expected_return_date)
+                * book.daily_price * %(multiplier)s,
+            2
+        ) AS amount
+    FROM borrowing_borrowing AS b
+    JOIN books_book AS book ON book.id = b.book_id
+    WHERE {condition}
+    ORDER BY b.borrow_date, b.id
+    LIMIT %(limit)s
+),
+upserted AS (
+    INSERT INTO payment_payment
+        (status, type, borrowing_id, session_url, session_id,
+         money_to_pay, created_at, updated_at)
+    SELECT 'PENDING', 'FINE', id, '', NULL, amount, %(now)s, %(now)s
+    FROM late
+    WHERE amount > 0
+    ON CONFLICT (borrowing_id, type) DO UPDATE
+        SET money_to_pay = EXCLUDED.money_to_pay, updated_at = EXCLUDED.updated_at
+        WHERE payment_payment.status = 'PENDING'
+            AND payment_payment.money_to_pay <> EXCLUDED.money_to_pay
+    RETURNING xmax = 0 AS inserted
+)
+SELECT
+    (SELECT count(*) FROM late),
+    (SELECT count(*) FILTER (WHERE inserted) FROM upserted),
+    (SELECT count(*) FILTER (WHERE NOT inserted) FROM upserted),
+    last.borrow_date,
+    last.id
+FROM (SELECT 1) AS one
+LEFT JOIN LATERAL (
+    SELECT borrow_date, id FROM late ORDER BY borrow_date DESC, id DESC LIMIT 1
+) AS last ON true
+"""
+
+# Active borrowings past due, walked in (borrow_date, id) order along
+# borrowing_active_date_idx, so every batch is one index range scan
+ACTIVE_OVERDUE = """
+    b.actual_return_date IS NULL
+    AND b.expected_return_date < %(today)s
+    AND (b.borrow_date, b.id) > (%(after_date)s, %(after_id)s)
+"""
+
+RETURNED_LATE = """
+    b.id = %(borrowing_id)s
+    AND b.actual_return_date > b.expected_return_date
+"""
+
+
+@dataclass
+class FineReport:
+    scanned: int = 0
+    created: int = 0
+    updated: int = 0
+    elapsed: float = 0.0
+
+    def as_dict(self) -> dict:
+        return {
+            "scanned": self.scanned,
+            "created": self.created,
+            "updated": self.updated,
+            "elapsed": round(self.elapsed, 3),
+        }
+
+
+def fine_multiplier() -> Decimal:
+    return Decimal(str(settings.FINE_MULTIPLIER))
+
+
+def _upsert(condition, params):
+    with connection.cursor() as cursor:
+        cursor.execute(
+            UPSERT_FINES.format(condition=condition),
+            {
+                "multiplier": fine_multiplier(),
+                "now": timezone.now(),
+                **params,
+            },
+        )
+        return cursor.fetchone()
+
+
+def accrue_overdue_fines(today=None, batch_size=FINE_BATCH_SIZE) -> FineReport:
+    """
+    Bring the FINE payment of every active overdue borrowing up to date.
+    Each batch commits on its own, so locks on fines are short and an
+    interrupted run simply resumes from the start next time.
+    """
+    today = today or timezone.localdate()
+    report = FineReport()
+    started = time.perf_counter()
+    after_date, after_id = date.min, 0
+    while True:
+        with transaction.atomic():
+            scanned, created, updated, last_date, last_id = _upsert(
+                ACTIVE_OVERDUE,
+                {
+                    "today": today,
+                    "after_date": after_date,
+                    "after_id": after_id,
+                    "limit": batch_size,
+                },
+            )
+        report.scanned += scanned
+        report.created += created
+        report.updated += updated
+        if scanned < batch_size:
+            break
+        after_date, after_id = last_date, last_id
+    report.elapsed = time.perf_counter() - started
+    return report
+
+
+def settle_fine(borrowing_id) -> None:
+    """Set the final fine of a borrowing that was just returned late."""
+    _upsert(RETURNED_LATE, {"borrowing_id": borrowing_id, "today": None, "limit": 1})
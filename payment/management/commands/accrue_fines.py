@@ -0,0 +1,37 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from payment.fines import FINE_BATCH_SIZE, accrue_overdue_fines
+
+
+class Command(BaseCommand):
+    help = (
+        "Bring the FINE payments of all overdue borrowings up to date, "
+        "as the daily task does, and report the runtime."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=FINE_BATCH_SIZE)
+        parser.add_argument(
+            "--today",
+            help="Accrue as of this date (YYYY-MM-DD) instead of today.",
+        )
+
+    def handle(self, *args, **options):
+        today = None
+        if options["today"]:
+            try:
+                today = date.fromisoformat(options["today"])
+            except ValueError as error:
+                raise CommandError(error)
+
+        report = accrue_overdue_fines(today=today, batch_size=options["batch_size"])
+        rate = report.scanned / report.elapsed if report.elapsed else 0
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Scanned {report.scanned} overdue borrowings, created "
+                f"{report.created} fines, updated {report.updated} "
+                f"in {report.elapsed:.1f}s ({rate:.0f} rows/s)"
+            )
+        )
@@ -0,0 +1,31 @@
+# Generated by Django 5.1.3 on 2026-10-18 20:35
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("borrowing", "0008_scheduled_events"),
+        ("payment", "0005_session_id_unique"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="payment",
+            name="borrowing",
+            field=models.ForeignKey(
+                db_index=False,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="payments",
+                to="borrowing.borrowing",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="payment",
+            constraint=models.UniqueConstraint(
+                fields=("borrowing", "type"), name="payment_borrowing_type_key"
+            ),
+        ),
+    ]
@@ -1,4 +1,5 @@
 from django.db import models
+from django.db.models import Q
 from decimal import Decimal
 from django.core.validators import MinValueValidator
 
@@ -18,14 +19,55 @@ class Payment(models.Model):
     type = models.CharField(
         max_length=10, choices=PaymentType.choices, default=PaymentType.PAYMENT
     )
-    borrowing = models.OneToOneField(
-        "borrowing.Borrowing", on_delete=models.CASCADE, related_name="payment_info"
+    # One payment of each type per borrowing; the (borrowing, type) index serves lookups
+    borrowing = models.ForeignKey(
+        "borrowing.Borrowing",
+        on_delete=models.CASCADE,
+        related_name="payments",
+        db_index=False,
     )
-    session_url = models.URLField(max_length=400)
-    session_id = models.CharField(max_length=255)
+    session_url = models.URLField(max_length=400, blank=True)
+    session_id = models.CharField(max_length=255, null=True, blank=True)
     money_to_pay = models.DecimalField(
         max_digits=10, decimal_places=2, validators=[MinValueValidator(Decimal("0.01"))]
     )
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            # Fines are upserted on it
+            models.UniqueConstraint(
+                fields=["borrowing", "type"], name="payment_borrowing_type_key"
+            ),
+            # Webhook lookups and the missing-session sweep (IS NULL) both use it.
+            # A constraint rather than unique=True, which adds an unused LIKE index
+            models.UniqueConstraint(
+                fields=["session_id"], name="payment_session_id_key"
+            ),
+        ]
 
     def __str__(self):
         return f"Payment: {self.type} | Status: {self.status} | Amount: ${self.money_to_pay}"
+
+
+class StripeEvent(models.Model):
+    """Raw Stripe webhook event, stored on receipt and applied by a worker."""
+
+    event_id = models.CharField(max_length=255, unique=True)
+    type = models.CharField(max_length=255)
+    payload = models.JSONField()
+    received_at = models.DateTimeField(auto_now_add=True)
+    processed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["received_at"],
+                condition=Q(processed_at__isnull=True),
+                name="stripe_event_pending_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return f"Stripe event {self.event_id}: {self.type}"
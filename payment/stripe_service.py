@@ -1,12 +1,33 @@
+import uuid
+
 import stripe
 from django.conf import settings
 
 stripe.api_key = settings.STRIPE_API_KEY
 
 
+class StripeServiceError(Exception):
+    pass
+
+
+class FakeCheckoutSession:
+    """Offline stand-in for a Stripe Checkout session, enabled by STRIPE_FAKE."""
+
+    def __init__(self, success_url: str):
+        self.id = f"cs_fake_{uuid.uuid4().hex}"
+        self.url = f"{success_url}?session_id={self.id}"
+
+
 def create_payment_session(
-    amount: float, currency: str, success_url: str, cancel_url: str
+    amount,
+    currency: str,
+    success_url: str,
+    cancel_url: str,
+    product_name: str = "Library Payment",
+    idempotency_key: str | None = None,
 ):
+    if settings.STRIPE_FAKE:
+        return FakeCheckoutSession(success_url)
     try:
         session = stripe.checkout.Session.create(
             payment_method_types=["card"],
@@ -14,7 +35,7 @@ def create_payment_session(
                 {
                     "price_data": {
                         "currency": currency,
-                        "product_data": {"name": "Library Payment"},
+                        "product_data": {"name": product_name},
                         "unit_amount": int(amount * 100),  # Amount in cents
                     },
                     "quantity": 1,
@@ -23,7 +44,8 @@ def create_payment_session(
             mode="payment",
             success_url=success_url,
             cancel_url=cancel_url,
+            idempotency_key=idempotency_key,
         )
         return session
     except stripe.error.StripeError as e:
-        raise Exception(f"Stripe error: {e}")
+        raise StripeServiceError(f"Stripe error: {e}") from e
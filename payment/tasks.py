@@ -0,0 +1,141 @@
+import logging
+from datetime import timedelta
+
+from celery import shared_task
+from django.conf import settings
+from django.db import transaction
+from django.db.models.functions import Now
+from django.utils import timezone
+
+from borrowing.models import Notification
+from borrowing.notifications import build_notification
+from . import fines
+from .models import Payment, StripeEvent
+from .stripe_service import StripeServiceError, create_payment_session
+
+logger = logging.getLogger(__name__)
+
+CHECKOUT_SWEEP_DELAY = timedelta(minutes=1)
+CHECKOUT_SWEEP_WINDOW = timedelta(days=1)
+STRIPE_EVENT_BATCH_SIZE = 500
+STRIPE_EVENT_MAX_BATCHES = 20
+
+
+@shared_task(
+    autoretry_for=(StripeServiceError,),
+    retry_backoff=True,
+    retry_backoff_max=300,
+    max_retries=8,
+)
+def create_checkout_session(payment_id):
+    """
+    Create the Stripe Checkout session for a payment and store its id and URL.
+    Redelivered tasks are no-ops, and the idempotency key stops a retry
+    after a lost response from opening a second session.
+    """
+    payment = Payment.objects.select_related("borrowing__book").get(pk=payment_id)
+    if payment.session_id:
+        return payment.session_id
+
+    session = create_payment_session(
+        amount=payment.money_to_pay,
+        currency="usd",
+        success_url=settings.STRIPE_SUCCESS_URL,
+        cancel_url=settings.STRIPE_CANCEL_URL,
+        product_name=f"Borrowing: {payment.borrowing.book.title}",
+        idempotency_key=f"checkout-payment-{payment.pk}",
+    )
+    payment.session_id = session.id
+    payment.session_url = session.url
+    payment.save(update_fields=["session_id", "session_url", "updated_at"])
+    return session.id
+
+
+def schedule_checkout_session(payment):
+    """Enqueue checkout creation once the transaction that created the payment commits."""
+    transaction.on_commit(
+        lambda: create_checkout_session.delay(payment.pk), robust=True
+    )
+
+
+@shared_task
+def create_missing_checkout_sessions():
+    """Re-enqueue payments whose checkout task was lost, e.g. while the broker was down."""
+    count = 0
+    for payment_id in stale_checkout_payments(timezone.now()).iterator():
+        create_checkout_session.delay(payment_id)
+        count += 1
+    if count:
+        logger.warning("Re-enqueued %s checkout sessions.", count)
+    return count
+
+
+def stale_checkout_payments(now):
+    """Ids of payments still without a session; served by payment_session_id_key."""
+    return Payment.objects.filter(
+        session_id__isnull=True,
+        status=Payment.PaymentStatus.PENDING,
+        type=Payment.PaymentType.PAYMENT,
+        created_at__lt=now - CHECKOUT_SWEEP_DELAY,
+        created_at__gte=now - CHECKOUT_SWEEP_WINDOW,
+    ).values_list("id", flat=True)
+
+
+@shared_task
+def accrue_overdue_fines():
+    """Daily pass that brings the fines of all overdue borrowings up to date."""
+    report = fines.accrue_overdue_fines()
+    logger.info("Overdue fines: %s", report.as_dict())
+    return report.as_dict()
+
+
+@shared_task
+def process_stripe_events(batch_size=STRIPE_EVENT_BATCH_SIZE):
+    """
+    Apply stored Stripe webhook events in batches.
+    Only PENDING payments are marked PAID, so replaying an event is a no-op.
+    """
+    processed = 0
+    for _ in range(STRIPE_EVENT_MAX_BATCHES):
+        count = apply_stripe_event_batch(batch_size)
+        if not count:
+            break
+        processed += count
+    return processed
+
+
+def apply_stripe_event_batch(batch_size):
+    with transaction.atomic():
+        events = list(
+            StripeEvent.objects.select_for_update(skip_locked=True)
+            .filter(processed_at__isnull=True)
+            .order_by("received_at")
+            .only("id", "type", "payload")[:batch_size]
+        )
+        if not events:
+            return 0
+
+        session_ids = [
+            event.payload["data"]["object"]["id"]
+            for event in events
+            if event.type == "checkout.session.completed"
+        ]
+        paid = list(
+            Payment.objects.select_for_update(of=("self",))
+            .filter(session_id__in=session_ids, status=Payment.PaymentStatus.PENDING)
+            .select_related("borrowing__book")
+            .only("id", "borrowing__book__title")
+        )
+        Payment.objects.filter(id__in=[payment.id for payment in paid]).update(
+            status=Payment.PaymentStatus.PAID, updated_at=Now()
+        )
+        Notification.objects.bulk_create(
+            build_notification(
+                f"Оплата за книгу '{payment.borrowing.book.title}' успішна! Дякуємо!"
+            )
+            for payment in paid
+        )
+        StripeEvent.objects.filter(id__in=[event.id for event in events]).update(
+            processed_at=timezone.now()
+        )
+    return len(events)
@@ -1,3 +1,419 @@
-from django.test import TestCase
+from datetime import date, timedelta
+from decimal import Decimal
+from itertools import count
+import json
+from unittest.mock import patch
 
-# Create your tests here.
+import stripe
+from asgiref.sync import sync_to_async
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory, APITestCase
+from rest_framework_simplejwt.tokens import AccessToken
+
+from books.models import Book
+from borrowing.models import Borrowing, Notification
+from payment.fines import accrue_overdue_fines, settle_fine
+from payment.models import Payment, StripeEvent
+from payment.tasks import create_checkout_session, process_stripe_events
+from payment.views import CHECKOUT_MAX_SYNC_WAIT, CHECKOUT_MAX_WAIT, checkout_wait
+
+User = get_user_model()
+
+
+class PaymentTestMixin:
+    book_numbers = count(1)
+
+    def create_payment(self, user, **kwargs):
+        book = Book.objects.create(
+            title=f"Test Book {next(self.book_numbers)}",
+            author="Test Author",
+            cover=Book.CoverType.HARD,
+            inventory=5,
+            daily_price=Decimal("1.50"),
+        )
+        borrowing = Borrowing.objects.create(
+            borrow_date=date.today(),
+            expected_return_date=date.today() + timedelta(days=4),
+            book=book,
+            user=user,
+        )
+        return Payment.objects.create(
+            borrowing=borrowing, money_to_pay=Decimal("6.00"), **kwargs
+        )
+
+
+@override_settings(STRIPE_FAKE=True)
+class CreateCheckoutSessionTests(PaymentTestMixin, TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email="user@example.com", password="password"
+        )
+        self.payment = self.create_payment(self.user)
+
+    def test_task_fills_in_checkout_session(self):
+        session_id = create_checkout_session(self.payment.id)
+
+        self.payment.refresh_from_db()
+        self.assertEqual(self.payment.session_id, session_id)
+        self.assertTrue(session_id.startswith("cs_fake_"))
+        self.assertIn(session_id, self.payment.session_url)
+        self.assertEqual(self.payment.status, Payment.PaymentStatus.PENDING)
+
+    def test_redelivered_task_is_a_no_op(self):
+        first = create_checkout_session(self.payment.id)
+        with patch("payment.tasks.create_payment_session") as create_payment_session:
+            second = create_checkout_session(self.payment.id)
+        create_payment_session.assert_not_called()
+        self.assertEqual(first, second)
+
+
+class CheckoutStatusViewTests(PaymentTestMixin, APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email="user@example.com", password="password"
+        )
+        self.payment = self.create_payment(self.user)
+        self.headers = {"Authorization": f"Bearer {AccessToken.for_user(self.user)}"}
+        self.client.credentials(HTTP_AUTHORIZATION=self.headers["Authorization"])
+        self.url = reverse("payment-checkout-status", args=[self.payment.id])
+
+    def test_pending_without_session(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["status"], "PENDING")
+        self.assertEqual(response.data["session_url"], "")
+
+    @override_settings(STRIPE_FAKE=True)
+    def test_returns_session_url_once_created(self):
+        create_checkout_session(self.payment.id)
+        response = self.client.get(self.url, {"wait": 5})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.data["session_url"].startswith("http"))
+
+    @patch("payment.views.CHECKOUT_POLL_INTERVAL", 0.01)
+    def test_long_poll_times_out_while_pending(self):
+        response = self.client.get(self.url, {"wait": 1})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["session_url"], "")
+
+    def test_invalid_wait(self):
+        response = self.client.get(self.url, {"wait": "soon"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_sync_long_poll_is_capped(self):
+        request = Request(APIRequestFactory().get(self.url, {"wait": 60}))
+        self.assertEqual(
+            checkout_wait(request, CHECKOUT_MAX_SYNC_WAIT), CHECKOUT_MAX_SYNC_WAIT
+        )
+        self.assertEqual(checkout_wait(request, CHECKOUT_MAX_WAIT), CHECKOUT_MAX_WAIT)
+
+    async def test_async_long_poll_times_out_while_pending(self):
+        url = f"/async/payment/{self.payment.id}/checkout-status/"
+        with patch("payment.views.CHECKOUT_POLL_INTERVAL", 0.01):
+            response = await self.async_client.get(
+                url, {"wait": 1}, headers=self.headers
+            )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()["status"], "PENDING")
+        self.assertEqual(response.json()["session_url"], "")
+
+        response = await self.async_client.get(
+            url, {"wait": "soon"}, headers=self.headers
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    @override_settings(STRIPE_FAKE=True)
+    async def test_async_long_poll_returns_session_url(self):
+        await sync_to_async(create_checkout_session)(self.payment.id)
+        response = await self.async_client.get(
+            f"/async/payment/{self.payment.id}/checkout-status/",
+            {"wait": 5},
+            headers=self.headers,
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.json()["session_url"].startswith("http"))
+
+    async def test_async_other_users_payment_is_hidden(self):
+        other = await User.objects.acreate(email="other@example.com")
+        response = await self.async_client.get(
+            f"/async/payment/{self.payment.id}/checkout-status/",
+            headers={"Authorization": f"Bearer {AccessToken.for_user(other)}"},
+        )
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_other_users_payment_is_hidden(self):
+        other = User.objects.create_user(email="other@example.com", password="password")
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(other)}"
+        )
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+def checkout_completed_event(event_id, session_id):
+    return {
+        "id": event_id,
+        "type": "checkout.session.completed",
+        "data": {"object": {"id": session_id}},
+    }
+
+
+class StripeWebhookTests(TestCase):
+    url = "/borrowing/stripe-webhook/"
+
+    def post_event(self, event):
+        return self.client.post(
+            self.url,
+            data=json.dumps(event),
+            content_type="application/json",
+            HTTP_STRIPE_SIGNATURE="t=1,v1=signature",
+        )
+
+    @patch("payment.views.stripe.Webhook.construct_event")
+    def test_event_is_stored_once(self, construct_event):
+        event = checkout_completed_event("evt_1", "cs_1")
+        construct_event.return_value = event
+
+        with self.assertNumQueries(1):
+            response = self.post_event(event)
+        self.assertEqual(response.status_code, 200)
+        self.post_event(event)
+
+        stored = StripeEvent.objects.get()
+        self.assertEqual(stored.event_id, "evt_1")
+        self.assertEqual(stored.payload, event)
+        self.assertIsNone(stored.processed_at)
+
+    @patch("payment.views.stripe.Webhook.construct_event")
+    def test_invalid_signature_is_rejected(self, construct_event):
+        construct_event.side_effect = stripe.error.SignatureVerificationError(
+            "bad signature", "t=1,v1=signature"
+        )
+        response = self.post_event(checkout_completed_event("evt_1", "cs_1"))
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(StripeEvent.objects.exists())
+
+    def test_missing_signature_is_rejected(self):
+        response = self.client.post(
+            self.url, data="{}", content_type="application/json"
+        )
+        self.assertEqual(response.status_code, 400)
+
+
+class ProcessStripeEventsTests(PaymentTestMixin, TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email="user@example.com", password="password"
+        )
+        self.payment = self.create_payment(self.user, session_id="cs_1")
+
+    def store(self, event):
+        return StripeEvent.objects.create(
+            event_id=event["id"], type=event["type"], payload=event
+        )
+
+    def test_completed_checkout_marks_payment_paid(self):
+        event = self.store(checkout_completed_event("evt_1", "cs_1"))
+
+        self.assertEqual(process_stripe_events(), 1)
+
+        self.payment.refresh_from_db()
+        self.assertEqual(self.payment.status, Payment.PaymentStatus.PAID)
+        self.assertIn("Test Book", Notification.objects.get().text)
+        event.refresh_from_db()
+        self.assertIsNotNone(event.processed_at)
+
+    def test_replayed_event_is_a_no_op(self):
+        self.store(checkout_completed_event("evt_1", "cs_1"))
+        process_stripe_events()
+        # Stripe sends a different event id for the same completed session
+        self.store(checkout_completed_event("evt_2", "cs_1"))
+        self.assertEqual(process_stripe_events(), 1)
+        self.assertEqual(Notification.objects.count(), 1)
+        self.assertEqual(process_stripe_events(), 0)
+
+    def test_unrelated_events_are_marked_processed(self):
+        self.store({"id": "evt_1", "type": "charge.refunded", "data": {"object": {}}})
+        self.assertEqual(process_stripe_events(), 1)
+        self.payment.refresh_from_db()
+        self.assertEqual(self.payment.status, Payment.PaymentStatus.PENDING)
+        self.assertFalse(StripeEvent.objects.filter(processed_at__isnull=True).exists())
+
+    def test_batch_query_count_is_constant(self):
+        for number in range(2, 12):
+            payment = self.create_payment(self.user, session_id=f"cs_{number}")
+            self.store(checkout_completed_event(f"evt_{number}", payment.session_id))
+        # Per batch: savepoint, events, payments, update, notifications,
+        # mark processed, release; then one empty batch (savepoint, select, release)
+        with self.assertNumQueries(10):
+            self.assertEqual(process_stripe_events(), 10)
+
+
+class PaymentQueryBudgetTests(PaymentTestMixin, APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email="user@example.com", password="password"
+        )
+        for _ in range(10):
+            self.create_payment(self.user)
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(self.user)}"
+        )
+
+    def test_list(self):
+        # User lookup for the token, then the payments
+        with self.assertNumQueries(2):
+            response = self.client.get("/payment/")
+        self.assertEqual(len(response.data), 10)
+
+
+class PaymentExportTests(PaymentTestMixin, APITestCase):
+    def setUp(self):
+        self.admin_user = User.objects.create_superuser(
+            email="admin@example.com", password="password"
+        )
+        self.user = User.objects.create_user(
+            email="user@example.com", password="password"
+        )
+        self.pending = self.create_payment(self.user)
+        self.paid = self.create_payment(
+            self.admin_user, status=Payment.PaymentStatus.PAID
+        )
+        self.fine = self.create_payment(self.user, type=Payment.PaymentType.FINE)
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(self.admin_user)}"
+        )
+
+    def export_ids(self, **params):
+        response = self.client.get("/payment/export/", {"output": "ndjson", **params})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        lines = b"".join(response.streaming_content).decode().splitlines()
+        return [json.loads(line)["id"] for line in lines]
+
+    def test_exports_payments_of_all_users(self):
+        self.assertEqual(
+            self.export_ids(), [self.pending.id, self.paid.id, self.fine.id]
+        )
+
+    def test_filters_by_status_type_and_user(self):
+        self.assertEqual(self.export_ids(status="PAID"), [self.paid.id])
+        self.assertEqual(self.export_ids(type="FINE"), [self.fine.id])
+        self.assertEqual(
+            self.export_ids(user_id=self.user.id), [self.pending.id, self.fine.id]
+        )
+        self.assertEqual(
+            self.export_ids(date_from=date.today().isoformat(), status="PENDING"),
+            [self.pending.id, self.fine.id],
+        )
+
+    def test_csv_header(self):
+        response = self.client.get("/payment/export/")
+        self.assertEqual(response["Content-Type"], "text/csv")
+        self.assertIn("payments.csv", response["Content-Disposition"])
+        header = b"".join(response.streaming_content).decode().splitlines()[0]
+        self.assertTrue(header.startswith("id,borrowing_id,"))
+
+    def test_invalid_status(self):
+        response = self.client.get("/payment/export/", {"status": "LOST"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_invalid_user_id(self):
+        response = self.client.get("/payment/export/", {"user_id": "abc"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("user_id", response.data)
+
+
+@override_settings(FINE_MULTIPLIER="2")
+class FineAccrualTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email="user@example.com", password="password"
+        )
+        self.book = Book.objects.create(
+            title="Late Book",
+            author="Test Author",
+            cover=Book.CoverType.HARD,
+            inventory=5,
+            daily_price=Decimal("1.50"),
+        )
+
+    def borrow(self, due_days_ago, **kwargs):
+        return Borrowing.objects.create(
+            borrow_date=date.today() - timedelta(days=due_days_ago + 7),
+            expected_return_date=date.today() - timedelta(days=due_days_ago),
+            book=self.book,
+            user=self.user,
+            **kwargs,
+        )
+
+    def fine(self, borrowing):
+        return Payment.objects.get(borrowing=borrowing, type=Payment.PaymentType.FINE)
+
+    def test_fines_for_overdue_borrowings_only(self):
+        late = self.borrow(due_days_ago=3)
+        self.borrow(due_days_ago=-2)
+        self.borrow(due_days_ago=3, actual_return_date=date.today())
+
+        report = accrue_overdue_fines()
+
+        self.assertEqual((report.scanned, report.created, report.updated), (1, 1, 0))
+        fine = self.fine(late)
+        self.assertEqual(fine.money_to_pay, Decimal("9.00"))
+        self.assertEqual(fine.status, Payment.PaymentStatus.PENDING)
+        self.assertEqual(Payment.objects.count(), 1)
+
+    def test_rerun_is_idempotent_and_fines_grow_daily(self):
+        late = self.borrow(due_days_ago=3)
+        accrue_overdue_fines()
+
+        report = accrue_overdue_fines()
+        self.assertEqual((report.created, report.updated), (0, 0))
+
+        report = accrue_overdue_fines(today=date.today() + timedelta(days=1))
+        self.assertEqual((report.created, report.updated), (0, 1))
+        self.assertEqual(self.fine(late).money_to_pay, Decimal("12.00"))
+
+    def test_paid_fines_are_not_changed(self):
+        late = self.borrow(due_days_ago=3)
+        accrue_overdue_fines()
+        Payment.objects.filter(type=Payment.PaymentType.FINE).update(
+            status=Payment.PaymentStatus.PAID
+        )
+
+        accrue_overdue_fines(today=date.today() + timedelta(days=1))
+        self.assertEqual(self.fine(late).money_to_pay, Decimal("9.00"))
+
+    def test_fine_sits_next_to_the_borrowing_payment(self):
+        late = self.borrow(due_days_ago=3)
+        Payment.objects.create(borrowing=late, money_to_pay=Decimal("10.50"))
+
+        accrue_overdue_fines()
+
+        self.assertEqual(
+            sorted(late.payments.values_list("type", flat=True)),
+            [Payment.PaymentType.FINE, Payment.PaymentType.PAYMENT],
+        )
+
+    def test_batches_walk_all_overdue_borrowings(self):
+        for days in range(1, 8):
+            self.borrow(due_days_ago=days)
+
+        with self.assertNumQueries(3 * 3):
+            report = accrue_overdue_fines(batch_size=3)
+
+        self.assertEqual((report.scanned, report.created), (7, 7))
+
+    def test_late_return_settles_the_final_fine(self):
+        late = self.borrow(due_days_ago=3)
+        accrue_overdue_fines()
+
+        late.actual_return_date = date.today() - timedelta(days=1)
+        late.save()
+        settle_fine(late.id)
+
+        self.assertEqual(self.fine(late).money_to_pay, Decimal("6.00"))
@@ -1,10 +1,47 @@
-from drf_spectacular.utils import extend_schema_view, extend_schema
+import asyncio
+import json
+import time
+
+import stripe
+from django.conf import settings
+from django.http import Http404, JsonResponse
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_POST
+from drf_spectacular.types import OpenApiTypes
+from drf_spectacular.utils import extend_schema_view, extend_schema, OpenApiParameter
 from rest_framework import viewsets
-from .models import Payment
-from .serializers import PaymentSerializer
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+from core.async_views import AsyncReadMixin
+from core.conditional import ConditionalGetMixin
+from core.db_router import use_primary
+from core.streaming import StreamingExportMixin
+from core.values import ValuesListMixin
+from .models import Payment, StripeEvent
+from .serializers import PaymentSerializer, PaymentStatusSerializer
 from rest_framework.permissions import IsAuthenticated
 from django.http import HttpResponse
 
+# A sync long-poll holds a gunicorn thread while it waits, so it is kept
+# short; the async route on the ASGI server waits without holding one
+CHECKOUT_MAX_SYNC_WAIT = 5
+CHECKOUT_MAX_WAIT = 20
+CHECKOUT_POLL_INTERVAL = 0.5
+CHECKOUT_STATUS_FIELDS = ["status", "session_id", "session_url"]
+
+
+def checkout_wait(request, max_wait):
+    try:
+        wait = int(request.query_params.get("wait", 0))
+    except ValueError:
+        raise ValidationError({"wait": "A valid integer is required."})
+    return min(max(wait, 0), max_wait)
+
+
+def checkout_pending(payment):
+    return payment.status == Payment.PaymentStatus.PENDING and not payment.session_url
+
 
 @extend_schema_view(
     list=extend_schema(
@@ -29,8 +66,63 @@ from django.http import HttpResponse
     destroy=extend_schema(
         exclude=True,  # Deleting payments is not allowed
     ),
+    export=extend_schema(
+        summary="Export Payments",
+        description=(
+            "Stream payments of all users as CSV or NDJSON for reports. "
+            "Only accessible to admin users."
+        ),
+        parameters=[
+            OpenApiParameter(
+                name="output",
+                description="Export format: csv (default) or ndjson",
+                required=False,
+                type=str,
+                enum=["csv", "ndjson"],
+            ),
+            OpenApiParameter(
+                name="status",
+                description="Filter by payment status",
+                required=False,
+                type=str,
+                enum=Payment.PaymentStatus.values,
+            ),
+            OpenApiParameter(
+                name="type",
+                description="Filter by payment type",
+                required=False,
+                type=str,
+                enum=Payment.PaymentType.values,
+            ),
+            OpenApiParameter(
+                name="user_id",
+                description="Filter by user ID",
+                required=False,
+                type=int,
+            ),
+            OpenApiParameter(
+                name="date_from",
+                description="Created on or after this date (YYYY-MM-DD)",
+                required=False,
+                type=str,
+            ),
+            OpenApiParameter(
+                name="date_to",
+                description="Created on or before this date (YYYY-MM-DD)",
+                required=False,
+                type=str,
+            ),
+        ],
+        responses={200: OpenApiTypes.BINARY},
+    ),
 )
-class PaymentViewSet(viewsets.ModelViewSet):
+class PaymentViewSet(
+    AsyncReadMixin,
+    StreamingExportMixin,
+    ValuesListMixin,
+    ConditionalGetMixin,
+    viewsets.ModelViewSet,
+):
     """
     A viewset for viewing and managing payments.
     """
@@ -38,6 +130,19 @@ class PaymentViewSet(viewsets.ModelViewSet):
     queryset = Payment.objects.all()
     serializer_class = PaymentSerializer
     permission_classes = [IsAuthenticated]
+    export_fields = (
+        "id",
+        "borrowing_id",
+        "borrowing__user__email",
+        "borrowing__book__title",
+        "status",
+        "type",
+        "money_to_pay",
+        "session_id",
+        "created_at",
+    )
+    export_date_field = "created_at__date"
+    export_filename = "payments"
 
     def get_queryset(self):
         """
@@ -46,6 +151,84 @@ class PaymentViewSet(viewsets.ModelViewSet):
         user = self.request.user
         return super().get_queryset().filter(borrowing__user=user)
 
+    def get_export_queryset(self):
+        """
+        Payments of all users for staff reports, filtered by query parameters.
+        """
+        queryset = super().get_queryset()
+        filters = {
+            "status": Payment.PaymentStatus.values,
+            "type": Payment.PaymentType.values,
+        }
+        for name, choices in filters.items():
+            value = self.request.query_params.get(name)
+            if value is None:
+                continue
+            if value not in choices:
+                raise ValidationError({name: f"Choose one of: {', '.join(choices)}."})
+            queryset = queryset.filter(**{name: value})
+
+        user_id = self.request.query_params.get("user_id")
+        if user_id:
+            try:
+                user_id = int(user_id)
+            except ValueError:
+                raise ValidationError({"user_id": "A valid integer is required."})
+            queryset = queryset.filter(borrowing__user_id=user_id)
+        return queryset
+
+    @extend_schema(
+        summary="Poll Checkout Status",
+        description=(
+            "Return the payment status and, once the background task has "
+            "created it, the Stripe Checkout URL. Pass `wait` to long-poll "
+            "until the URL is ready. For waits longer than "
+            f"{CHECKOUT_MAX_SYNC_WAIT}s use /async/payment/{{id}}/checkout-status/ "
+            "on the ASGI server."
+        ),
+        parameters=[
+            OpenApiParameter(
+                name="wait",
+                description=(
+                    f"Seconds to wait for the checkout URL (0-{CHECKOUT_MAX_SYNC_WAIT}; "
+                    f"0-{CHECKOUT_MAX_WAIT} on the async route)"
+                ),
+                required=False,
+                type=int,
+            ),
+        ],
+        responses={200: PaymentStatusSerializer},
+    )
+    @action(detail=True, methods=["get"], url_path="checkout-status")
+    def checkout_status(self, request, pk=None):
+        wait = checkout_wait(request, CHECKOUT_MAX_SYNC_WAIT)
+
+        # Чекаємо на запис воркера, тож читаємо з основної бази, а не з репліки
+        with use_primary():
+            payment = self.get_object()
+            deadline = time.monotonic() + wait
+            while checkout_pending(payment) and time.monotonic() < deadline:
+                time.sleep(CHECKOUT_POLL_INTERVAL)
+                payment.refresh_from_db(fields=CHECKOUT_STATUS_FIELDS)
+        return Response(PaymentStatusSerializer(payment).data)
+
+    async def acheckout_status(self, request, pk=None):
+        wait = checkout_wait(request, CHECKOUT_MAX_WAIT)
+
+        # Очікування не тримає потік: між перевірками працюють інші запити
+        with use_primary():
+            queryset = await self.aget_queryset()
+            try:
+                payment = await queryset.aget(pk=pk)
+            except Payment.DoesNotExist:
+                raise Http404
+            self.check_object_permissions(request, payment)
+            deadline = time.monotonic() + wait
+            while checkout_pending(payment) and time.monotonic() < deadline:
+                await asyncio.sleep(CHECKOUT_POLL_INTERVAL)
+                await payment.arefresh_from_db(fields=CHECKOUT_STATUS_FIELDS)
+        return Response(PaymentStatusSerializer(payment).data)
+
 
 @extend_schema(
     summary="Payment Success Page",
@@ -69,3 +252,38 @@ def payment_cancel(request):
     Display a cancellation message for payments.
     """
     return HttpResponse("Оплата скасована. Ви можете повторити спробу пізніше.")
+
+
+@csrf_exempt
+@require_POST
+def stripe_webhook(request):
+    """
+    Verify a Stripe webhook and store the raw event for the worker.
+    Redelivered events hit the unique event_id and are dropped, so the
+    handler only does one INSERT before acknowledging Stripe.
+    """
+    payload = request.body
+    sig_header = request.META.get("HTTP_STRIPE_SIGNATURE")
+    if not sig_header:
+        return JsonResponse({"error": "Missing Stripe-Signature header."}, status=400)
+
+    try:
+        event = stripe.Webhook.construct_event(
+            payload, sig_header, settings.STRIPE_ENDPOINT_SECRET
+        )
+    except ValueError as e:
+        return JsonResponse({"error": str(e)}, status=400)
+    except stripe.error.SignatureVerificationError as e:
+        return JsonResponse({"error": str(e)}, status=400)
+
+    StripeEvent.objects.bulk_create(
+        [
+            StripeEvent(
+                event_id=event["id"],
+                type=event["type"],
+                payload=json.loads(payload),
+            )
+        ],
+        ignore_conflicts=True,
+    )
+    return JsonResponse({"status": "success"})
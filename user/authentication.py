@@ -0,0 +1,93 @@
+import logging
+
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+
+logger = logging.getLogger(__name__)
+
+TOKEN_VERSION_CLAIM = "ver"
+USER_KEY = "user:auth:{}:{}"
+# Shared by every worker, so used only with SHARED_CACHE; deleted as soon as
+# the user changes
+USER_CACHE_TIMEOUT = 300
+# Per process and never invalidated remotely, so it bounds how long another
+# worker may keep serving a user after a change or a revocation
+LOCAL_USER_CACHE_TIMEOUT = 10
+
+local_cache = caches["local"]
+
+
+def user_cache_key(user_id, token_version) -> str:
+    return USER_KEY.format(user_id, token_version)
+
+
+def token_version(validated_token) -> int:
+    # Tokens issued before versioning count as version 0
+    return validated_token.get(TOKEN_VERSION_CLAIM, 0)
+
+
+def invalidate_cached_user(user) -> None:
+    """Drop the cached copies of a user, under its old and new token version."""
+    versions = {user.token_version, getattr(user, "previous_token_version", None)}
+    keys = [user_cache_key(user.pk, version) for version in versions - {None}]
+    local_cache.delete_many(keys)
+    try:
+        cache.delete_many(keys)
+    except Exception:
+        logger.warning("Could not invalidate a cached user.", exc_info=True)
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication that reads the user row at most once per cache
+    timeout instead of on every request. Entries are keyed by the token's
+    version, and a token older than the user's token_version is rejected.
+    """
+
+    def get_user(self, validated_token):
+        key = user_cache_key(
+            validated_token.get(jwt_settings.USER_ID_CLAIM),
+            token_version(validated_token),
+        )
+        user = local_cache.get(key)
+        if user is not None:
+            return user
+
+        user = self.get_shared(key)
+        if user is None:
+            user = super().get_user(validated_token)
+            self.check_token_version(user, validated_token)
+            self.set_shared(key, user)
+        local_cache.set(key, user, LOCAL_USER_CACHE_TIMEOUT)
+        return user
+
+    @staticmethod
+    def check_token_version(user, validated_token):
+        if user.token_version != token_version(validated_token):
+            raise AuthenticationFailed(
+                _("Token has been revoked."), code="token_revoked"
+            )
+
+    @staticmethod
+    def get_shared(key):
+        # A per-process cache misses invalidations made by other processes
+        if not settings.SHARED_CACHE:
+            return None
+        try:
+            return cache.get(key)
+        except Exception:
+            logger.warning("Could not read a cached user.", exc_info=True)
+            return None
+
+    @staticmethod
+    def set_shared(key, user):
+        if not settings.SHARED_CACHE:
+            return
+        try:
+            cache.set(key, user, USER_CACHE_TIMEOUT)
+        except Exception:
+            logger.warning("Could not cache a user.", exc_info=True)
@@ -0,0 +1,167 @@
+import logging
+import time
+from dataclasses import dataclass
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.utils import timezone
+from rest_framework_simplejwt.token_blacklist.models import (
+    BlacklistedToken,
+    OutstandingToken,
+)
+
+logger = logging.getLogger(__name__)
+
+BLACKLIST_KEY = "user:blacklist:{}"
+# Present only while the cache holds every blacklisted jti that has not
+# expired; without it lookups go to the database
+READY_KEY = "user:blacklist:ready"
+# Longer than the rebuild interval, so a healthy cache never loses it
+READY_TIMEOUT = 2 * 60 * 60
+REBUILD_BATCH_SIZE = 5_000
+PURGE_BATCH_SIZE = 10_000
+
+# simplejwt's blacklist() takes two get_or_create round trips; this is one
+BLACKLIST_TOKEN = f"""
+WITH outstanding AS (
+    INSERT INTO {OutstandingToken._meta.db_table} (jti, token, created_at, expires_at)
+    VALUES (%(jti)s, %(token)s, %(now)s, %(expires_at)s)
+    ON CONFLICT (jti) DO UPDATE SET jti = EXCLUDED.jti
+    RETURNING id
+)
+INSERT INTO {BlacklistedToken._meta.db_table} (token_id, blacklisted_at)
+SELECT id, %(now)s FROM outstanding
+ON CONFLICT (token_id) DO NOTHING
+"""
+
+# Every refresh token lives as long, so expired ones have the lowest ids and
+# a batch is found at the start of the primary key, not by a full scan.
+# Blacklist rows go in the same statement; their foreign key is checked at commit.
+PURGE_EXPIRED = f"""
+WITH expired AS (
+    SELECT id FROM {OutstandingToken._meta.db_table}
+    WHERE expires_at < %(now)s
+    ORDER BY id
+    LIMIT %(limit)s
+),
+blacklisted AS (
+    DELETE FROM {BlacklistedToken._meta.db_table}
+    WHERE token_id IN (SELECT id FROM expired)
+    RETURNING 1
+),
+outstanding AS (
+    DELETE FROM {OutstandingToken._meta.db_table}
+    WHERE id IN (SELECT id FROM expired)
+    RETURNING 1
+)
+SELECT (SELECT count(*) FROM outstanding), (SELECT count(*) FROM blacklisted)
+"""
+
+
+def blacklist_key(jti) -> str:
+    return BLACKLIST_KEY.format(jti)
+
+
+def token_timeout() -> int:
+    # An entry may outlive its token: an expired token is rejected anyway
+    return int(settings.SIMPLE_JWT["REFRESH_TOKEN_LIFETIME"].total_seconds())
+
+
+def is_blacklisted(jti) -> bool:
+    try:
+        cached = cache.get_many([READY_KEY, blacklist_key(jti)])
+    except Exception:
+        logger.warning("Token blacklist cache is unavailable.", exc_info=True)
+        cached = {}
+    if READY_KEY in cached:
+        return blacklist_key(jti) in cached
+    return BlacklistedToken.objects.filter(token__jti=jti).exists()
+
+
+def blacklist_token(jti, token, expires_at) -> None:
+    """Record a token in the blacklist table, then in the cache right away."""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            BLACKLIST_TOKEN,
+            {
+                "jti": jti,
+                "token": token,
+                "now": timezone.now(),
+                "expires_at": expires_at,
+            },
+        )
+    remember_blacklisted(jti)
+
+
+def remember_blacklisted(jti) -> None:
+    try:
+        cache.set(blacklist_key(jti), 1, token_timeout())
+    except Exception:
+        logger.warning("Could not cache a blacklisted token.", exc_info=True)
+        # The cache is incomplete now; send lookups to the database
+        try:
+            cache.delete(READY_KEY)
+        except Exception:
+            logger.warning("Could not reset the blacklist cache.", exc_info=True)
+
+
+def rebuild_blacklist_cache(batch_size=REBUILD_BATCH_SIZE) -> int:
+    """
+    Load every blacklisted jti that has not expired into the cache and
+    mark it ready. Entries written meanwhile are kept, so nothing is lost
+    to a concurrent blacklisting.
+    """
+    jtis = (
+        BlacklistedToken.objects.filter(token__expires_at__gt=timezone.now())
+        .values_list("token__jti", flat=True)
+        .iterator(chunk_size=batch_size)
+    )
+    timeout = token_timeout()
+    count = 0
+    batch = {}
+    for jti in jtis:
+        batch[blacklist_key(jti)] = 1
+        if len(batch) == batch_size:
+            cache.set_many(batch, timeout)
+            count += len(batch)
+            batch = {}
+    if batch:
+        cache.set_many(batch, timeout)
+        count += len(batch)
+    cache.set(READY_KEY, 1, READY_TIMEOUT)
+    return count
+
+
+@dataclass
+class PurgeReport:
+    outstanding: int = 0
+    blacklisted: int = 0
+    elapsed: float = 0.0
+
+    def as_dict(self) -> dict:
+        return {
+            "outstanding": self.outstanding,
+            "blacklisted": self.blacklisted,
+            "elapsed": round(self.elapsed, 3),
+        }
+
+
+def purge_expired_tokens(now=None, batch_size=PURGE_BATCH_SIZE) -> PurgeReport:
+    """
+    Delete expired outstanding tokens and their blacklist rows in short
+    batches; an expired token is rejected whether it is blacklisted or not.
+    """
+    now = now or timezone.now()
+    report = PurgeReport()
+    started = time.perf_counter()
+    while True:
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(PURGE_EXPIRED, {"now": now, "limit": batch_size})
+            outstanding, blacklisted = cursor.fetchone()
+        report.outstanding += outstanding
+        report.blacklisted += blacklisted
+        if outstanding < batch_size:
+            break
+    report.elapsed = time.perf_counter() - started
+    return report
@@ -0,0 +1,82 @@
+import asyncio
+import statistics
+import time
+
+import httpx
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from user.tokens import VersionedRefreshToken
+
+REQUEST_TIMEOUT = 30
+
+
+class Command(BaseCommand):
+    help = (
+        "Rotate refresh tokens against /users/token/refresh/ of a running "
+        "server and report requests per second and latency percentiles. "
+        "Each worker follows its own chain of rotated tokens."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--url", default="http://localhost:8000")
+        parser.add_argument("--concurrency", type=int, default=20)
+        parser.add_argument("--requests", type=int, default=2000)
+        parser.add_argument(
+            "--email", help="User to issue the tokens for; the first user by default."
+        )
+
+    def handle(self, *args, **options):
+        users = get_user_model().objects.order_by("id")
+        if options["email"]:
+            users = users.filter(email=options["email"])
+        user = users.first()
+        if user is None:
+            raise CommandError("No user to issue tokens for.")
+
+        tokens = [
+            str(VersionedRefreshToken.for_user(user))
+            for _ in range(options["concurrency"])
+        ]
+        latencies, errors, elapsed = asyncio.run(
+            self.load(
+                options["url"].rstrip("/") + "/users/token/refresh/",
+                tokens,
+                options["requests"],
+            )
+        )
+        cuts = statistics.quantiles(latencies, n=100)
+        self.stdout.write(
+            f"refresh {len(latencies) / elapsed:8.1f} req/s "
+            f"p50={cuts[49] * 1000:7.1f}ms p99={cuts[98] * 1000:7.1f}ms "
+            f"errors={errors}"
+        )
+
+    async def load(self, url, tokens, total):
+        latencies = []
+        errors = 0
+        remaining = iter(range(total))
+        limits = httpx.Limits(max_connections=len(tokens))
+        timeout = httpx.Timeout(REQUEST_TIMEOUT)
+
+        async with httpx.AsyncClient(limits=limits, timeout=timeout) as client:
+
+            async def worker(token):
+                nonlocal errors
+                for _ in remaining:
+                    started = time.perf_counter()
+                    try:
+                        response = await client.post(url, data={"refresh": token})
+                    except httpx.HTTPError as error:
+                        raise CommandError(f"{url} is not reachable: {error}")
+                    latencies.append(time.perf_counter() - started)
+                    if response.status_code != 200:
+                        # The chain is broken; a rotated token works only once
+                        errors += 1
+                        return
+                    token = response.json()["refresh"]
+
+            started = time.perf_counter()
+            await asyncio.gather(*(worker(token) for token in tokens))
+            elapsed = time.perf_counter() - started
+        return latencies, errors, elapsed
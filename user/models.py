@@ -43,8 +43,44 @@ class UserManager(BaseUserManager):
 class User(AbstractUser):
     username = None
     email = models.EmailField(_("email address"), unique=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    # Carried by issued tokens; bumping it revokes every token issued before
+    token_version = models.PositiveIntegerField(default=0)
 
     USERNAME_FIELD = "email"
     REQUIRED_FIELDS = []
+    # Changing any of these bumps token_version
+    CREDENTIAL_FIELDS = ("password", "is_active", "is_staff", "is_superuser")
 
     objects = UserManager()
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._loaded_credentials = self.credentials()
+
+    def credentials(self):
+        """Loaded credential fields; deferred ones are left out, not fetched."""
+        return {
+            name: self.__dict__[name]
+            for name in self.CREDENTIAL_FIELDS
+            if name in self.__dict__
+        }
+
+    def refresh_from_db(self, *args, **kwargs):
+        super().refresh_from_db(*args, **kwargs)
+        self._loaded_credentials = self.credentials()
+
+    def save(self, *args, **kwargs):
+        credentials = self.credentials()
+        self.previous_token_version = self.token_version
+        changed = any(
+            credentials.get(name) != value
+            for name, value in self._loaded_credentials.items()
+        )
+        if self.pk is not None and changed:
+            self.token_version += 1
+            update_fields = kwargs.get("update_fields")
+            if update_fields is not None:
+                kwargs["update_fields"] = {*update_fields, "token_version"}
+        super().save(*args, **kwargs)
+        self._loaded_credentials = credentials
@@ -0,0 +1,21 @@
+from drf_spectacular.contrib.rest_framework_simplejwt import (
+    SimpleJWTScheme,
+    TokenObtainPairSerializerExtension,
+    TokenRefreshSerializerExtension,
+)
+
+
+# The simplejwt extensions match their exact classes only; ours subclass them
+
+
+class CachedJWTScheme(SimpleJWTScheme):
+    target_class = "user.authentication.CachedJWTAuthentication"
+    match_subclasses = True
+
+
+class VersionedTokenObtainPairSerializerExtension(TokenObtainPairSerializerExtension):
+    target_class = "user.tokens.VersionedTokenObtainPairSerializer"
+
+
+class VersionedTokenRefreshSerializerExtension(TokenRefreshSerializerExtension):
+    target_class = "user.tokens.VersionedTokenRefreshSerializer"
@@ -0,0 +1,23 @@
+from functools import partial
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from user.authentication import invalidate_cached_user
+from user.models import User
+
+
+@receiver(post_save, sender=User, dispatch_uid="user.invalidate_cached_user")
+def user_saved(sender, instance, created, **kwargs):
+    # Again on commit, in case a request cached the old row in between
+    if not created:
+        invalidate_cached_user(instance)
+        transaction.on_commit(partial(invalidate_cached_user, instance))
+
+
+@receiver(post_delete, sender=User, dispatch_uid="user.forget_deleted_user")
+def user_deleted(sender, instance, **kwargs):
+    # Also on cascade; the user row is gone, so no token may authenticate it
+    invalidate_cached_user(instance)
+    transaction.on_commit(partial(invalidate_cached_user, instance))
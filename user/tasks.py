@@ -0,0 +1,23 @@
+import logging
+
+from celery import shared_task
+
+from . import blacklist
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task
+def rebuild_token_blacklist_cache():
+    """Reload the blacklist cache from the database and mark it ready."""
+    count = blacklist.rebuild_blacklist_cache()
+    logger.info("Token blacklist cache rebuilt with %s tokens.", count)
+    return count
+
+
+@shared_task
+def purge_expired_tokens():
+    """Daily cleanup of outstanding and blacklisted tokens that have expired."""
+    report = blacklist.purge_expired_tokens()
+    logger.info("Expired tokens purged: %s", report.as_dict())
+    return report.as_dict()
@@ -1,3 +1,230 @@
-from django.test import TestCase
+from datetime import timedelta
+from unittest.mock import patch
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.core.cache import cache, caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.test import override_settings
+from django.utils import timezone
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.token_blacklist.models import (
+    BlacklistedToken,
+    OutstandingToken,
+)
+from rest_framework_simplejwt.tokens import AccessToken
+
+from user import authentication
+from user.blacklist import (
+    READY_KEY,
+    blacklist_key,
+    purge_expired_tokens,
+    rebuild_blacklist_cache,
+)
+from user.tokens import VersionedRefreshToken
+
+User = get_user_model()
+
+
+def clear_user_caches():
+    cache.clear()
+    caches["local"].clear()
+
+
+class UserQueryBudgetTests(APITestCase):
+    def setUp(self):
+        clear_user_caches()
+        self.user = User.objects.create_user(
+            email="user@example.com", password="password"
+        )
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(self.user)}"
+        )
+
+    def test_me(self):
+        # The user lookup for the token is the only query
+        with self.assertNumQueries(1):
+            response = self.client.get("/users/me/")
+        self.assertEqual(response.data["email"], "user@example.com")
+
+    def test_user_is_read_once_per_cache_timeout(self):
+        self.client.get("/users/me/")
+        with self.assertNumQueries(0):
+            response = self.client.get("/users/me/")
+        self.assertEqual(response.data["email"], "user@example.com")
+
+    @override_settings(SHARED_CACHE=True)
+    def test_shared_cache_serves_other_workers(self):
+        self.client.get("/users/me/")
+        caches["local"].clear()
+        with self.assertNumQueries(0):
+            self.client.get("/users/me/")
+
+
+class CachedJWTAuthenticationTests(APITestCase):
+    def setUp(self):
+        clear_user_caches()
+        self.user = User.objects.create_user(
+            email="user@example.com", password="password"
+        )
+
+    def authenticate(self, user):
+        token = VersionedRefreshToken.for_user(user).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+
+    def test_issued_tokens_carry_the_token_version(self):
+        response = self.client.post(
+            "/users/token/", {"email": "user@example.com", "password": "password"}
+        )
+        self.assertEqual(AccessToken(response.data["access"])["ver"], 0)
+
+    def test_profile_update_refreshes_the_cached_user(self):
+        self.authenticate(self.user)
+        self.client.get("/users/me/")
+
+        self.client.patch("/users/me/", {"email": "new@example.com"})
+
+        response = self.client.get("/users/me/")
+        self.assertEqual(response.data["email"], "new@example.com")
+
+    def test_deleted_user_is_rejected_right_away(self):
+        self.authenticate(self.user)
+        self.assertEqual(self.client.get("/users/me/").status_code, 200)
+
+        self.user.delete()
+
+        self.assertEqual(self.client.get("/users/me/").status_code, 401)
+
+    @staticmethod
+    def worker(name):
+        """Switch to the caches of another process: its local and "default" cache."""
+        return patch.multiple(
+            "user.authentication",
+            local_cache=LocMemCache(f"worker-{name}-local", {}),
+            cache=LocMemCache(f"worker-{name}-default", {}),
+        )
+
+    def test_per_process_caches_let_no_worker_keep_a_revoked_user(self):
+        self.authenticate(self.user)
+        with self.worker("a"):
+            self.assertEqual(self.client.get("/users/me/").status_code, 200)
+        with self.worker("b"):
+            self.client.patch("/users/me/", {"password": "new-password"})
+
+        # Worker a never saw the change; once its local entry expires it
+        # must read the row instead of its own per-process "default" cache
+        with self.worker("a"):
+            authentication.local_cache.clear()
+            self.assertEqual(self.client.get("/users/me/").status_code, 401)
+
+    def test_password_change_revokes_older_tokens(self):
+        self.authenticate(self.user)
+        self.client.get("/users/me/")
+
+        self.client.patch("/users/me/", {"password": "new-password"})
+
+        self.assertEqual(self.client.get("/users/me/").status_code, 401)
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.token_version, 1)
+        self.authenticate(self.user)
+        self.assertEqual(self.client.get("/users/me/").status_code, 200)
+
+    def test_staff_flag_change_revokes_older_tokens(self):
+        self.authenticate(self.user)
+        self.client.get("/users/me/")
+
+        self.user.is_staff = True
+        self.user.save(update_fields=["is_staff"])
+
+        self.assertEqual(self.client.get("/users/me/").status_code, 401)
+        self.authenticate(self.user)
+        self.assertTrue(self.client.get("/users/me/").data["is_staff"])
+
+    def test_unrelated_saves_keep_tokens(self):
+        self.user.first_name = "Taras"
+        self.user.save()
+        # Deferred credential fields are not fetched or treated as changed
+        deferred = User.objects.only("email").get()
+        deferred.save(update_fields=["email"])
+
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.token_version, 0)
+
+
+class TokenBlacklistTests(APITestCase):
+    def setUp(self):
+        clear_user_caches()
+        self.user = User.objects.create_user(
+            email="user@example.com", password="password"
+        )
+        self.refresh = str(VersionedRefreshToken.for_user(self.user))
+
+    def rotate(self, refresh):
+        return self.client.post("/users/token/refresh/", {"refresh": refresh})
+
+    def test_rotated_token_cannot_be_reused(self):
+        for ready in (False, True):
+            with self.subTest(ready=ready):
+                if ready:
+                    rebuild_blacklist_cache()
+                response = self.rotate(self.refresh)
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(self.rotate(self.refresh).status_code, 401)
+                self.refresh = response.data["refresh"]
+
+    def test_ready_cache_answers_without_the_database(self):
+        rebuild_blacklist_cache()
+        # Only the blacklisting of the rotated token
+        with self.assertNumQueries(1):
+            response = self.rotate(self.refresh)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(
+            BlacklistedToken.objects.filter(
+                token__jti=VersionedRefreshToken(self.refresh, verify=False).payload[
+                    "jti"
+                ]
+            ).exists()
+        )
+
+    def test_verify_rejects_blacklisted_tokens(self):
+        self.rotate(self.refresh)
+        rebuild_blacklist_cache()
+        response = self.client.post("/users/token/verify/", {"token": self.refresh})
+        self.assertEqual(response.status_code, 400)
+
+    def test_rebuild_loads_live_blacklisted_tokens(self):
+        self.rotate(self.refresh)
+        jti = VersionedRefreshToken(self.refresh, verify=False).payload["jti"]
+        cache.clear()
+
+        self.assertEqual(rebuild_blacklist_cache(), 1)
+        self.assertEqual(
+            cache.get_many([READY_KEY, blacklist_key(jti)]).keys(),
+            {
+                READY_KEY,
+                blacklist_key(jti),
+            },
+        )
+
+    def test_failed_cache_write_falls_back_to_the_database(self):
+        rebuild_blacklist_cache()
+        with patch("user.blacklist.cache.set", side_effect=ConnectionError):
+            with self.assertLogs("user.blacklist", "WARNING"):
+                self.rotate(self.refresh)
+        self.assertIsNone(cache.get(READY_KEY))
+        self.assertEqual(self.rotate(self.refresh).status_code, 401)
+
+    def test_purge_removes_expired_tokens_in_batches(self):
+        now = timezone.now()
+        for number in range(5):
+            outstanding = OutstandingToken.objects.create(
+                jti=f"expired-{number}", token="", expires_at=now - timedelta(days=1)
+            )
+            if number % 2:
+                BlacklistedToken.objects.create(token=outstanding)
+        self.rotate(self.refresh)
+
+        report = purge_expired_tokens(now=now, batch_size=2)
+
+        self.assertEqual((report.outstanding, report.blacklisted), (5, 2))
+        self.assertEqual(OutstandingToken.objects.count(), 1)
+        self.assertEqual(BlacklistedToken.objects.count(), 1)
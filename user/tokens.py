@@ -0,0 +1,62 @@
+from django.utils.translation import gettext_lazy as _
+from rest_framework import serializers
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.serializers import (
+    TokenBlacklistSerializer,
+    TokenObtainPairSerializer,
+    TokenRefreshSerializer,
+)
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken, UntypedToken
+from rest_framework_simplejwt.utils import datetime_from_epoch
+
+from user.authentication import TOKEN_VERSION_CLAIM
+from user.blacklist import blacklist_token, is_blacklisted
+
+
+class VersionedRefreshToken(RefreshToken):
+    """
+    Refresh token carrying the user's token_version; access tokens inherit it.
+    Blacklist checks go through the blacklist cache.
+    """
+
+    @classmethod
+    def for_user(cls, user):
+        token = super().for_user(user)
+        token[TOKEN_VERSION_CLAIM] = user.token_version
+        return token
+
+    def check_blacklist(self):
+        if is_blacklisted(self.payload[api_settings.JTI_CLAIM]):
+            raise TokenError(_("Token is blacklisted"))
+
+    def blacklist(self):
+        blacklist_token(
+            self.payload[api_settings.JTI_CLAIM],
+            str(self),
+            datetime_from_epoch(self.payload["exp"]),
+        )
+
+
+class VersionedTokenObtainPairSerializer(TokenObtainPairSerializer):
+    token_class = VersionedRefreshToken
+
+
+class VersionedTokenRefreshSerializer(TokenRefreshSerializer):
+    token_class = VersionedRefreshToken
+
+
+class VersionedTokenBlacklistSerializer(TokenBlacklistSerializer):
+    token_class = VersionedRefreshToken
+
+
+class CachedTokenVerifySerializer(serializers.Serializer):
+    """TokenVerifySerializer with the blacklist check served from the cache."""
+
+    token = serializers.CharField(write_only=True)
+
+    def validate(self, attrs):
+        token = UntypedToken(attrs["token"])
+        if is_blacklisted(token.get(api_settings.JTI_CLAIM)):
+            raise serializers.ValidationError("Token is blacklisted")
+        return {}